@@ -46,4 +46,44 @@ def get_db_config() -> Dict[str, Any]:
     
     return config
 
-DB_CONFIG = get_db_config()
\ No newline at end of file
+def get_pool_config() -> Dict[str, Any]:
+    """
+    Get connection pool settings from environment variables.
+    DB_POOL_SIZE          maximum open connections per process
+    DB_POOL_TIMEOUT       seconds to wait for a free connection
+    DB_POOL_MAX_IDLE      seconds an idle connection is kept before recycling
+    DB_POOL_MAX_LIFETIME  seconds before any connection is recycled
+    DB_POOL_PING_INTERVAL idle seconds after which a connection is pinged before reuse
+    DB_POOL_WARM          connections opened at startup
+    """
+    return {
+        "max_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
+        "ping_interval": float(os.getenv("DB_POOL_PING_INTERVAL", "30")),
+        "warm_size": int(os.getenv("DB_POOL_WARM", "2")),
+    }
+
+def get_db_mode() -> str:
+    """
+    Request execution mode selected by DB_MODE:
+    "sync"  (default) plain def handlers on PyMySQL, run in the threadpool
+    "async" async def handlers on aiomysql for the hot product/order routes
+    """
+    mode = os.getenv("DB_MODE", "sync").strip().lower()
+    if mode not in ("sync", "async"):
+        raise ValueError(f"DB_MODE must be 'sync' or 'async', got '{mode}'")
+    return mode
+
+def get_auto_migrate() -> bool:
+    """
+    DB_AUTO_MIGRATE=1 (default) applies pending migrations at startup;
+    0 only verifies the schema and refuses to start if anything is missing.
+    """
+    return os.getenv("DB_AUTO_MIGRATE", "1").strip().lower() not in ("0", "false", "no")
+
+DB_CONFIG = get_db_config()
+POOL_CONFIG = get_pool_config()
+DB_MODE = get_db_mode()
+AUTO_MIGRATE = get_auto_migrate()
\ No newline at end of file
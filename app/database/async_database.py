@@ -0,0 +1,93 @@
+import asyncio
+import ssl
+
+from app.database.database import DB_CONFIG
+from app.config.database_env import POOL_CONFIG
+
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+
+def _aiomysql_config(config: dict) -> dict:
+    """Translate the PyMySQL DB_CONFIG into aiomysql connect() arguments."""
+    kwargs = {
+        "host": config.get("host", "localhost"),
+        "port": int(config.get("port", 3306)),
+        "user": config.get("user", "root"),
+        "password": config.get("password", ""),
+        "db": config.get("database"),
+        "cursorclass": aiomysql.DictCursor,
+        "autocommit": True,
+    }
+    if ca := (config.get("ssl") or {}).get("ca"):
+        kwargs["ssl"] = ssl.create_default_context(cafile=ca)
+    return kwargs
+
+
+async def init_async_pool():
+    global _pool
+    if aiomysql is None:
+        raise RuntimeError("DB_MODE=async requires aiomysql (pip install aiomysql).")
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    minsize=1,
+                    maxsize=POOL_CONFIG["max_size"],
+                    pool_recycle=int(POOL_CONFIG["max_lifetime"]),
+                    **_aiomysql_config(DB_CONFIG),
+                )
+    return _pool
+
+
+async def close_async_pool():
+    global _pool
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+
+
+class AsyncRequestDB:
+    """Async counterpart of ``RequestDB``: one lazily acquired aiomysql connection per request.
+
+    Connections run in autocommit mode, so reads need no transaction;
+    writers call ``await conn.begin()`` and commit or roll back themselves.
+    """
+
+    def __init__(self):
+        self._conn = None
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    async def connection(self):
+        if self._conn is None:
+            pool = await init_async_pool()
+            self._conn = await asyncio.wait_for(pool.acquire(), POOL_CONFIG["timeout"])
+        return self._conn
+
+    async def release(self):
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        try:
+            if conn.get_transaction_status():
+                await conn.rollback()
+        finally:
+            _pool.release(conn)
+
+
+async def get_async_db():
+    """FastAPI dependency yielding the request's ``AsyncRequestDB``."""
+    db = AsyncRequestDB()
+    try:
+        yield db
+    finally:
+        await db.release()
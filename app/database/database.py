@@ -1,20 +1,477 @@
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 import pymysql
 from pymysql.cursors import DictCursor
-from contextlib import contextmanager
+from starlette.concurrency import run_in_threadpool
 
 try:
     from app.config.database import DB_CONFIG
 except ImportError:
     from app.config.database_example import DB_CONFIG
 
+from app.config.database_env import POOL_CONFIG
+from app.services import metrics
+from app.services.slow_queries import slow_query_log
+
+
+class PoolTimeoutError(pymysql.err.OperationalError):
+    """Raised when no pooled connection becomes free within the wait timeout."""
+
+
+class _RawConnection:
+    """A physical PyMySQL connection plus the bookkeeping the pool needs."""
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+
+def _caller(frame) -> str:
+    """Qualified name of the first function outside this module, e.g. "OrderService.cancel_order"."""
+    while frame is not None and frame.f_code.co_filename == __file__:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+
+
+class TimedCursor:
+    """Cursor proxy that times every statement for app.services.metrics and the slow-query log."""
+
+    __slots__ = ("_cursor", "_caller")
+
+    def __init__(self, cursor, caller: str):
+        self._cursor = cursor
+        self._caller = caller
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+    def _rows(self) -> int:
+        # Unbuffered cursors do not know their row count until the result is read.
+        if isinstance(self._cursor, pymysql.cursors.SSCursor):
+            return 0
+        return max(self._cursor.rowcount, 0)
+
+    def _record(self, query, args, started: float, failed: bool = False, many: bool = False):
+        seconds = time.perf_counter() - started
+        if metrics.METRICS_ENABLED:
+            metrics.record_statement(self._caller, query, seconds, 0 if failed else self._rows(), failed)
+        if metrics.counting():
+            # executemany folds INSERT ... VALUES into one multi-row statement;
+            # anything else is sent once per parameter set.
+            many_trips = 1 if pymysql.cursors.RE_INSERT_VALUES.match(query) else len(args or ())
+            metrics.count_round_trip(self._caller, query, many_trips if many else 1)
+        if slow_query_log.threshold and seconds >= slow_query_log.threshold:
+            slow_query_log.record(self._caller, query, args, seconds, many)
+
+    def execute(self, query, args=None):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.execute(query, args)
+        except Exception:
+            self._record(query, args, started, failed=True)
+            raise
+        self._record(query, args, started)
+        return result
+
+    def executemany(self, query, args):
+        started = time.perf_counter()
+        try:
+            result = self._cursor.executemany(query, args)
+        except Exception:
+            self._record(query, args, started, failed=True, many=True)
+            raise
+        self._record(query, args, started, many=True)
+        return result
+
+
+class PooledConnection:
+    """Proxy handed to callers; ``close()`` gives the connection back instead of closing it."""
+
+    def __init__(self, raw: _RawConnection, release, discard=None):
+        self._raw = raw
+        self._release = release
+        self._discard = discard or release
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError(0, "Connection already returned to the pool")
+        return getattr(self._raw.conn, name)
+
+    def cursor(self, cursor=None):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError(0, "Connection already returned to the pool")
+        raw_cursor = self._raw.conn.cursor(cursor)
+        if not (metrics.METRICS_ENABLED or slow_query_log.threshold or metrics.counting()):
+            return raw_cursor
+        return TimedCursor(raw_cursor, _caller(sys._getframe(1)))
+
+    def commit(self):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError(0, "Connection already returned to the pool")
+        self._raw.conn.commit()
+        if metrics.counting():
+            metrics.count_round_trip(_caller(sys._getframe(1)))
+
+    def rollback(self):
+        if self._raw is None:
+            raise pymysql.err.InterfaceError(0, "Connection already returned to the pool")
+        self._raw.conn.rollback()
+        if metrics.counting():
+            metrics.count_round_trip(_caller(sys._getframe(1)))
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._release(raw)
+
+    def discard(self):
+        """Drop the physical connection instead of reusing it (e.g. mid-way through a result)."""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._discard(raw)
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of PyMySQL connections.
+
+    Connections idle longer than ``ping_interval`` are pinged before reuse,
+    and connections older than ``max_lifetime`` or idle longer than
+    ``max_idle`` are recycled. Callers wait up to ``timeout`` seconds for a
+    free slot before ``PoolTimeoutError`` is raised.
+    """
+
+    def __init__(self, config: dict, max_size: int = 10, timeout: float = 10.0,
+                 max_idle: float = 300.0, max_lifetime: float = 1800.0, ping_interval: float = 30.0,
+                 warm_size: int = 0):
+        self.config = config
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.ping_interval = ping_interval
+        self.warm_size = min(warm_size, max_size)
+
+        self._idle = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._metrics = {
+            "connects": 0,
+            "connect_errors": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_seconds": 0.0,
+            "timeouts": 0,
+            "pings": 0,
+            "ping_failures": 0,
+            "recycled": 0,
+            "discarded": 0,
+        }
+
+    def _connect(self) -> _RawConnection:
+        started = time.perf_counter()
+        try:
+            conn = pymysql.connect(**self.config)
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._metrics["connect_errors"] += 1
+                self._cond.notify()
+            raise
+        metrics.CONNECT_DURATION.observe(time.perf_counter() - started)
+        with self._cond:
+            self._metrics["connects"] += 1
+        return _RawConnection(conn)
+
+    def _discard(self, raw: _RawConnection):
+        try:
+            raw.conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._metrics["discarded"] += 1
+            self._cond.notify()
+
+    def _is_stale(self, raw: _RawConnection, now: float) -> bool:
+        if self.max_lifetime and now - raw.created_at > self.max_lifetime:
+            return True
+        if self.max_idle and now - raw.last_used > self.max_idle:
+            return True
+        return False
+
+    def _healthy(self, raw: _RawConnection, now: float) -> bool:
+        if now - raw.last_used < self.ping_interval:
+            return raw.conn.open
+        with self._cond:
+            self._metrics["pings"] += 1
+        try:
+            raw.conn.ping(reconnect=False)
+            return True
+        except Exception:
+            with self._cond:
+                self._metrics["ping_failures"] += 1
+            return False
+
+    def checkout(self) -> _RawConnection:
+        """Borrow a physical connection, waiting for a free slot if needed."""
+        deadline = None
+        while True:
+            with self._cond:
+                if self._closed:
+                    raise pymysql.err.InterfaceError(0, "Connection pool is closed")
+                raw = None
+                if self._idle:
+                    raw = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    now = time.monotonic()
+                    if deadline is None:
+                        deadline = now + self.timeout
+                        self._metrics["waits"] += 1
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._metrics["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            2013, f"Timed out after {self.timeout}s waiting for a database connection"
+                        )
+                    started = time.monotonic()
+                    self._cond.wait(remaining)
+                    self._metrics["wait_seconds"] += time.monotonic() - started
+                    continue
+
+            if raw is None:
+                raw = self._connect()
+            else:
+                now = time.monotonic()
+                if self._is_stale(raw, now):
+                    with self._cond:
+                        self._metrics["recycled"] += 1
+                    self._discard(raw)
+                    continue
+                if not self._healthy(raw, now):
+                    self._discard(raw)
+                    continue
+
+            with self._cond:
+                self._metrics["checkouts"] += 1
+            return raw
+
+    def checkin(self, raw: _RawConnection):
+        """Return a physical connection, ending any transaction left open on it."""
+        try:
+            raw.conn.rollback()
+        except Exception:
+            self._discard(raw)
+            return
+        raw.last_used = time.monotonic()
+        with self._cond:
+            if self._closed:
+                self._size -= 1
+                raw.conn.close()
+                return
+            self._idle.append(raw)
+            self._cond.notify()
+
+    def warm(self, count: int = None) -> int:
+        """Open connections up front so the first requests skip the connect cost."""
+        count = self.warm_size if count is None else min(count, self.max_size)
+        borrowed = []
+        try:
+            while len(borrowed) < count and self.stats()["size"] < count:
+                borrowed.append(self.checkout())
+        finally:
+            for raw in borrowed:
+                self.checkin(raw)
+        return len(borrowed)
+
+    def acquire(self) -> PooledConnection:
+        return PooledConnection(self.checkout(), self.checkin, self._discard)
+
+    def stats(self) -> dict:
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "max_size": self.max_size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                **self._metrics,
+            }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for raw in idle:
+            try:
+                raw.conn.close()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+class RequestDB:
+    """Per-request connection holder.
+
+    The first service that asks for a connection borrows one from the pool;
+    every later service in the same request gets that same connection.
+    """
+
+    def __init__(self, pool: ConnectionPool = None):
+        self._pool = pool
+        self._raw = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._raw is not None
+
+    def connection(self) -> PooledConnection:
+        with self._lock:
+            if self._raw is None:
+                if self._pool is None:
+                    self._pool = get_pool()
+                self._raw = self._pool.checkout()
+            return PooledConnection(self._raw, lambda raw: None)
+
+    def release(self):
+        with self._lock:
+            raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.checkin(raw)
+
+
+_request_db: ContextVar = ContextVar("request_db", default=None)
+
+
 @contextmanager
+def request_scope():
+    db = RequestDB()
+    token = _request_db.set(db)
+    try:
+        yield db
+    finally:
+        _request_db.reset(token)
+        db.release()
+
+
+class RequestScopeMiddleware:
+    """ASGI middleware that gives each HTTP request one shared, lazily borrowed connection."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        db = RequestDB()
+        token = _request_db.set(db)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_db.reset(token)
+            if db.connected:
+                await run_in_threadpool(db.release)
+
+
 def get_db():
-    conn = pymysql.connect(**DB_CONFIG)
+    """FastAPI dependency yielding the request's ``RequestDB``.
+
+    Nothing is borrowed from the pool until a service actually runs a query,
+    so handlers that never touch MySQL cost no connection at all.
+    """
+    db = _request_db.get()
+    if db is not None:
+        yield db
+        return
+
+    db = RequestDB()
+    try:
+        yield db
+    finally:
+        db.release()
+
+
+def stream_rows(sql: str, params=None, batch_size: int = 1000):
+    """Yield the rows of ``sql`` in lists of up to ``batch_size`` dicts.
+
+    Reads through an unbuffered server-side cursor (SSDictCursor), so memory
+    stays flat however large the result is. It runs on a connection of its
+    own, because nothing else can use a connection while its result is
+    still being read. If the consumer stops early, the connection is dropped
+    rather than draining the remaining rows; otherwise its session timeout
+    is reset before it goes back to the pool.
+    """
+    conn = get_pool().acquire()
+    cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+    finished = False
     try:
-        yield conn
+        # The server blocks while a slow client catches up; give it longer
+        # than the default 60 s before it gives up on the stream.
+        cursor.execute("SET SESSION net_write_timeout = 600")
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+        cursor.execute("SET SESSION net_write_timeout = DEFAULT")
+        finished = True
     finally:
-        conn.close()
+        if finished:
+            cursor.close()
+            conn.close()
+        else:
+            conn.discard()
 
-def get_connection():
-    return pymysql.connect(**DB_CONFIG)
 
+def get_connection(db: RequestDB = None):
+    db = db or _request_db.get()
+    if db is not None:
+        return db.connection()
+    return get_pool().acquire()
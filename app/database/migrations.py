@@ -0,0 +1,502 @@
+"""
+Versioned, idempotent schema migrations.
+
+Each migration has a version number, optional DDL statements and the
+indexes it owns. Applied versions are recorded in ``schema_migrations``.
+Every run also re-checks the indexes of migrations that were already
+applied and rebuilds any that went missing or changed, so the tool
+maintains the indexes as well as creating them.
+
+    python -m app.database.migrations            # apply pending migrations
+    python -m app.database.migrations status     # applied / pending versions
+    python -m app.database.migrations report     # indexes and the queries they serve
+    python -m app.database.migrations verify     # fail if the schema is not what the app needs
+
+The API runs ``bootstrap()`` once at startup, so no request path issues DDL.
+"""
+
+import sys
+from dataclasses import dataclass, field, fields
+
+import pymysql
+
+from app.config.database_env import AUTO_MIGRATE
+from app.database.database import get_connection
+from app.models.models import Category, Customer, Order, Product, Review, Seller, SubCategory, Transaction
+
+
+@dataclass
+class Index:
+    table: str
+    name: str
+    columns: tuple
+    serves: tuple = ()
+    unique: bool = False
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    statements: list = field(default_factory=list)
+    indexes: list = field(default_factory=list)
+
+
+# Rebuild the derived aggregate tables from their sources. Used by
+# migrations 3 and 5 and again after a bulk load (app/demo_data.py).
+PRODUCT_RATINGS_BACKFILL = """
+    INSERT INTO product_ratings (productid, review_count, rating_sum)
+    SELECT * FROM (
+        SELECT productid, COUNT(*) AS review_count, SUM(rating) AS rating_sum
+        FROM reviews GROUP BY productid
+    ) AS agg
+    ON DUPLICATE KEY UPDATE review_count = agg.review_count, rating_sum = agg.rating_sum
+    """
+
+_SELLER_SUMMARY_COUNTS = """
+               COUNT(*) AS order_count,
+               COALESCE(SUM(o.status = 'Pending'), 0) AS pending,
+               COALESCE(SUM(o.status = 'Dispatched'), 0) AS dispatched,
+               COALESCE(SUM(o.status = 'On The Way'), 0) AS on_the_way,
+               COALESCE(SUM(o.status = 'Delivered'), 0) AS delivered,
+               COALESCE(SUM(o.status = 'Cancelled'), 0) AS cancelled,
+               COALESCE(SUM(IF(o.status = 'Cancelled', 0, o.qty)), 0) AS units_sold,
+               COALESCE(SUM(IF(o.status = 'Cancelled', 0, ROUND(t.amount, 2))), 0) AS revenue
+        FROM orders o
+        LEFT JOIN transactions t ON t.orderid = o.orderid"""
+
+_SELLER_SUMMARY_UPSERT = """
+    ON DUPLICATE KEY UPDATE
+        order_count = agg.order_count, pending = agg.pending, dispatched = agg.dispatched,
+        on_the_way = agg.on_the_way, delivered = agg.delivered, cancelled = agg.cancelled,
+        units_sold = agg.units_sold, revenue = agg.revenue
+    """
+
+SELLER_SUMMARY_BACKFILL = """
+    INSERT INTO seller_summary
+        (sellerid, order_count, pending, dispatched, on_the_way, delivered, cancelled, units_sold, revenue)
+    SELECT * FROM (
+        SELECT o.sellerid,""" + _SELLER_SUMMARY_COUNTS + """
+        WHERE o.sellerid IS NOT NULL
+        GROUP BY o.sellerid
+    ) AS agg""" + _SELLER_SUMMARY_UPSERT
+
+# The same for one seller (params: sellerid, sellerid); with no orders left
+# the row is zeroed rather than left behind.
+SELLER_SUMMARY_REFRESH = """
+    INSERT INTO seller_summary
+        (sellerid, order_count, pending, dispatched, on_the_way, delivered, cancelled, units_sold, revenue)
+    SELECT * FROM (
+        SELECT %s AS sellerid,""" + _SELLER_SUMMARY_COUNTS + """
+        WHERE o.sellerid = %s
+    ) AS agg""" + _SELLER_SUMMARY_UPSERT
+
+
+MIGRATIONS = [
+    Migration(
+        version=1,
+        description="Indexes for hot lookup columns",
+        indexes=[
+            # InnoDB appends the primary key to secondary indexes, so these two
+            # are (customerid, orderid) and (sellerid, orderid): the keyset
+            # order-history pages read them backwards without a sort.
+            Index("orders", "idx_orders_customer", ("customerid",), (
+                "OrderService.get_orders_by_customer pages",
+            )),
+            Index("orders", "idx_orders_seller", ("sellerid",), (
+                "OrderService.get_orders_by_seller pages",
+                "SellerService.get_seller_orders pages",
+                "NDJSON order exports",
+            )),
+            Index("orders", "idx_orders_product_customer", ("productid", "customerid"), (
+                "ReviewService.add_review purchase check",
+                "orders.productid foreign key",
+            )),
+            Index("transactions", "idx_transactions_order", ("orderid",), (
+                "OrderService.get_transaction_for_order",
+                "OrderService.create_or_update_transaction",
+                "OrderService.cancel_order / update_order_status refunds",
+                "SellerService.get_seller_orders join",
+            )),
+            Index("transactions", "idx_transactions_customer", ("customerid",), (
+                "OrderService.get_transactions_by_customer",
+            )),
+            Index("products", "idx_products_subcategory", ("subcategoryid",), (
+                "ProductService.list_products(subcategoryid) for the id/newest sorts",
+            )),
+            Index("products", "idx_products_seller", ("sellerid",), (
+                "SellerService.get_seller_products",
+            )),
+            Index("customers", "idx_customers_phone", ("phoneno",), (
+                "CustomerService.register_customer phone check",
+                "CustomerService.change_phone_password",
+            )),
+            Index("sellers", "idx_sellers_customer", ("customerid",), (
+                "SellerService.get_seller_by_customer",
+                "SellerService.register_seller",
+                "ProductService.add_product seller lookup",
+            )),
+            Index("subcategories", "idx_subcategories_category_name", ("categoryid", "name"), (
+                "CategoryService.get_subcategories_by_category",
+                "ProductService.list_subcategories(categoryid)",
+                "add_subcategory duplicate check",
+            )),
+        ],
+    ),
+    Migration(
+        version=2,
+        description="Keyset pagination and sort indexes for product listing",
+        statements=[
+            "UPDATE products SET rating = 0 WHERE rating IS NULL",
+            "ALTER TABLE products MODIFY rating FLOAT NOT NULL DEFAULT 0",
+        ],
+        indexes=[
+            Index("products", "idx_products_price", ("price", "productid"), (
+                "ProductService.list_products(sort=price)",
+            )),
+            Index("products", "idx_products_rating", ("rating", "productid"), (
+                "ProductService.list_products(sort=rating)",
+            )),
+            Index("products", "idx_products_subcategory_price", ("subcategoryid", "price", "productid"), (
+                "ProductService.list_products(subcategoryid, sort=price)",
+            )),
+            Index("products", "idx_products_subcategory_rating", ("subcategoryid", "rating", "productid"), (
+                "ProductService.list_products(subcategoryid, sort=rating)",
+            )),
+        ],
+    ),
+    Migration(
+        version=3,
+        description="Materialized per-product review aggregates",
+        statements=[
+            """
+            CREATE TABLE IF NOT EXISTS reviews (
+                reviewid INT AUTO_INCREMENT PRIMARY KEY,
+                productid INT NOT NULL,
+                customerid INT NOT NULL,
+                rating INT NOT NULL,
+                comment TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                INDEX(productid),
+                INDEX(customerid)
+            ) ENGINE=InnoDB
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS product_ratings (
+                productid INT PRIMARY KEY,
+                review_count INT NOT NULL DEFAULT 0,
+                rating_sum BIGINT NOT NULL DEFAULT 0,
+                avg_rating DECIMAL(4, 2) AS (IF(review_count = 0, 0, rating_sum / review_count)) STORED
+            ) ENGINE=InnoDB
+            """,
+            PRODUCT_RATINGS_BACKFILL,
+        ],
+        indexes=[
+            Index("reviews", "idx_reviews_product_created", ("productid", "created_at"), (
+                "ReviewService.get_reviews ORDER BY created_at DESC",
+            )),
+        ],
+    ),
+    Migration(
+        version=4,
+        description="Per-table version counters for HTTP validators",
+        statements=[
+            # Sharded so concurrent writers to different products do not all
+            # queue on one counter row; a table's version is the sum of its shards.
+            """
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name VARCHAR(64) NOT NULL,
+                shard TINYINT UNSIGNED NOT NULL,
+                version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+                updated_at DATETIME(6) NOT NULL,
+                PRIMARY KEY (table_name, shard)
+            ) ENGINE=InnoDB
+            """,
+        ],
+    ),
+    Migration(
+        version=5,
+        description="Incrementally maintained seller dashboard aggregates",
+        statements=[
+            # Kept current by the order writers (app/services/seller_summary.py).
+            # Revenue and units sold leave out cancelled orders.
+            """
+            CREATE TABLE IF NOT EXISTS seller_summary (
+                sellerid INT PRIMARY KEY,
+                order_count INT NOT NULL DEFAULT 0,
+                pending INT NOT NULL DEFAULT 0,
+                dispatched INT NOT NULL DEFAULT 0,
+                on_the_way INT NOT NULL DEFAULT 0,
+                delivered INT NOT NULL DEFAULT 0,
+                cancelled INT NOT NULL DEFAULT 0,
+                units_sold BIGINT NOT NULL DEFAULT 0,
+                revenue DECIMAL(14, 2) NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB
+            """,
+            SELLER_SUMMARY_BACKFILL,
+        ],
+    ),
+    Migration(
+        version=6,
+        description="Order history pages filtered by status",
+        indexes=[
+            Index("orders", "idx_orders_customer_status", ("customerid", "status", "orderid"), (
+                "OrderService.get_orders_by_customer(status=...) pages",
+            )),
+            Index("orders", "idx_orders_seller_status", ("sellerid", "status", "orderid"), (
+                "OrderService.get_orders_by_seller(status=...) pages",
+                "SellerService.get_seller_orders(status=...) pages",
+            )),
+        ],
+    ),
+]
+
+# Tables the application reads and writes, with the columns it relies on.
+# The core tables come from the dataclasses in app/models/models.py; the
+# rest are owned by the migrations above.
+REQUIRED_COLUMNS = {
+    "customers": [f.name for f in fields(Customer)],
+    "sellers": [f.name for f in fields(Seller)],
+    "categories": [f.name for f in fields(Category)],
+    "subcategories": [f.name for f in fields(SubCategory)],
+    "products": [f.name for f in fields(Product)],
+    "orders": [f.name for f in fields(Order)],
+    "transactions": [f.name for f in fields(Transaction)],
+    "reviews": [f.name for f in fields(Review)],
+    "product_ratings": ["productid", "review_count", "rating_sum", "avg_rating"],
+    "schema_migrations": ["version", "description", "applied_at"],
+    "table_versions": ["table_name", "shard", "version", "updated_at"],
+    "seller_summary": [
+        "sellerid", "order_count", "pending", "dispatched", "on_the_way", "delivered", "cancelled",
+        "units_sold", "revenue", "updated_at",
+    ],
+}
+
+
+class SchemaError(RuntimeError):
+    """The database schema does not match what the application needs."""
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB;
+    """)
+
+
+def _applied_versions(cursor) -> dict:
+    cursor.execute("SELECT version, description, applied_at FROM schema_migrations ORDER BY version")
+    return {row["version"]: row for row in cursor.fetchall()}
+
+
+def _existing_indexes(cursor, table: str) -> dict:
+    """Return {index_name: (col, col, ...)} for one table in the current schema."""
+    cursor.execute("""
+        SELECT index_name AS index_name, column_name AS column_name
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+        ORDER BY index_name, seq_in_index
+    """, (table,))
+    indexes = {}
+    for row in cursor.fetchall():
+        indexes.setdefault(row["index_name"], ())
+        indexes[row["index_name"]] += (row["column_name"],)
+    return indexes
+
+
+def _ensure_index(cursor, index: Index) -> str:
+    """Create or rebuild one index. Returns 'ok', 'created' or 'rebuilt'."""
+    existing = _existing_indexes(cursor, index.table).get(index.name)
+    if existing == tuple(index.columns):
+        return "ok"
+
+    kind = "UNIQUE INDEX" if index.unique else "INDEX"
+    cols = ", ".join(index.columns)
+    if existing is None:
+        cursor.execute(
+            f"ALTER TABLE {index.table} ADD {kind} {index.name} ({cols}), ALGORITHM=INPLACE, LOCK=NONE"
+        )
+        return "created"
+
+    cursor.execute(
+        f"ALTER TABLE {index.table} DROP INDEX {index.name}, ADD {kind} {index.name} ({cols}), "
+        f"ALGORITHM=INPLACE, LOCK=NONE"
+    )
+    return "rebuilt"
+
+
+def migrate(verbose: bool = True) -> list:
+    """Apply pending migrations and repair indexes of applied ones. Returns applied versions."""
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    applied_now = []
+    try:
+        cursor.execute("SELECT GET_LOCK('schema_migrations', 60) AS got")
+        if not cursor.fetchone()["got"]:
+            raise RuntimeError("Could not acquire the schema migration lock.")
+        try:
+            _ensure_migrations_table(cursor)
+            applied = _applied_versions(cursor)
+
+            for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+                pending = migration.version not in applied
+                if pending:
+                    for statement in migration.statements:
+                        cursor.execute(statement)
+
+                for index in migration.indexes:
+                    status = _ensure_index(cursor, index)
+                    if verbose and status != "ok":
+                        print(f"🔧 {index.table}.{index.name} {status}")
+
+                if pending:
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                        (migration.version, migration.description),
+                    )
+                    conn.commit()
+                    applied_now.append(migration.version)
+                    if verbose:
+                        print(f"✅ Migration {migration.version}: {migration.description}")
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('schema_migrations')")
+        return applied_now
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def status() -> list:
+    """Return one row per known migration with its applied timestamp (or None)."""
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        _ensure_migrations_table(cursor)
+        applied = _applied_versions(cursor)
+        return [
+            {
+                "version": m.version,
+                "description": m.description,
+                "applied_at": applied[m.version]["applied_at"] if m.version in applied else None,
+            }
+            for m in sorted(MIGRATIONS, key=lambda m: m.version)
+        ]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def index_report() -> list:
+    """Return every managed index, whether it is present, and which queries it serves."""
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cache = {}
+        rows = []
+        for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+            for index in migration.indexes:
+                if index.table not in cache:
+                    cache[index.table] = _existing_indexes(cursor, index.table)
+                existing = cache[index.table].get(index.name)
+                if existing is None:
+                    state = "missing"
+                elif existing != tuple(index.columns):
+                    state = "mismatch"
+                else:
+                    state = "present"
+                rows.append({
+                    "version": migration.version,
+                    "table": index.table,
+                    "index": index.name,
+                    "columns": list(index.columns),
+                    "state": state,
+                    "serves": list(index.serves),
+                })
+        return rows
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def verify_schema():
+    """Raise SchemaError listing missing tables, columns, indexes or migrations."""
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("""
+            SELECT table_name AS table_name, column_name AS column_name
+            FROM information_schema.columns
+            WHERE table_schema = DATABASE()
+        """)
+        columns = {}
+        for row in cursor.fetchall():
+            columns.setdefault(row["table_name"].lower(), set()).add(row["column_name"].lower())
+
+        problems = []
+        for table, required in REQUIRED_COLUMNS.items():
+            if table not in columns:
+                problems.append(f"missing table {table}")
+                continue
+            missing = [c for c in required if c.lower() not in columns[table]]
+            if missing:
+                problems.append(f"{table} missing columns {', '.join(missing)}")
+
+        if "schema_migrations" in columns:
+            applied = _applied_versions(cursor)
+            pending = [m.version for m in MIGRATIONS if m.version not in applied]
+            if pending:
+                problems.append(f"pending migrations {pending}")
+            for migration in MIGRATIONS:
+                for index in migration.indexes:
+                    if index.table in columns and _existing_indexes(cursor, index.table).get(index.name) != tuple(index.columns):
+                        problems.append(f"index {index.table}.{index.name} missing or changed")
+
+        if problems:
+            raise SchemaError("Database schema check failed: " + "; ".join(problems))
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def bootstrap(auto_migrate: bool = AUTO_MIGRATE):
+    """Startup hook: migrate (unless disabled), then verify the schema once."""
+    if auto_migrate:
+        migrate()
+    verify_schema()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    command = argv[0] if argv else "migrate"
+
+    if command == "migrate":
+        applied = migrate()
+        if not applied:
+            print("✅ Schema is up to date.")
+    elif command == "status":
+        for row in status():
+            mark = "✅" if row["applied_at"] else "⏳"
+            print(f"{mark} {row['version']:>3}  {row['description']}  {row['applied_at'] or 'pending'}")
+    elif command == "report":
+        for row in index_report():
+            print(f"{row['table']}.{row['index']} ({', '.join(row['columns'])}) [{row['state']}]")
+            for query in row["serves"]:
+                print(f"    - {query}")
+    elif command == "verify":
+        verify_schema()
+        print("✅ Schema matches the application.")
+    else:
+        print(f"Unknown command '{command}'. Use migrate, status, report or verify.")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,503 @@
-from app.database.database import SessionLocal
-from app.services.order_service import place_order
-from app.services.seller_service import update_stock
+"""
+Synthetic, reproducible datasets for benchmarking.
 
-db = SessionLocal()
+Fills customers, sellers, categories, subcategories, products, orders,
+transactions and reviews with realistic-looking rows, from a few thousand
+up to tens of millions. The same --seed and counts always produce the same
+rows, apart from the salt of the shared password hash. The database must be
+migrated and empty, unless --reset is given, which truncates these tables
+first.
 
-print(update_stock(db, product_id=1, seller_id=1, new_stock=5))
+    python -m app.demo_data --scale small
+    python -m app.demo_data --scale large --seed 7 --reset
+    python -m app.demo_data --scale xl --reset --method infile
+    python -m app.demo_data --customers 50000 --products 100000 --orders 2000000 --reset
 
-print(place_order(db, customer_id=1, product_id=1, qty=2, amount=149999.0))
+Rows follow the column order of the dataclasses in app/models/models.py.
+They are written with explicit ids, so foreign keys are known without
+reading anything back. Loading runs with foreign-key and unique checks off,
+and the managed secondary indexes are dropped and rebuilt afterwards by the
+migrations. --method insert sends multi-row INSERTs. --method infile streams
+tab-separated files through LOAD DATA LOCAL INFILE, which is faster but
+needs local_infile=ON on the server. When loading finishes, product_ratings
+and seller_summary are rebuilt, table_versions is bumped and every table is
+analyzed.
 
-print(place_order(db, customer_id=1, product_id=1, qty=10, amount=749995.0))
+Every customer's password is DEFAULT_PASSWORD, and customer ids start at
+100000 with phone number PHONE_BASE + customerid. This lets load tests log in
+as any synthetic customer.
+
+Data shape:
+  - Order volume follows a power law, so a small share of products and
+    customers account for most orders.
+  - Orders are spread over the --days before END_DATE in orderid order.
+    Recent orders are still Pending, Dispatched or On The Way; older ones
+    are Delivered or Cancelled.
+  - Each order has one transaction: Completed, or Refunded if the order
+    was cancelled.
+  - Delivered orders are reviewed at --review-rate. Ratings cluster around
+    the product's rating.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+from dataclasses import fields
+from datetime import datetime, timedelta
+
+import pymysql
+from werkzeug.security import generate_password_hash
+
+from app.database.database import DB_CONFIG
+from app.database.migrations import (
+    MIGRATIONS,
+    PRODUCT_RATINGS_BACKFILL,
+    SELLER_SUMMARY_BACKFILL,
+    _existing_indexes,
+    migrate,
+)
+from app.models.models import Category, Customer, Order, Product, Review, Seller, SubCategory, Transaction
+from app.services.table_versions import CATALOG_TABLES, bump
+
+SCALES = {
+    "small": {"customers": 10_000, "sellers": 200, "products": 20_000, "orders": 100_000},
+    "medium": {"customers": 100_000, "sellers": 2_000, "products": 200_000, "orders": 1_000_000},
+    "large": {"customers": 1_000_000, "sellers": 10_000, "products": 1_000_000, "orders": 10_000_000},
+    "xl": {"customers": 5_000_000, "sellers": 50_000, "products": 2_000_000, "orders": 30_000_000},
+}
+
+# Load order; the dataclass gives each table's columns.
+TABLES = {
+    "customers": Customer,
+    "sellers": Seller,
+    "categories": Category,
+    "subcategories": SubCategory,
+    "products": Product,
+    "orders": Order,
+    "transactions": Transaction,
+    "reviews": Review,
+}
+COLUMNS = {table: [f.name for f in fields(cls)] for table, cls in TABLES.items()}
+DERIVED_TABLES = ["product_ratings", "seller_summary"]
+
+FIRST_CUSTOMER_ID = 100000  # customers.AUTO_INCREMENT starts here
+PHONE_BASE = 6_000_000_000
+DEFAULT_PASSWORD = "benchmark123"
+END_DATE = datetime(2025, 11, 7)
+BATCH_SIZE = 5000
+INFILE_ROWS = 1_000_000
+
+# Power-law skew of order volume: the top 10% of products take about
+# 10 ** (-1 / PRODUCT_SKEW) of all orders (46% at 3).
+PRODUCT_SKEW = 3.0
+CUSTOMER_SKEW = 1.5
+
+# category -> subcategory -> (product nouns, lowest price, highest price)
+TAXONOMY = {
+    "Electronics": {
+        "Mobiles": (("smartphone", "phone", "5G phone"), 6999, 149999),
+        "Laptops": (("laptop", "notebook", "ultrabook", "gaming laptop"), 24999, 249999),
+        "TV": (("LED TV", "smart TV", "OLED TV", "QLED TV"), 9999, 299999),
+        "Headphones": (("headphones", "earbuds", "neckband", "headset"), 499, 34999),
+        "Cameras": (("camera", "action camera", "mirrorless camera", "DSLR"), 4999, 199999),
+    },
+    "Home Appliances": {
+        "Fridge": (("refrigerator", "double door fridge", "mini fridge"), 11999, 149999),
+        "Washing Machines": (("washing machine", "front load washer", "top load washer"), 12999, 79999),
+        "Microwaves": (("microwave", "convection oven", "OTG"), 4999, 29999),
+        "Air Conditioners": (("split AC", "window AC", "inverter AC"), 24999, 89999),
+        "Kettles": (("electric kettle", "kettle", "tea maker"), 499, 4999),
+    },
+    "Fashion": {
+        "Shirts": (("shirt", "t-shirt", "polo", "kurta"), 299, 4999),
+        "Jeans": (("jeans", "denim", "chinos", "joggers"), 599, 5999),
+        "Shoes": (("sneakers", "running shoes", "loafers", "sandals"), 499, 14999),
+        "Watches": (("watch", "smartwatch", "chronograph"), 999, 49999),
+        "Bags": (("backpack", "handbag", "laptop bag", "duffel bag"), 399, 9999),
+    },
+    "Home & Kitchen": {
+        "Cookware": (("pressure cooker", "frying pan", "kadai", "cookware set"), 399, 9999),
+        "Furniture": (("office chair", "study table", "bookshelf", "sofa"), 1999, 79999),
+        "Bedding": (("bedsheet", "pillow", "comforter", "mattress"), 299, 29999),
+        "Lighting": (("table lamp", "LED bulb", "ceiling light", "string lights"), 149, 9999),
+        "Storage": (("storage box", "shoe rack", "wardrobe organizer"), 199, 6999),
+    },
+    "Sports": {
+        "Cricket": (("cricket bat", "cricket ball", "batting gloves", "kit bag"), 299, 24999),
+        "Fitness": (("dumbbells", "yoga mat", "treadmill", "resistance band"), 199, 59999),
+        "Cycling": (("bicycle", "cycling helmet", "bike light"), 499, 49999),
+        "Football": (("football", "football boots", "shin guards"), 299, 9999),
+    },
+    "Books": {
+        "Fiction": (("novel", "thriller", "short story collection"), 149, 999),
+        "Non-fiction": (("biography", "self-help book", "history book"), 199, 1499),
+        "Textbooks": (("textbook", "exam guide", "workbook"), 249, 2499),
+        "Comics": (("comic", "graphic novel", "manga volume"), 99, 1999),
+    },
+    "Beauty": {
+        "Skincare": (("face wash", "moisturizer", "sunscreen", "serum"), 149, 2999),
+        "Haircare": (("shampoo", "hair oil", "hair dryer", "straightener"), 99, 7999),
+        "Fragrances": (("perfume", "deodorant", "body mist"), 149, 9999),
+    },
+    "Toys": {
+        "Board Games": (("board game", "chess set", "card game"), 199, 4999),
+        "Building Sets": (("building blocks", "construction set", "robot kit"), 299, 14999),
+        "Puzzles": (("jigsaw puzzle", "puzzle cube", "brain teaser"), 99, 2999),
+    },
+}
+
+BRANDS = ("Acme Nova Zenith Orbit Vertex Lumen Apex Terra Pulse Aura Kraft Nimbus Solace Vivid Atlas "
+          "Boltz Crest Dune Ember Flux Halo Indigo Jade Koru Lyra Monsoon Nilgiri Ozone Prism Quill").split()
+ADJECTIVES = ("classic premium compact portable smart wireless ergonomic lightweight durable elegant "
+              "rugged slim vintage eco deluxe essential pro ultra everyday festive").split()
+COLORS = "black white silver blue red green grey beige navy maroon teal gold".split()
+FEATURES = (
+    "1 year warranty", "easy returns", "energy efficient", "long lasting", "water resistant",
+    "fast charging", "skin friendly", "made in India", "machine washable", "scratch resistant",
+    "ergonomic grip", "premium finish", "travel friendly", "child safe", "easy to clean",
+    "low noise", "high performance", "value for money", "gift ready packaging", "BIS certified",
+)
+REVIEW_COMMENTS = {
+    1: ("stopped working in a week", "not as described", "poor quality, returned it", "waste of money"),
+    2: ("below expectations", "packaging was damaged", "average build quality", "ok for the price, barely"),
+    3: ("decent product", "does the job", "okay, nothing special", "good but delivery was late"),
+    4: ("good value for money", "works well", "happy with the purchase", "nice quality, would recommend"),
+    5: ("excellent!", "phenomenal", "exactly as described, love it", "best purchase this year"),
+}
+
+FIRST_NAMES = ("Aarav Vivaan Aditya Arjun Sai Reyansh Krishna Ishaan Rohan Kabir Ananya Diya Aadhya Saanvi "
+               "Myra Aanya Pari Anika Navya Kiara Rahul Priya Amit Neha Vikram Pooja Suresh Lakshmi Arun "
+               "Meera Rajesh Kavya Nikhil Sneha Manoj Divya Joseph Fatima Imran Gurpreet").split()
+LAST_NAMES = ("Sharma Verma Patel Reddy Nair Menon Iyer Gupta Singh Kumar Das Banerjee Chatterjee Rao "
+              "Joshi Kulkarni Pillai Thomas Mathew Khan Ahmed Gill Sandhu Mehta Shah Desai Naidu Bose "
+              "Mishra Pandey Yadav Chauhan Kapoor Malhotra Fernandes D'Souza").split()
+# state -> (districts, first two pincode digits)
+STATES = {
+    "Kerala": (("Ernakulam", "Thiruvananthapuram", "Kozhikode", "Thrissur", "Kottayam"), 68),
+    "Karnataka": (("Bengaluru Urban", "Mysuru", "Mangaluru", "Hubballi", "Belagavi"), 56),
+    "Tamil Nadu": (("Chennai", "Coimbatore", "Madurai", "Salem", "Tiruchirappalli"), 60),
+    "Maharashtra": (("Mumbai", "Pune", "Nagpur", "Nashik", "Thane"), 40),
+    "Delhi": (("New Delhi", "South Delhi", "North Delhi", "East Delhi"), 11),
+    "West Bengal": (("Kolkata", "Howrah", "Darjeeling", "Siliguri"), 70),
+    "Gujarat": (("Ahmedabad", "Surat", "Vadodara", "Rajkot"), 38),
+    "Uttar Pradesh": (("Lucknow", "Kanpur", "Varanasi", "Noida", "Agra"), 22),
+    "Telangana": (("Hyderabad", "Warangal", "Karimnagar"), 50),
+    "Punjab": (("Ludhiana", "Amritsar", "Jalandhar", "Patiala"), 14),
+}
+HOUSE_NAMES = ("Rose Villa", "Green Park", "Sunrise Apartments", "Lake View", "Shanti Nivas", "Palm Grove",
+               "Heritage Homes", "Silver Oak", "Lotus Residency", "Coral Heights", "Ashirvad", "Sai Krupa")
+STREETS = ("MG Road", "Station Road", "Temple Street", "Church Road", "Gandhi Nagar", "Nehru Street",
+           "Market Road", "College Road", "Main Road", "Ring Road")
+
+
+def customer_rows(rng: random.Random, count: int, password_hash: str):
+    states = list(STATES)
+    for customerid in range(FIRST_CUSTOMER_ID, FIRST_CUSTOMER_ID + count):
+        state = rng.choice(states)
+        districts, pin_prefix = STATES[state]
+        yield (
+            customerid,
+            rng.choice(FIRST_NAMES),
+            rng.choice(LAST_NAMES),
+            str(PHONE_BASE + customerid),
+            password_hash,
+            f"{rng.randint(1, 999)}, {rng.choice(STREETS)}",
+            f"{pin_prefix}{rng.randint(0, 9999):04d}",
+            rng.choice(districts),
+            state,
+            f"{rng.choice(HOUSE_NAMES)} {rng.randint(1, 400)}",
+        )
+
+
+def seller_rows(rng: random.Random, count: int, customers: int):
+    # Each seller is a distinct customer account.
+    for sellerid, offset in enumerate(rng.sample(range(customers), count), 1):
+        yield sellerid, FIRST_CUSTOMER_ID + offset, round(rng.uniform(2.5, 5.0), 1)
+
+
+def category_rows():
+    """(categories, subcategories) rows plus {subcategoryid: (nouns, low, high)}."""
+    categories, subcategories, catalog = [], [], {}
+    for categoryid, (category, subs) in enumerate(TAXONOMY.items(), 1):
+        categories.append((categoryid, category))
+        for name, spec in subs.items():
+            subcategoryid = len(subcategories) + 1
+            subcategories.append((subcategoryid, name, categoryid))
+            catalog[subcategoryid] = spec
+    return categories, subcategories, catalog
+
+
+class Catalog:
+    """Per-product seller, price and rating kept in compact arrays for order generation."""
+
+    def __init__(self):
+        self.seller = array("i")
+        self.price = array("d")
+        self.rating = array("f")
+
+
+def product_rows(rng: random.Random, count: int, sellers: int, catalog: dict, products: Catalog):
+    subcategoryids = list(catalog)
+    for productid in range(1, count + 1):
+        subcategoryid = rng.choice(subcategoryids)
+        nouns, low, high = catalog[subcategoryid]
+        noun = rng.choice(nouns)
+        brand = rng.choice(BRANDS)
+        name = f"{brand} {rng.choice(ADJECTIVES)} {noun} {rng.choice(COLORS)} {rng.randint(100, 9999)}"
+        description = (f"{brand} {noun} with " + ", ".join(rng.sample(FEATURES, rng.randint(2, 5)))
+                       + f". Model {productid}.")
+        # Most products sit at the cheap end of their subcategory's range; ends in 9.
+        price = float(int(low + (high - low) * rng.betavariate(1.5, 5)) // 10 * 10 + 9)
+        rating = round(min(5.0, max(1.0, rng.gauss(3.9, 0.6))), 1)
+        # Catalogue sizes are skewed too: a few big sellers list most products.
+        sellerid = 1 + int(sellers * rng.random() ** 2)
+        products.seller.append(sellerid)
+        products.price.append(price)
+        products.rating.append(rating)
+        yield (
+            productid, name[:255], description[:255], sellerid, subcategoryid, rating,
+            rng.choice((0, 5, 10, 25, 50, 100, 250, 500)) + rng.randint(0, 20),
+            price, f"https://img.example.com/products/{productid}.jpg",
+        )
+
+
+def order_status(rng: random.Random, age_days: float) -> str:
+    if age_days < 2:
+        return rng.choices(("Pending", "Dispatched", "Cancelled"), (75, 20, 5))[0]
+    if age_days < 6:
+        return rng.choices(("Dispatched", "On The Way", "Delivered", "Cancelled"), (25, 45, 25, 5))[0]
+    return rng.choices(("Delivered", "Cancelled"), (93, 7))[0]
+
+
+def order_rows(rng: random.Random, count: int, customers: int, products: Catalog, days: int, review_rate: float):
+    """Yield ("orders" | "transactions" | "reviews", row) for ``count`` orders in time order."""
+    n_products = len(products.seller)
+    start = END_DATE - timedelta(days=days)
+    step = days * 86400 / count
+    random_ = rng.random
+    reviewid = 0
+    for orderid in range(1, count + 1):
+        productid = 1 + int(n_products * random_() ** PRODUCT_SKEW)
+        customerid = FIRST_CUSTOMER_ID + int(customers * random_() ** CUSTOMER_SKEW)
+        sellerid = products.seller[productid - 1]
+        qty = 1 if random_() < 0.8 else rng.randint(2, 4)
+        placed = start + timedelta(seconds=int((orderid - 1 + random_()) * step))
+        status = order_status(rng, (END_DATE - placed).total_seconds() / 86400)
+        yield "orders", (orderid, customerid, productid, sellerid, qty, status)
+        yield "transactions", (
+            orderid, orderid, customerid, round(qty * products.price[productid - 1], 2),
+            "Refunded" if status == "Cancelled" else "Completed", placed,
+        )
+        if status == "Delivered" and random_() < review_rate:
+            reviewid += 1
+            stars = min(5, max(1, round(rng.gauss(products.rating[productid - 1], 0.9))))
+            reviewed = min(END_DATE, placed + timedelta(days=rng.randint(3, 30), seconds=rng.randint(0, 86399)))
+            yield "reviews", (reviewid, productid, customerid, stars, rng.choice(REVIEW_COMMENTS[stars]), reviewed)
+
+
+class InsertLoader:
+    """Buffers rows per table and sends each full buffer as one multi-row INSERT."""
+
+    def __init__(self, conn, batch_size: int = BATCH_SIZE):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.batch_size = batch_size
+        self.buffers = {table: [] for table in TABLES}
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    def add(self, table: str, row: tuple):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table: str):
+        rows = self.buffers[table]
+        if not rows:
+            return
+        marks = "(" + ", ".join(["%s"] * len(rows[0])) + ")"
+        self.cursor.execute(
+            f"INSERT INTO {table} ({', '.join(COLUMNS[table])}) VALUES " + ", ".join([marks] * len(rows)),
+            [v for row in rows for v in row],
+        )
+        self.conn.commit()
+        self.counts[table] += len(rows)
+        self.buffers[table] = []
+
+    def close(self):
+        for table in TABLES:
+            self.flush(table)
+        self.cursor.close()
+
+
+class InfileLoader:
+    """Writes rows to tab-separated temp files and loads each with LOAD DATA LOCAL INFILE.
+
+    A file is loaded and replaced every ``file_rows`` rows, so disk use stays
+    bounded however large the dataset is. Generated text never contains tabs,
+    newlines or backslashes, so it needs no escaping.
+    """
+
+    def __init__(self, conn, file_rows: int = INFILE_ROWS):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.file_rows = file_rows
+        self.files = {}
+        self.pending = dict.fromkeys(TABLES, 0)
+        self.counts = dict.fromkeys(TABLES, 0)
+
+    def add(self, table: str, row: tuple):
+        f = self.files.get(table)
+        if f is None:
+            f = self.files[table] = tempfile.NamedTemporaryFile("w", suffix=f".{table}.tsv", delete=False)
+        f.write("\t".join(map(str, row)) + "\n")
+        self.pending[table] += 1
+        if self.pending[table] >= self.file_rows:
+            self.flush(table)
+
+    def flush(self, table: str):
+        f = self.files.pop(table, None)
+        if f is None:
+            return
+        f.close()
+        try:
+            self.cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(COLUMNS[table])})",
+                (f.name,),
+            )
+            self.conn.commit()
+        finally:
+            os.remove(f.name)
+        self.counts[table] += self.pending[table]
+        self.pending[table] = 0
+
+    def close(self):
+        try:
+            for table in TABLES:
+                self.flush(table)
+        finally:
+            for f in self.files.values():
+                f.close()
+                os.remove(f.name)
+            self.cursor.close()
+
+
+LOADERS = {"insert": InsertLoader, "infile": InfileLoader}
+
+
+def deferred_indexes(cursor) -> list:
+    """Managed secondary indexes on the loaded tables that currently exist."""
+    found = []
+    for migration in MIGRATIONS:
+        for index in migration.indexes:
+            if index.table in TABLES and index.name in _existing_indexes(cursor, index.table):
+                found.append(index)
+    return found
+
+
+def prepare(cursor, reset: bool):
+    if reset:
+        for table in [*TABLES, *DERIVED_TABLES]:
+            cursor.execute(f"TRUNCATE TABLE {table}")
+        return
+    for table in TABLES:
+        cursor.execute(f"SELECT EXISTS (SELECT 1 FROM {table}) AS has_rows")
+        if cursor.fetchone()["has_rows"]:
+            raise SystemExit(f"❌ Table '{table}' is not empty. Pass --reset to replace its rows.")
+
+
+def generate(loader, counts: dict, seed: int, days: int, review_rate: float):
+    rng = random.Random(seed)
+    # Hashing is deliberately slow, so every customer shares one hash.
+    password_hash = generate_password_hash(DEFAULT_PASSWORD)
+    categories, subcategories, catalog = category_rows()
+    products = Catalog()
+    stages = [
+        ("customers", customer_rows(rng, counts["customers"], password_hash)),
+        ("sellers", seller_rows(rng, counts["sellers"], counts["customers"])),
+        ("categories", categories),
+        ("subcategories", subcategories),
+        ("products", product_rows(rng, counts["products"], counts["sellers"], catalog, products)),
+        ("orders", order_rows(rng, counts["orders"], counts["customers"], products, days, review_rate)),
+    ]
+    for stage, rows in stages:
+        started = time.perf_counter()
+        if stage == "orders":
+            for table, row in rows:
+                loader.add(table, row)
+        else:
+            for row in rows:
+                loader.add(stage, row)
+        print(f"  {stage}: generated in {time.perf_counter() - started:.1f}s")
+    loader.close()
+
+
+def finish(cursor, conn):
+    """Rebuild the aggregates, bump validators and refresh optimizer statistics."""
+    cursor.execute(PRODUCT_RATINGS_BACKFILL)
+    cursor.execute(SELLER_SUMMARY_BACKFILL)
+    for table in CATALOG_TABLES:
+        bump(cursor, table)
+    conn.commit()
+    cursor.execute(f"ANALYZE TABLE {', '.join([*TABLES, *DERIVED_TABLES])}")
+    cursor.fetchall()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    for table in SCALES["small"]:
+        parser.add_argument(f"--{table}", type=int, help=f"override the scale's {table} count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=365, help="order history span ending at END_DATE")
+    parser.add_argument("--review-rate", type=float, default=0.15, help="share of delivered orders reviewed")
+    parser.add_argument("--method", choices=list(LOADERS), default="insert")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per INSERT (insert method)")
+    parser.add_argument("--reset", action="store_true", help="truncate the tables before loading")
+    args = parser.parse_args(argv)
+
+    counts = dict(SCALES[args.scale])
+    counts.update({table: getattr(args, table) for table in counts if getattr(args, table) is not None})
+    if counts["sellers"] > counts["customers"] or min(counts.values()) < 1:
+        parser.error("every count must be positive and sellers cannot outnumber customers")
+
+    migrate(verbose=False)
+    conn = pymysql.connect(**DB_CONFIG, local_infile=args.method == "infile")
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    started = time.perf_counter()
+    try:
+        cursor.execute("SET SESSION foreign_key_checks = 0, unique_checks = 0")
+        prepare(cursor, args.reset)
+        dropped = deferred_indexes(cursor)
+        for index in dropped:
+            cursor.execute(f"ALTER TABLE {index.table} DROP INDEX {index.name}")
+        print(f"🌱 Seeding {counts} (seed {args.seed}, {args.method}); {len(dropped)} indexes deferred")
+
+        loader = InsertLoader(conn, args.batch_size) if args.method == "insert" else InfileLoader(conn)
+        generate(loader, counts, args.seed, args.days, args.review_rate)
+        cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        finish(cursor, conn)
+    finally:
+        cursor.close()
+        conn.close()
+    loaded = time.perf_counter() - started
+
+    # The migrations put back every managed index that was dropped above.
+    migrate(verbose=True)
+    total = sum(loader.counts.values())
+    for table, rows in loader.counts.items():
+        print(f"  {table:<14}{rows:>12,}")
+    print(f"✅ {total:,} rows in {loaded:.0f}s ({total / loaded:,.0f} rows/s), "
+          f"indexes rebuilt in {time.perf_counter() - started - loaded:.0f}s.")
+    print(f"   Log in as phone {PHONE_BASE + FIRST_CUSTOMER_ID} .. "
+          f"{PHONE_BASE + FIRST_CUSTOMER_ID + counts['customers'] - 1} with password '{DEFAULT_PASSWORD}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.config.database_env import DB_MODE
+from app.database.database import RequestScopeMiddleware, close_pool, get_pool
+from app.database.migrations import bootstrap
+from app.routes.responses import CompressionMiddleware, FastJSONResponse
+from app.services.catalog_cache import catalog_cache
+from app.services.metrics import CONTENT_TYPE, MetricsMiddleware, registry
+from app.services.profiler import ProfileMiddleware
+from app.services.single_flight import async_flights, flights
+
 from app.routes.customer_router import router as customer_router
 from app.routes.seller_router import router as seller_router
 from app.routes.order_router import router as order_router
 from app.routes.product_router import router as product_router
 from app.routes.category_router import router as category_router
+from app.routes.admin_router import ADMIN_TOKEN, is_admin, router as admin_router
 
 app = FastAPI(
     title="E-Commerce API",
     description="Backend API for customers, sellers, products, categories, and orders (PyMySQL version)",
     version="2.0.0",
+    default_response_class=FastJSONResponse,
 )
 
+app.add_middleware(RequestScopeMiddleware)
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -26,12 +39,46 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Profiling is admin-only, so without ADMIN_TOKEN the middleware is not even mounted.
+if ADMIN_TOKEN:
+    app.add_middleware(ProfileMiddleware, authorize=is_admin)
+# Outermost, so request latency includes compression and CORS handling.
+app.add_middleware(MetricsMiddleware)
+
+if DB_MODE == "async":
+    from app.database.async_database import init_async_pool, close_async_pool
+    from app.routes.async_product_router import router as async_product_router
+    from app.routes.async_order_router import router as async_order_router
+
+    # Included first so the async handlers win over the sync ones on the same paths.
+    app.include_router(async_product_router)
+    app.include_router(async_order_router)
+
+    @app.on_event("startup")
+    async def start_async_pool():
+        await init_async_pool()
+
+    @app.on_event("shutdown")
+    async def stop_async_pool():
+        await close_async_pool()
 
 app.include_router(customer_router)
 app.include_router(seller_router)
 app.include_router(order_router)
 app.include_router(product_router)
 app.include_router(category_router)
+app.include_router(admin_router)
+
+@app.on_event("startup")
+def startup():
+    # Runs once per worker before it accepts traffic. A schema problem raises
+    # here, so the process fails to start instead of failing per request.
+    bootstrap()
+    get_pool().warm()
+
+@app.on_event("shutdown")
+def shutdown():
+    close_pool()
 
 @app.get("/")
 def home():
@@ -51,4 +98,17 @@ def home():
 @app.get("/healthz")
 def health_check():
     """Health check endpoint for Render and load balancers."""
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "mode": DB_MODE,
+        "pool": get_pool().stats(),
+        "catalog_cache": catalog_cache.stats(),
+        "single_flight": {"threads": flights.stats(), "async": async_flights.stats()},
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint: request and SQL histograms plus pool and cache gauges."""
+    gauges = {f"db_pool_{k}": v for k, v in get_pool().stats().items()}
+    gauges.update({f"catalog_cache_{k}": v for k, v in catalog_cache.stats().items()})
+    return Response(registry.render(gauges), media_type=CONTENT_TYPE)
@@ -75,6 +75,15 @@ class Transaction:
         if self.transid is None:
             self.transid = None
 
+@dataclass
+class Review:
+    reviewid: int | None
+    productid: int
+    customerid: int
+    rating: int
+    comment: str
+    created_at: datetime
+
 class DatabaseManager:
     def __init__(self):
         self.conn = pymysql.connect(**DB_CONFIG)
@@ -156,7 +165,7 @@ class DatabaseManager:
         self.conn.close()
 
 if __name__ == "__main__":
-    models = [Customer, Seller, Category, SubCategory, Product, Order, Transaction]
+    models = [Customer, Seller, Category, SubCategory, Product, Order, Transaction, Review]
     db = DatabaseManager()
     db.create_all_tables(models)
     db.close()
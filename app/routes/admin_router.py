@@ -0,0 +1,53 @@
+import os
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.services.profiler import profiles
+from app.services.slow_queries import slow_query_log
+from app.routes.responses import FastJSONRoute
+
+# Diagnostics can expose query parameters, so they sit behind a shared
+# secret sent as X-Admin-Token. Without ADMIN_TOKEN they are switched off.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+
+def is_admin(token: str) -> bool:
+    return bool(ADMIN_TOKEN) and bool(token) and secrets.compare_digest(token, ADMIN_TOKEN)
+
+
+def require_admin(x_admin_token: str = Header("")):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admins only.")
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"], route_class=FastJSONRoute, dependencies=[Depends(require_admin)])
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: int = Query(20, ge=1, le=1000), sort: str = Query("total", pattern="^(total|max|count)$")):
+    return {**slow_query_log.stats(), "queries": slow_query_log.top(limit, sort)}
+
+@router.delete("/slow-queries")
+def clear_slow_queries():
+    slow_query_log.clear()
+    return {"message": "✅ Slow-query log cleared."}
+
+@router.get("/profiles")
+def list_profiles():
+    """Recent request profiles (send X-Profile: 1 with the admin token to record one), newest first."""
+    return {"profiles": profiles.list()}
+
+@router.get("/profiles/{profile_id}")
+def get_profile(profile_id: str):
+    """One profile as collapsed stacks (microseconds), for flamegraph.pl, speedscope or inferno."""
+    profile = profiles.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return PlainTextResponse(profile.collapsed())
+
+@router.delete("/profiles")
+def clear_profiles():
+    profiles.clear()
+    return {"message": "✅ Profiles cleared."}
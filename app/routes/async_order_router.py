@@ -0,0 +1,15 @@
+from fastapi import APIRouter, Depends, HTTPException
+from app.database.async_database import AsyncRequestDB, get_async_db
+from app.services.async_order_service import AsyncOrderService
+from app.routes.responses import FastJSONRoute
+
+# Registered ahead of order_router when DB_MODE=async.
+router = APIRouter(prefix="/orders", tags=["Orders"], route_class=FastJSONRoute)
+
+@router.post("/place")
+async def place_order(customerid: int, productid: int, qty: int, db: AsyncRequestDB = Depends(get_async_db)):
+    service = AsyncOrderService(db)
+    result = await service.place_order(customerid, productid, qty)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from app.database.async_database import AsyncRequestDB, get_async_db
+from app.routes.conditional import PRODUCT_TABLES, conditional_response
+from app.services.async_product_service import AsyncProductService
+from app.services.product_service import DEFAULT_PAGE_SIZE
+from app.services.table_versions import async_table_validators
+from app.routes.responses import FastJSONRoute
+
+# Registered ahead of product_router when DB_MODE=async, so these handlers
+# shadow the threadpool versions of the same paths.
+router = APIRouter(prefix="/products", tags=["Products & Categories"], route_class=FastJSONRoute)
+
+@router.get("/")
+async def list_products(
+    request: Request,
+    response: Response,
+    subcategoryid: int = None,
+    after: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    sort: str = "id",
+    db: AsyncRequestDB = Depends(get_async_db),
+):
+    """
+    List products one keyset page at a time (optionally by subcategory).
+    """
+    validators = await async_table_validators(PRODUCT_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = AsyncProductService(db)
+    result = await service.list_products(subcategoryid, after, limit, sort, validators["etag"])
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/{productid:int}")
+async def get_product(productid: int, request: Request, response: Response, db: AsyncRequestDB = Depends(get_async_db)):
+    """
+    Retrieve a single product by its ID.
+    """
+    validators = await async_table_validators(PRODUCT_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = AsyncProductService(db)
+    product = await service.get_product(productid, validators["etag"])
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found.")
+    return product
@@ -1,53 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlalchemy.orm import Session
-from app.database.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from app.database.database import RequestDB, get_db
+from app.routes.conditional import CATEGORY_TABLES, SUBCATEGORY_TABLES, conditional_response
+from app.services.table_versions import table_validators
 from app.services.category_service import CategoryService
+from app.routes.responses import FastJSONRoute
 
-router = APIRouter(prefix="/categories", tags=["Categories"])
+router = APIRouter(prefix="/categories", tags=["Categories"], route_class=FastJSONRoute)
 ADMIN_ID = 100002
 
 @router.post("/add")
-def add_category(name: str, request: Request):
+def add_category(name: str, request: Request, db: RequestDB = Depends(get_db)):
     customer_id = int(request.query_params.get("customerid", 0))
     if customer_id != ADMIN_ID:
         raise HTTPException(status_code=403, detail="Admins only.")
 
-    service = CategoryService()
+    service = CategoryService(db)
     result = service.add_category(name)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 @router.get("/")
-def get_all_categories():
-    service = CategoryService()
-    return service.get_all_categories()
+def get_all_categories(request: Request, response: Response, db: RequestDB = Depends(get_db)):
+    validators = table_validators(CATEGORY_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = CategoryService(db)
+    return service.get_all_categories(validators["etag"])
 
 @router.put("/update/{category_id}")
-def update_category(category_id: int, new_name: str):
-    service = CategoryService()
+def update_category(category_id: int, new_name: str, db: RequestDB = Depends(get_db)):
+    service = CategoryService(db)
     result = service.update_category(category_id, new_name)
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
     return result
 
 @router.delete("/delete/{category_id}")
-def delete_category(category_id: int):
-    service = CategoryService()
+def delete_category(category_id: int, db: RequestDB = Depends(get_db)):
+    service = CategoryService(db)
     result = service.delete_category(category_id)
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
     return result
 
 @router.post("/{category_id}/subcategories/add")
-def add_subcategory(category_id: int, name: str):
-    service = CategoryService()
+def add_subcategory(category_id: int, name: str, db: RequestDB = Depends(get_db)):
+    service = CategoryService(db)
     result = service.add_subcategory(category_id, name)
     if "error" in result:
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 @router.get("/{category_id}/subcategories")
-def get_subcategories(category_id: int):
-    service = CategoryService()
-    return service.get_subcategories_by_category(category_id)
+def get_subcategories(category_id: int, request: Request, response: Response, db: RequestDB = Depends(get_db)):
+    validators = table_validators(SUBCATEGORY_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = CategoryService(db)
+    return service.get_subcategories_by_category(category_id, validators["etag"])
@@ -0,0 +1,52 @@
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+# Tables each catalog response is built from; their version counters
+# (app/services/table_versions.py) become the ETag and Last-Modified.
+PRODUCT_TABLES = ("products", "product_ratings")
+CATEGORY_TABLES = ("categories",)
+SUBCATEGORY_TABLES = ("subcategories",)
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: "W/" prefixes do not matter for GET revalidation.
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in if_none_match.split(","))
+
+
+def _not_modified_since(if_modified_since: str, last_modified) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified <= since
+
+
+def conditional_response(request: Request, response: Response, validators: dict):
+    """Attach ETag / Last-Modified to ``response``.
+
+    Return a 304 response when the client's copy is still current, else
+    None and the handler builds the body as usual. If-None-Match wins over
+    If-Modified-Since when both are sent.
+    """
+    headers = {"ETag": validators["etag"], "Cache-Control": "no-cache"}
+    last_modified = validators["last_modified"]
+    if last_modified is not None:
+        # HTTP dates have one-second resolution.
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _etag_matches(if_none_match, validators["etag"])
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        fresh = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since, last_modified))
+    return Response(status_code=304, headers=headers) if fresh else None
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from app.services.customer_service import CustomerService
+from app.routes.responses import FastJSONRoute
 
-router = APIRouter(prefix="/customers", tags=["Customers"])
+router = APIRouter(prefix="/customers", tags=["Customers"], route_class=FastJSONRoute)
 
 @router.post("/register")
 def register_customer(
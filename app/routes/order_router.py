@@ -1,7 +1,11 @@
-from fastapi import APIRouter, HTTPException
-from app.services.order_service import OrderService
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from app.database.database import RequestDB, get_db
+from app.services.order_service import DEFAULT_HISTORY_SIZE, OrderService
+from app.routes.responses import EXPORT_FORMAT, FastJSONRoute, ndjson_response
 
-router = APIRouter(prefix="/orders", tags=["Orders"])
+router = APIRouter(prefix="/orders", tags=["Orders"], route_class=FastJSONRoute)
 
 @router.post("/place")
 def place_order(customerid: int, productid: int, qty: int):
@@ -11,6 +15,26 @@ def place_order(customerid: int, productid: int, qty: int):
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+class CheckoutItem(BaseModel):
+    productid: int
+    qty: int = 1
+
+class CheckoutRequest(BaseModel):
+    customerid: int
+    items: list[CheckoutItem]
+
+@router.post("/checkout")
+def checkout(payload: CheckoutRequest, db: RequestDB = Depends(get_db)):
+    """
+    Places the whole cart in one transaction: every line becomes an order with
+    its payment, or nothing is written.
+    """
+    service = OrderService(db)
+    result = service.checkout(payload.customerid, [(item.productid, item.qty) for item in payload.items])
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.get("/{orderid}")
 def get_order_details(orderid: int):
     service = OrderService()
@@ -20,19 +44,46 @@ def get_order_details(orderid: int):
     return result
 
 @router.get("/customer/{customerid}")
-def get_orders_by_customer(customerid: int):
-    service = OrderService()
-    result = service.get_orders_by_customer(customerid)
+def get_orders_by_customer(
+    customerid: int,
+    status: str = None,
+    date_from: date = None,
+    date_to: date = None,
+    after: str = None,
+    limit: int = DEFAULT_HISTORY_SIZE,
+    db: RequestDB = Depends(get_db),
+):
+    """
+    The customer's orders newest first, one keyset page at a time, each with its transaction.
+    Filter by status and/or payment date (inclusive); pass next_cursor back as `after`.
+    """
+    service = OrderService(db)
+    result = service.get_orders_by_customer(customerid, status, date_from, date_to, after, limit)
     if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
+        raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 @router.get("/seller/{sellerid}")
-def get_orders_by_seller(sellerid: int):
-    service = OrderService()
-    result = service.get_orders_by_seller(sellerid)
+def get_orders_by_seller(
+    sellerid: int,
+    status: str = None,
+    date_from: date = None,
+    date_to: date = None,
+    after: str = None,
+    limit: int = DEFAULT_HISTORY_SIZE,
+    format: str = Query("json", pattern=EXPORT_FORMAT),
+    db: RequestDB = Depends(get_db),
+):
+    """
+    The seller's orders newest first, paged and filtered like /orders/customer/{customerid}.
+    format=ndjson streams every order instead, one JSON object per line.
+    """
+    service = OrderService(db)
+    if format == "ndjson":
+        return ndjson_response(service.stream_orders_by_seller(sellerid))
+    result = service.get_orders_by_seller(sellerid, status, date_from, date_to, after, limit)
     if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
+        raise HTTPException(status_code=400, detail=result["error"])
     return result
 
 @router.put("/{orderid}/status")
@@ -68,8 +119,13 @@ def create_transaction(orderid: int, amount: float, status: str = "Completed"):
     return result
 
 @router.get("/transactions/{customerid}")
-def get_customer_transactions(customerid: int):
+def get_customer_transactions(customerid: int, format: str = Query("json", pattern=EXPORT_FORMAT)):
+    """
+    format=ndjson streams every transaction, one JSON object per line.
+    """
     service = OrderService()
+    if format == "ndjson":
+        return ndjson_response(service.stream_transactions_by_customer(customerid))
     result = service.get_transactions_by_customer(customerid)
     if "error" in result:
         raise HTTPException(status_code=404, detail=result["error"])
@@ -1,27 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+import io
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile
 from pydantic import BaseModel
 from fastapi import Body
-from sqlalchemy.orm import Session
-from app.database.database import get_db
-from app.services.product_service import ProductService
+from app.database.database import RequestDB, get_db
+from app.routes.conditional import CATEGORY_TABLES, PRODUCT_TABLES, SUBCATEGORY_TABLES, conditional_response
+from app.services.table_versions import table_validators
+from app.services.product_service import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ProductService
+from app.services.product_import import ProductImportService, detect_format
 from app.services.category_service import CategoryService
+from app.services.review_service import ReviewService
+from app.routes.responses import FastJSONRoute, ndjson_response
 
-router = APIRouter(prefix="/products", tags=["Products & Categories"])
+router = APIRouter(prefix="/products", tags=["Products & Categories"], route_class=FastJSONRoute)
 
 @router.get("/categories")
-def list_categories():
-    service = CategoryService()
-    return service.get_all_categories()
+def list_categories(request: Request, response: Response, db: RequestDB = Depends(get_db)):
+    validators = table_validators(CATEGORY_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = CategoryService(db)
+    return service.get_all_categories(validators["etag"])
 
 @router.get("/categories/{categoryid}/subcategories")
-def list_subcategories(categoryid: int):
-    service = CategoryService()
-    return service.get_subcategories_by_category(categoryid)
+def list_subcategories(categoryid: int, request: Request, response: Response, db: RequestDB = Depends(get_db)):
+    validators = table_validators(SUBCATEGORY_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = CategoryService(db)
+    return service.get_subcategories_by_category(categoryid, validators["etag"])
 
 @router.post("/category/add")
-def add_category(name: str, db: Session = Depends(get_db)):
+def add_category(name: str, db: RequestDB = Depends(get_db)):
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.add_category(name)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -30,9 +43,9 @@ def add_category(name: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/category/{categoryid}")
-def update_category(categoryid: int, new_name: str, db: Session = Depends(get_db)):
+def update_category(categoryid: int, new_name: str, db: RequestDB = Depends(get_db)):
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.update_category(categoryid, new_name)
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -41,9 +54,9 @@ def update_category(categoryid: int, new_name: str, db: Session = Depends(get_db
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/category/{categoryid}")
-def delete_category(categoryid: int, db: Session = Depends(get_db)):
+def delete_category(categoryid: int, db: RequestDB = Depends(get_db)):
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.delete_category(categoryid)
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -52,9 +65,9 @@ def delete_category(categoryid: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/subcategory/add")
-def add_subcategory(name: str, categoryid: int, db: Session = Depends(get_db)):
+def add_subcategory(name: str, categoryid: int, db: RequestDB = Depends(get_db)):
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.add_subcategory(name, categoryid)
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -63,9 +76,9 @@ def add_subcategory(name: str, categoryid: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.put("/subcategory/{subcategoryid}")
-def update_subcategory(subcategoryid: int, new_name: str, db: Session = Depends(get_db)):
+def update_subcategory(subcategoryid: int, new_name: str, db: RequestDB = Depends(get_db)):
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.update_subcategory(subcategoryid, new_name)
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -74,9 +87,9 @@ def update_subcategory(subcategoryid: int, new_name: str, db: Session = Depends(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/subcategory/{subcategoryid}")
-def delete_subcategory(subcategoryid: int, db: Session = Depends(get_db)):
+def delete_subcategory(subcategoryid: int, db: RequestDB = Depends(get_db)):
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.delete_subcategory(subcategoryid)
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -85,13 +98,17 @@ def delete_subcategory(subcategoryid: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/subcategories")
-def list_subcategories(categoryid: int = None, db: Session = Depends(get_db)):
-    service = ProductService()
-    return service.list_subcategories(categoryid)
+def list_subcategories(request: Request, response: Response, categoryid: int = None, db: RequestDB = Depends(get_db)):
+    validators = table_validators(SUBCATEGORY_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = ProductService(db)
+    return service.list_subcategories(categoryid, validators["etag"])
 
 @router.get("/categories/{categoryid}/subcategories")
-def list_subcategories_for_category(categoryid: int):
-    service = ProductService()
+def list_subcategories_for_category(categoryid: int, db: RequestDB = Depends(get_db)):
+    service = ProductService(db)
     return service.list_subcategories(categoryid)
 
 class ProductCreate(BaseModel):
@@ -105,12 +122,12 @@ class ProductCreate(BaseModel):
     rating: float = 0.0
 
 @router.post("/add")
-def add_product(payload: ProductCreate):
+def add_product(payload: ProductCreate, db: RequestDB = Depends(get_db)):
     """
     Adds a new product linked to an existing seller and subcategory.
     """
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.add_product(
             payload.sellerid,
             payload.product_name,
@@ -127,19 +144,73 @@ def add_product(payload: ProductCreate):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.post("/import")
+def import_products(
+    file: UploadFile = File(...),
+    format: str = None,
+    sellerid: int = None,
+    dry_run: bool = False,
+    db: RequestDB = Depends(get_db),
+):
+    """
+    Bulk-add products from a CSV or NDJSON upload (format defaults to the file extension).
+    Pass sellerid to assign every row to one seller. Returns counts and per-line errors.
+    """
+    service = ProductImportService(db)
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    result = service.import_lines(lines, format or detect_format(file.filename), sellerid, dry_run)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/ratings")
+def get_ratings(ids: str, db: RequestDB = Depends(get_db)):
+    """
+    Review aggregates for many products at once: /products/ratings?ids=1,2,3
+    """
+    try:
+        productids = list(dict.fromkeys(int(x) for x in ids.split(",") if x.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of product ids")
+    if len(productids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    service = ReviewService(db)
+    return service.get_ratings(productids)
+
+@router.get("/search")
+def search_products(keyword: str, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE, db: RequestDB = Depends(get_db)):
+    """
+    Ranked search over product name and description.
+    Pass next_offset back as `offset` to get the following page.
+    """
+    service = ProductService(db)
+    result = service.search_products(keyword, offset, limit)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
+@router.get("/export")
+def export_products(subcategoryid: int = None):
+    """
+    The whole catalog (or one subcategory) as NDJSON, one product per line.
+    Streamed from the database, so it suits feeds and offline jobs.
+    """
+    service = ProductService()
+    return ndjson_response(service.stream_products(subcategoryid))
+
 @router.put("/{productid}")
 def update_product(
     productid: int,
     description: str = None,
     stock: int = None,
     rating: float = None,
-    db: Session = Depends(get_db),
+    db: RequestDB = Depends(get_db),
 ):
     """
     Update product details like description, stock, or rating.
     """
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.update_product(productid, description, stock, rating)
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -148,12 +219,12 @@ def update_product(
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.delete("/{productid}")
-def delete_product(productid: int, db: Session = Depends(get_db)):
+def delete_product(productid: int, db: RequestDB = Depends(get_db)):
     """
     Delete a product by ID.
     """
     try:
-        service = ProductService()
+        service = ProductService(db)
         result = service.delete_product(productid)
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
@@ -162,13 +233,17 @@ def delete_product(productid: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{productid}")
-def get_product(productid: int, db: Session = Depends(get_db)):
+def get_product(productid: int, request: Request, response: Response, db: RequestDB = Depends(get_db)):
     """
     Retrieve a single product by its ID.
     """
     try:
-        service = ProductService()
-        product = service.get_product(productid)
+        validators = table_validators(PRODUCT_TABLES, db)
+        not_modified = conditional_response(request, response, validators)
+        if not_modified:
+            return not_modified
+        service = ProductService(db)
+        product = service.get_product(productid, validators["etag"])
         if not product:
             raise HTTPException(status_code=404, detail="Product not found.")
         return product
@@ -176,16 +251,15 @@ def get_product(productid: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/{productid}/reviews")
-def get_product_reviews(productid: int, page: int = 1, per_page: int = 10):
+def get_product_reviews(productid: int, page: int = 1, per_page: int = 10, db: RequestDB = Depends(get_db)):
     try:
-        from app.services.review_service import ReviewService
-        svc = ReviewService()
+        svc = ReviewService(db)
         return svc.get_reviews(productid, page, per_page)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.post("/{productid}/review")
-def post_product_review(productid: int, payload: dict = Body(...)):
+def post_product_review(productid: int, payload: dict = Body(...), db: RequestDB = Depends(get_db)):
     """Accepts JSON body: { customerid: int, rating: int, comment: str }
     This is intentionally generic (dict) to avoid adding new Pydantic models in many files.
     """
@@ -196,8 +270,7 @@ def post_product_review(productid: int, payload: dict = Body(...)):
         if customerid is None or rating is None:
             raise HTTPException(status_code=400, detail='customerid and rating are required in the body')
 
-        from app.services.review_service import ReviewService
-        svc = ReviewService()
+        svc = ReviewService(db)
         result = svc.add_review(productid, int(customerid), int(rating), str(comment))
         if "error" in result:
             raise HTTPException(status_code=400, detail=result["error"])
@@ -208,17 +281,26 @@ def post_product_review(productid: int, payload: dict = Body(...)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/")
-def list_products(subcategoryid: int = None, db: Session = Depends(get_db)):
-    """
-    List all products (or only by subcategory if provided).
-    """
-    service = ProductService()
-    return service.list_products(subcategoryid)
-
-@router.get("/search")
-def search_products(keyword: str, db: Session = Depends(get_db)):
+def list_products(
+    request: Request,
+    response: Response,
+    subcategoryid: int = None,
+    after: str = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    sort: str = "id",
+    db: RequestDB = Depends(get_db),
+):
     """
-    Search products by name or description.
+    List products one keyset page at a time (optionally by subcategory).
+    sort: id (default), newest, price (low to high) or rating (high to low).
+    Pass the returned next_cursor as `after` to get the following page.
     """
-    service = ProductService()
-    return service.search_products(keyword)
+    validators = table_validators(PRODUCT_TABLES, db)
+    not_modified = conditional_response(request, response, validators)
+    if not_modified:
+        return not_modified
+    service = ProductService(db)
+    result = service.list_products(subcategoryid, after, limit, sort, validators["etag"])
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
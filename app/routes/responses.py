@@ -0,0 +1,274 @@
+import asyncio
+import datetime
+import decimal
+import functools
+import gzip
+import inspect
+import json
+import zlib
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.services import profiler
+
+try:
+    import orjson
+except ImportError:  # plain json still works, just slower
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # MessagePack is only offered when installed
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+MSGPACK = "application/msgpack"
+NDJSON = "application/x-ndjson"
+# ?format= values accepted by list endpoints that can also stream NDJSON.
+EXPORT_FORMAT = "^(json|ndjson)$"
+COMPRESS_MIN_SIZE = 1024
+# Chosen for a small single-CPU instance: on a 3.7 MB listing gzip 5 is
+# ~30% faster than 6 for 4% more bytes; brotli 4 beats both on speed.
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+COMPRESSIBLE_TYPES = ("application/json", NDJSON, MSGPACK, "text/")
+
+
+def _default(obj):
+    """Encode what PyMySQL hands back that JSON/MessagePack cannot, as jsonable_encoder did."""
+    if isinstance(obj, decimal.Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def dumps_json(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps_msgpack(content) -> bytes:
+    return msgpack.packb(content, default=_default, datetime=False)
+
+
+def wants_msgpack(accept: str) -> bool:
+    return msgpack is not None and MSGPACK in accept
+
+
+class FastJSONResponse(Response):
+    """Serializes service-layer dicts directly (orjson when available).
+
+    Clients sending ``Accept: application/msgpack`` get the same content as
+    MessagePack instead.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, content=None, status_code: int = 200, headers=None, media_type=None, background=None):
+        self.content = content
+        super().__init__(content, status_code, headers, media_type, background)
+        self.headers.add_vary_header("Accept")
+
+    def render(self, content) -> bytes:
+        return dumps_json(content)
+
+    async def __call__(self, scope, receive, send):
+        if wants_msgpack(Headers(scope=scope).get("accept", "")):
+            self.body = dumps_msgpack(self.content)
+            self.headers["content-length"] = str(len(self.body))
+            self.headers["content-type"] = MSGPACK
+        await super().__call__(scope, receive, send)
+
+
+def ndjson_chunks(batches):
+    """Encode each batch of rows as one chunk of NDJSON lines."""
+    try:
+        for rows in batches:
+            yield b"".join(dumps_json(row) + b"\n" for row in rows)
+    finally:
+        batches.close()
+
+
+async def _close_when_done(chunks):
+    # Close the generator ourselves, off the event loop, when the client
+    # disconnects mid-stream: it releases the database connection.
+    try:
+        async for chunk in iterate_in_threadpool(chunks):
+            yield chunk
+    finally:
+        await run_in_threadpool(chunks.close)
+
+
+def ndjson_response(batches) -> StreamingResponse:
+    """Stream ``batches`` (a generator of row lists, e.g. ``stream_rows``) as NDJSON, one row per line.
+
+    Each batch is encoded and sent as one chunk, so only a batch is ever held
+    in memory.
+    """
+    return StreamingResponse(_close_when_done(ndjson_chunks(batches)), media_type=NDJSON)
+
+
+def _fast_endpoint(endpoint, status_code: int = None):
+    """Wrap ``endpoint`` so plain return values skip jsonable_encoder and
+    become a FastJSONResponse, keeping headers set on an injected Response."""
+    response_params = [
+        name for name, param in inspect.signature(endpoint).parameters.items() if param.annotation is Response
+    ]
+
+    def finish(result, kwargs):
+        if isinstance(result, Response):
+            return result
+        response = FastJSONResponse(result, status_code=status_code or 200)
+        for name in response_params:
+            sub = kwargs.get(name)
+            if sub is not None:
+                response.raw_headers.extend(sub.raw_headers)
+                if sub.status_code:
+                    response.status_code = sub.status_code
+        return response
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            return finish(await endpoint(*args, **kwargs), kwargs)
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            if profiler.running:
+                return profiler.run_profiled(lambda: finish(endpoint(*args, **kwargs), kwargs))
+            return finish(endpoint(*args, **kwargs), kwargs)
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """APIRoute whose handlers answer with FastJSONResponse.
+
+    Use as ``APIRouter(route_class=FastJSONRoute)``. Routes with a
+    response_model keep FastAPI's validating serializer.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if kwargs.get("response_model") is None:
+            endpoint = _fast_endpoint(endpoint, kwargs.get("status_code"))
+        super().__init__(path, endpoint, **kwargs)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._c = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._flush = self._c.flush
+            self._finish = self._c.finish
+            self.compress = self._c.process
+        else:
+            self._c = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._flush = lambda: self._c.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._c.flush
+            self.compress = self._c.compress
+
+    def chunk(self, data: bytes, more: bool) -> bytes:
+        # Flush every chunk so streamed responses stay incremental.
+        return self.compress(data) + (self._flush() if more else self._finish())
+
+
+def compress_body(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def negotiate_encoding(accept_encoding: str):
+    offered = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip, as the client accepts.
+
+    Whole bodies under ``minimum_size`` bytes go out as is. Streamed bodies
+    are compressed chunk by chunk. Only text-like and MessagePack content
+    types are touched. Responses that already carry a Content-Encoding are
+    left alone.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=list(start["headers"]))
+            start["headers"] = headers.raw
+            body = message.get("body", b"")
+            more = message.get("more_body", False)
+
+            if compressor is None:
+                content_type = headers.get("content-type", "")
+                if (
+                    "content-encoding" in headers
+                    or start["status"] in (204, 304)
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)
+                    or (not more and len(body) < self.minimum_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["content-encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if not more:
+                    body = compress_body(body, encoding)
+                    headers["content-length"] = str(len(body))
+                    await send(start)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                del headers["content-length"]
+                compressor = _StreamCompressor(encoding)
+                await send(start)
+
+            await send({"type": "http.response.body", "body": compressor.chunk(body, more), "more_body": more})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException
+import io
+from datetime import date
+from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from pydantic import BaseModel
+from app.services.order_service import DEFAULT_HISTORY_SIZE
+from app.services.product_import import ProductImportService, detect_format
 from app.services.seller_service import SellerService
+from app.routes.responses import EXPORT_FORMAT, FastJSONRoute, ndjson_response
 
-router = APIRouter(prefix="/sellers", tags=["Sellers"])
+router = APIRouter(prefix="/sellers", tags=["Sellers"], route_class=FastJSONRoute)
 
 @router.post("/register")
 def register_seller(customerid: int, rating: float = 0.0):
@@ -27,6 +33,17 @@ def get_seller(sellerid: int):
         raise HTTPException(status_code=404, detail=result["error"])
     return result
 
+@router.get("/{sellerid}/summary")
+def get_seller_summary(sellerid: int):
+    """
+    Revenue, units sold and order counts per status, maintained as orders change.
+    """
+    service = SellerService()
+    result = service.get_seller_summary(sellerid)
+    if "error" in result:
+        raise HTTPException(status_code=404, detail=result["error"])
+    return result
+
 @router.get("/customer/{customerid}")
 def get_seller_by_customer(customerid: int):
     service = SellerService()
@@ -43,6 +60,27 @@ def update_product_stock(sellerid: int, productid: int, new_stock: int):
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+class InventoryItem(BaseModel):
+    productid: int
+    stock: int | None = None
+    stock_delta: int | None = None
+    price: float | None = None
+
+class InventoryUpdate(BaseModel):
+    items: list[InventoryItem]
+
+@router.put("/{sellerid}/inventory")
+def bulk_update_inventory(sellerid: int, payload: InventoryUpdate):
+    """
+    Restock and reprice many products in one request: each item sets `stock` or
+    adds `stock_delta`, and/or sets `price`. All items are applied or none.
+    """
+    service = SellerService()
+    result = service.bulk_update_inventory(sellerid, [item.model_dump() for item in payload.items])
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.post("/{sellerid}/product/add")
 def add_product(sellerid: int, description: str, subcategoryid: int, stock: int, rating: float = 0.0):
     service = SellerService()
@@ -51,6 +89,18 @@ def add_product(sellerid: int, description: str, subcategoryid: int, stock: int,
         raise HTTPException(status_code=400, detail=result["error"])
     return result
 
+@router.post("/{sellerid}/products/import")
+def import_products(sellerid: int, file: UploadFile = File(...), format: str = None, dry_run: bool = False):
+    """
+    Bulk-add this seller's products from a CSV or NDJSON upload; rows need no sellerid column.
+    """
+    service = ProductImportService()
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    result = service.import_lines(lines, format or detect_format(file.filename), sellerid, dry_run)
+    if "error" in result:
+        raise HTTPException(status_code=400, detail=result["error"])
+    return result
+
 @router.put("/{sellerid}/product/{productid}")
 def update_product(sellerid: int, productid: int, description: str = None, subcategoryid: int = None, rating: float = None):
     service = SellerService()
@@ -76,9 +126,24 @@ def update_order_status(sellerid: int, orderid: int, new_status: str):
     return result
 
 @router.get("/{sellerid}/orders")
-def view_orders(sellerid: int):
+def view_orders(
+    sellerid: int,
+    status: str = None,
+    date_from: date = None,
+    date_to: date = None,
+    after: str = None,
+    limit: int = DEFAULT_HISTORY_SIZE,
+    format: str = Query("json", pattern=EXPORT_FORMAT),
+):
+    """
+    Dashboard rows for the seller's orders newest first, one keyset page at a time.
+    Filter by status and/or payment date (inclusive); pass next_cursor back as `after`.
+    format=ndjson streams every order instead, one JSON object per line.
+    """
     service = SellerService()
-    result = service.get_seller_orders(sellerid)
+    if format == "ndjson":
+        return ndjson_response(service.stream_seller_orders(sellerid))
+    result = service.get_seller_orders(sellerid, status, date_from, date_to, after, limit)
     if "error" in result:
-        raise HTTPException(status_code=404, detail=result["error"])
+        raise HTTPException(status_code=400, detail=result["error"])
     return result
@@ -0,0 +1,62 @@
+from datetime import datetime
+from app.database.async_database import AsyncRequestDB
+from app.services.catalog_cache import catalog_cache, product_changed
+from app.services.order_service import PLACE_ORDER_LOOKUP, RESERVE_STOCK
+from app.services.seller_summary import placed_statement
+from app.services.table_versions import bump_statement
+
+class AsyncOrderService:
+    """Async (aiomysql) version of order placement, used when DB_MODE=async."""
+
+    def __init__(self, db: AsyncRequestDB):
+        self.db = db
+
+    async def place_order(self, customerid: int, productid: int, qty: int):
+        if qty < 1:
+            return {"error": "❌ Quantity must be at least 1"}
+
+        conn = await self.db.connection()
+        await conn.begin()
+        try:
+            async with conn.cursor() as cursor:
+                await cursor.execute(PLACE_ORDER_LOOKUP, (productid, customerid))
+                product = await cursor.fetchone()
+                if not product:
+                    await conn.rollback()
+                    return {"error": "❌ Customer not found"}
+                if product["productid"] is None:
+                    await conn.rollback()
+                    return {"error": "❌ Product not found"}
+                if product["stock"] < qty:
+                    await conn.rollback()
+                    return {"error": f"❌ Not enough stock for '{product['description']}' (Available: {product['stock']})"}
+
+                await cursor.execute(RESERVE_STOCK, (qty, productid, qty))
+                if cursor.rowcount == 0:
+                    await conn.rollback()
+                    await cursor.execute("SELECT stock FROM products WHERE productid = %s", (productid,))
+                    available = ((await cursor.fetchone()) or {}).get("stock", 0)
+                    return {"error": f"❌ Not enough stock for '{product['description']}' (Available: {available})"}
+
+                await cursor.execute("""
+                    INSERT INTO orders (customerid, productid, sellerid, qty, status)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (customerid, productid, product["sellerid"], qty, "Pending"))
+                orderid = cursor.lastrowid
+
+                amount = float(qty * product["price"])
+                await cursor.execute("""
+                    INSERT INTO transactions (orderid, customerid, amount, status, transDate)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, (orderid, customerid, amount, "Completed", datetime.utcnow()))
+                summary = placed_statement([(product["sellerid"], qty, amount)])
+                if summary:
+                    await cursor.execute(*summary)
+                await cursor.execute(*bump_statement("products", productid))
+
+            await conn.commit()
+            catalog_cache.invalidate(*product_changed(productid))
+            return {"message": f"✅ Order {orderid} placed successfully. Payment of ₹{amount:.2f} completed."}
+        except Exception as e:
+            await conn.rollback()
+            return {"error": str(e)}
@@ -0,0 +1,39 @@
+from app.database.async_database import AsyncRequestDB
+from app.services.catalog_cache import catalog_cache, product_tag
+from app.services.product_service import (
+    DEFAULT_PAGE_SIZE, PRODUCT_SELECT, product_page, product_page_key, product_page_query, product_page_tags,
+)
+
+class AsyncProductService:
+    """Async (aiomysql) versions of the hot product reads, used when DB_MODE=async."""
+
+    def __init__(self, db: AsyncRequestDB):
+        self.db = db
+
+    async def get_product(self, productid: int, version: str = None):
+        """Return a single product by id (dict) or None if not found."""
+        async def load():
+            conn = await self.db.connection()
+            async with conn.cursor() as cursor:
+                await cursor.execute(PRODUCT_SELECT + " WHERE p.productid = %s", (productid,))
+                return await cursor.fetchone()
+
+        return await catalog_cache.get_or_load_async(("product", productid, version), load, (product_tag(productid),))
+
+    async def list_products(self, subcategoryid: int = None, after: str = None, limit: int = DEFAULT_PAGE_SIZE, sort: str = "id",
+                            version: str = None):
+        query = product_page_query(subcategoryid, after, limit, sort)
+        if "error" in query:
+            return query
+
+        async def load():
+            conn = await self.db.connection()
+            async with conn.cursor() as cursor:
+                await cursor.execute(query["sql"], query["params"])
+                return product_page(await cursor.fetchall(), limit, sort)
+
+        return await catalog_cache.get_or_load_async(
+            product_page_key(subcategoryid, after, limit, sort, version),
+            load,
+            lambda page: product_page_tags(subcategoryid, page),
+        )
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.services.single_flight import async_flights, flights
+
+MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_SIZE", "10000"))
+TTL_SECONDS = float(os.getenv("CATALOG_CACHE_TTL", "30"))
+NEGATIVE_TTL_SECONDS = float(os.getenv("CATALOG_CACHE_NEGATIVE_TTL", "5"))
+
+# Tags name what a cached value was built from; writers invalidate tags,
+# never individual keys, so they do not need to know how readers page.
+CATEGORIES = "categories"
+LISTINGS = "listing"
+PRODUCTS = "products"   # anything derived from any product row
+
+
+def product_tag(productid: int) -> str:
+    """Detail entries and every listing page that contains the product."""
+    return f"product:{productid}"
+
+
+def product_changed(*productids) -> tuple:
+    """Tags to drop when products change in place (stock, description, ratings)."""
+    return (*(product_tag(pid) for pid in productids), PRODUCTS)
+
+
+def listing_tag(subcategoryid: int = None) -> str:
+    """Listing pages for one subcategory, or the unfiltered listing for None."""
+    return f"listing:{subcategoryid or '*'}"
+
+
+def product_moved(productid: int, subcategoryid: int = None) -> tuple:
+    """Tags to drop when a product appears, disappears or changes sort position.
+
+    Without the subcategory every listing page goes.
+    """
+    if subcategoryid is None:
+        return (*product_changed(productid), LISTINGS)
+    return (*product_changed(productid), listing_tag(subcategoryid), listing_tag(None))
+
+
+class CatalogCache:
+    """In-process LRU cache with TTL for catalog reads.
+
+    Each worker process has its own copy. Writes in this process invalidate
+    it straight away; writes made by other processes show up once the TTL
+    runs out. Cached values are shared between requests, so callers must
+    not mutate them. A TTL or size of 0 turns the cache off.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, ttl: float = TTL_SECONDS, negative_ttl: float = NEGATIVE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value, tags)
+        self._keys_by_tag = {}
+        self._invalidated_at = {}       # tag -> generation of its last invalidation
+        self._generation = 0
+        self._floor = 0                 # loads started before this are never stored
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    @property
+    def generation(self) -> int:
+        """Capture before loading; pass to ``set`` so a value read before a
+        concurrent invalidation is not stored afterwards."""
+        return self._generation
+
+    def get(self, key):
+        """Return (hit, value)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return False, None
+            if entry[0] <= time.monotonic():
+                self._drop(key)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return True, entry[1]
+
+    def set(self, key, value, tags=(), since: int = None):
+        if not self.enabled:
+            return
+        ttl = self.negative_ttl if value is None else self.ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            if since is not None and (
+                since < self._floor or any(self._invalidated_at.get(t, -1) > since for t in tags)
+            ):
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def get_or_load(self, key, loader, tags=()):
+        """Serve ``key`` from the cache or call ``loader()`` and cache its result.
+
+        Concurrent misses for the same key share one ``loader()`` call.
+        ``tags`` may be a callable taking the loaded value. Results carrying
+        an "error" are returned but not cached.
+        """
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        def load():
+            since = self._generation
+            value = loader()
+            self._store(key, value, tags, since)
+            return value
+
+        return flights.do(key, load)
+
+    async def get_or_load_async(self, key, loader, tags=()):
+        """``get_or_load`` for async handlers; ``loader`` is a coroutine function."""
+        hit, value = self.get(key)
+        if hit:
+            return value
+
+        async def load():
+            since = self._generation
+            value = await loader()
+            self._store(key, value, tags, since)
+            return value
+
+        return await async_flights.do(key, load)
+
+    def _store(self, key, value, tags, since):
+        if not (isinstance(value, dict) and "error" in value):
+            self.set(key, value, tags(value) if callable(tags) else tags, since)
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                self._invalidated_at[tag] = self._generation
+                for key in self._keys_by_tag.pop(tag, ()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self._counters["invalidations"] += 1
+            # Only loads still in flight care about old invalidations; past a
+            # bound, forget them all and refuse anything started earlier.
+            if len(self._invalidated_at) > 4 * max(self.max_entries, 1024):
+                self._invalidated_at.clear()
+                self._floor = self._generation
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._invalidated_at.clear()
+            self._floor = self._generation
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def _drop(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+catalog_cache = CatalogCache()
@@ -1,9 +1,14 @@
-from app.database.database import get_connection
+from app.database.database import RequestDB, get_connection
+from app.services.catalog_cache import CATEGORIES, catalog_cache
+from app.services.table_versions import bump
 import pymysql
 
 class CategoryService:
+    def __init__(self, db: RequestDB = None):
+        self.db = db
+
     def add_category(self, name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE name = %s", (name,))
@@ -12,7 +17,9 @@ class CategoryService:
                 return {"error": "❌ Category already exists."}
 
             cursor.execute("INSERT INTO categories (name) VALUES (%s)", (name,))
+            bump(cursor, "categories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"✅ Category '{name}' added successfully."}
         except Exception as e:
             conn.rollback()
@@ -22,7 +29,7 @@ class CategoryService:
             conn.close()
 
     def update_category(self, category_id: int, new_name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE categoryid = %s", (category_id,))
@@ -34,7 +41,9 @@ class CategoryService:
                 "UPDATE categories SET name = %s WHERE categoryid = %s",
                 (new_name, category_id),
             )
+            bump(cursor, "categories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"📝 Category ID {category_id} updated to '{new_name}'."}
         except Exception as e:
             conn.rollback()
@@ -44,7 +53,7 @@ class CategoryService:
             conn.close()
 
     def delete_category(self, category_id: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE categoryid = %s", (category_id,))
@@ -54,7 +63,10 @@ class CategoryService:
 
             cursor.execute("DELETE FROM subcategories WHERE categoryid = %s", (category_id,))
             cursor.execute("DELETE FROM categories WHERE categoryid = %s", (category_id,))
+            bump(cursor, "categories")
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {
                 "message": f"🗑️ Category '{category['name']}' and its subcategories deleted successfully."
             }
@@ -65,8 +77,11 @@ class CategoryService:
             cursor.close()
             conn.close()
 
-    def get_all_categories(self):
-        conn = get_connection()
+    def get_all_categories(self, version: str = None):
+        return catalog_cache.get_or_load(("categories", version), self._get_all_categories, (CATEGORIES,))
+
+    def _get_all_categories(self):
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories")
@@ -77,7 +92,7 @@ class CategoryService:
             conn.close()
 
     def add_subcategory(self, category_id: int, name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE categoryid = %s", (category_id,))
@@ -97,7 +112,9 @@ class CategoryService:
                 "INSERT INTO subcategories (name, categoryid) VALUES (%s, %s)",
                 (name, category_id),
             )
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"✅ Subcategory '{name}' added under '{category['name']}'."}
         except Exception as e:
             conn.rollback()
@@ -107,7 +124,7 @@ class CategoryService:
             conn.close()
 
     def update_subcategory(self, subcategory_id: int, new_name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM subcategories WHERE subcategoryid = %s", (subcategory_id,))
@@ -119,7 +136,9 @@ class CategoryService:
                 "UPDATE subcategories SET name = %s WHERE subcategoryid = %s",
                 (new_name, subcategory_id),
             )
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"📝 Subcategory ID {subcategory_id} updated to '{new_name}'."}
         except Exception as e:
             conn.rollback()
@@ -129,7 +148,7 @@ class CategoryService:
             conn.close()
 
     def delete_subcategory(self, subcategory_id: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM subcategories WHERE subcategoryid = %s", (subcategory_id,))
@@ -138,7 +157,9 @@ class CategoryService:
                 return {"error": "❌ Subcategory not found."}
 
             cursor.execute("DELETE FROM subcategories WHERE subcategoryid = %s", (subcategory_id,))
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"🗑️ Subcategory '{subcategory['name']}' deleted successfully."}
         except Exception as e:
             conn.rollback()
@@ -147,8 +168,15 @@ class CategoryService:
             cursor.close()
             conn.close()
 
-    def get_subcategories_by_category(self, category_id: int):
-        conn = get_connection()
+    def get_subcategories_by_category(self, category_id: int, version: str = None):
+        return catalog_cache.get_or_load(
+            ("category_subcategories", category_id, version),
+            lambda: self._get_subcategories_by_category(category_id),
+            (CATEGORIES,),
+        )
+
+    def _get_subcategories_by_category(self, category_id: int):
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM subcategories WHERE categoryid = %s", (category_id,))
@@ -1,12 +1,15 @@
 import pymysql
 from werkzeug.security import generate_password_hash, check_password_hash
-from app.database.database import get_connection
+from app.database.database import RequestDB, get_connection
 
 class CustomerService:
     """Handles customer registration, authentication, and profile management using PyMySQL."""
 
+    def __init__(self, db: RequestDB = None):
+        self.db = db
+
     def register_customer(self, fname, lname, phoneno, password, address, pincode, district, state, housename):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM customers WHERE phoneno = %s", (phoneno,))
@@ -38,7 +41,7 @@ class CustomerService:
             conn.close()
 
     def authenticate_customer(self, customerID, password):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -51,7 +54,7 @@ class CustomerService:
             conn.close()
 
     def get_customer_details(self, customerID):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -64,7 +67,7 @@ class CustomerService:
             conn.close()
 
     def update_customer_phone(self, customerID, newphoneno):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -82,7 +85,7 @@ class CustomerService:
             conn.close()
 
     def update_customer_address(self, customerID, newaddress, newpincode, newdistrict, newstate, newhousename):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -104,7 +107,7 @@ class CustomerService:
             conn.close()
 
     def change_customer_password(self, customerID, oldpassword, newpassword):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -126,7 +129,7 @@ class CustomerService:
             conn.close()
 
     def delete_customer(self, customerID):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -145,7 +148,7 @@ class CustomerService:
             conn.close()
 
     def change_phone_password(self, customerID, phoneno, newpassword):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s AND phoneno = %s", (customerID, phoneno))
@@ -165,7 +168,7 @@ class CustomerService:
             conn.close()
 
     def change_name(self, customerID, newfname, newlname):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerID,))
@@ -0,0 +1,277 @@
+"""
+In-process request and SQL metrics, exposed in Prometheus text format.
+
+MetricsMiddleware times every HTTP request by route template and counts
+the SQL statements it ran. The pooled connections in
+app/database/database.py hand out TimedCursor proxies, and each proxy
+reports its statements here. A statement is tagged with the service
+method that opened its cursor. GET /metrics renders everything.
+
+count_queries() counts the statements and server round trips run inside
+a block, in any thread. The query-budget tests in tests/ are built on it.
+
+Each process keeps its own series. With several uvicorn workers, scrape
+each worker, or read the numbers as per-worker samples. METRICS_ENABLED=0
+turns the middleware and the cursor proxies off.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").strip().lower() not in ("0", "false", "no")
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Thread-safe histogram; one series per tuple of label values."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = REQUEST_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}   # label values -> [count per bucket..., count above the last bucket, sum]
+
+    def observe(self, value: float, *labels):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    def snapshot(self) -> dict:
+        """{label values: (count, sum)} for every series."""
+        with self._lock:
+            return {labels: (sum(s[:-1]), s[-1]) for labels, s in self._series.items()}
+
+    def render(self):
+        with self._lock:
+            series = {labels: list(s) for labels, s in self._series.items()}
+        for labels, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labels, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {counts[-1]:.6f}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+class Counter:
+    """Thread-safe monotonically increasing counter; one series per tuple of label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def inc(self, amount: float = 1, *labels):
+        with self._lock:
+            self._series[labels] = self._series.get(labels, 0) + amount
+
+    def render(self):
+        with self._lock:
+            series = dict(self._series)
+        for labels, value in sorted(series.items()):
+            yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def histogram(self, name: str, help: str, labels: tuple = (), buckets: tuple = REQUEST_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self, gauges: dict = None) -> str:
+        """Prometheus text exposition of every metric, plus ``gauges`` ({name: value}) read at scrape time."""
+        lines = []
+        for metric in self._metrics:
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} {metric.kind}"]
+            lines += metric.render()
+        for name, value in (gauges or {}).items():
+            lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_DURATION = registry.histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.",
+    ("method", "route", "status"),
+)
+HTTP_STATEMENTS = registry.histogram(
+    "http_request_sql_statements", "SQL statements run while serving one request.",
+    ("route",), COUNT_BUCKETS,
+)
+SQL_DURATION = registry.histogram(
+    "db_statement_duration_seconds", "Time in cursor.execute / executemany, by calling service method.",
+    ("caller", "kind"), SQL_BUCKETS,
+)
+SQL_ROWS = registry.counter(
+    "db_statement_rows_total", "Rows returned or affected, by calling service method.", ("caller", "kind"),
+)
+SQL_ERRORS = registry.counter(
+    "db_statement_errors_total", "Statements that raised, by calling service method.", ("caller", "kind"),
+)
+CONNECT_DURATION = registry.histogram(
+    "db_connect_duration_seconds", "Time to open one new MySQL connection.", (), SQL_BUCKETS,
+)
+
+
+class RequestStats:
+    """SQL work done while serving one request (shared with threadpool handlers through the context)."""
+
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+_request_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+def current_request() -> RequestStats:
+    return _request_stats.get()
+
+
+def statement_kind(sql: str) -> str:
+    verb = sql.lstrip()[:6].upper()
+    return verb if verb in ("SELECT", "INSERT", "UPDATE", "DELETE") else "OTHER"
+
+
+class QueryCount:
+    """Statements and round trips seen while one ``count_queries()`` block was open."""
+
+    def __init__(self):
+        self.statements = 0
+        self.round_trips = 0
+        self.queries = []   # (caller, sql) in the order they ran
+        self._lock = threading.Lock()
+
+    def add(self, caller: str, sql: str, round_trips: int):
+        with self._lock:
+            if sql is not None:
+                self.statements += 1
+                self.queries.append((caller, " ".join(sql.split())))
+            self.round_trips += round_trips
+
+    def report(self) -> str:
+        return "\n".join(f"{n:>3}. {caller}: {sql[:160]}" for n, (caller, sql) in enumerate(self.queries, 1))
+
+
+_counters = []
+_counters_lock = threading.Lock()
+
+
+def counting() -> bool:
+    return bool(_counters)
+
+
+@contextmanager
+def count_queries():
+    """Count every statement and round trip the pooled connections run inside the block.
+
+    Counting is process-wide rather than per context, so statements run by
+    the TestClient's app thread or the threadpool are included.
+    """
+    counter = QueryCount()
+    with _counters_lock:
+        _counters.append(counter)
+    try:
+        yield counter
+    finally:
+        with _counters_lock:
+            _counters.remove(counter)
+
+
+def count_round_trip(caller: str, sql: str = None, round_trips: int = 1):
+    """Report one statement (or, with ``sql`` None, a bare commit / rollback) to open counters."""
+    for counter in list(_counters):
+        counter.add(caller, sql, round_trips)
+
+
+def record_statement(caller: str, sql: str, seconds: float, rows: int, failed: bool = False):
+    kind = statement_kind(sql)
+    SQL_DURATION.observe(seconds, caller, kind)
+    if failed:
+        SQL_ERRORS.inc(1, caller, kind)
+    elif rows:
+        SQL_ROWS.inc(rows, caller, kind)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += seconds
+
+
+def route_of(scope) -> str:
+    """The matched route's path template (set by FastAPI's router), never the raw path."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording each HTTP request's latency and SQL statement count by route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _request_stats.reset(token)
+            route = route_of(scope)
+            HTTP_DURATION.observe(time.perf_counter() - started, scope["method"], route, status)
+            HTTP_STATEMENTS.observe(stats.statements, route)
@@ -1,29 +1,150 @@
 import pymysql
-from datetime import datetime
-from app.database.database import get_connection
+from datetime import date, datetime, timedelta
+from app.database.database import RequestDB, get_connection, stream_rows
+from app.services.catalog_cache import catalog_cache, product_changed
+from app.services.seller_summary import record_amount_change, record_placed, record_status_change
+from app.services.table_versions import bump
+
+# One round trip for both existence checks: no row means no customer,
+# a NULL productid means no product.
+PLACE_ORDER_LOOKUP = """
+    SELECT p.productid, p.sellerid, p.price, p.stock, p.description
+    FROM customers c
+    LEFT JOIN products p ON p.productid = %s
+    WHERE c.customerid = %s
+"""
+
+RESERVE_STOCK = "UPDATE products SET stock = stock - %s WHERE productid = %s AND stock >= %s"
+
+MAX_CHECKOUT_LINES = 100
+
+CHECKOUT_ORDERIDS = """
+    SELECT orderid, productid FROM orders
+    WHERE customerid = %s AND orderid >= %s
+    ORDER BY orderid LIMIT %s
+"""
+
+# Status changes lock the order (and its payment) so two concurrent updates
+# cannot both move the seller_summary counters from the same old status.
+ORDER_FOR_UPDATE = """
+    SELECT o.*, t.amount FROM orders o
+    LEFT JOIN transactions t ON t.orderid = o.orderid
+    WHERE o.orderid = %s
+    FOR UPDATE
+"""
+
+DEFAULT_HISTORY_SIZE = 20
+MAX_HISTORY_SIZE = 100
+ORDER_STATUSES = ["Pending", "Dispatched", "On The Way", "Delivered", "Cancelled"]
+
+ORDER_HISTORY_SELECT = """
+    SELECT o.*, t.transid, t.amount, t.status AS transaction_status, t.transDate
+    FROM orders o
+    LEFT JOIN transactions t ON t.orderid = o.orderid
+"""
+
+
+def order_history_query(select: str, owner: str, ownerid: int, status: str = None, date_from: date = None,
+                        date_to: date = None, after: str = None, limit: int = DEFAULT_HISTORY_SIZE):
+    """Build the keyset query for one page of a customer's or seller's orders, newest first.
+
+    ``select`` is a SELECT over ``orders o`` (joined with ``transactions t``)
+    without a WHERE clause; ``owner`` is "customerid" or "sellerid". Dates
+    filter on the payment date and are inclusive. ``after`` is the
+    ``next_cursor`` of the previous page. One extra row is fetched so the
+    caller knows whether another page exists.
+    """
+    if status is not None and status not in ORDER_STATUSES:
+        return {"error": f"❌ Invalid status '{status}'. Choose from: {ORDER_STATUSES}"}
+    if not 1 <= limit <= MAX_HISTORY_SIZE:
+        return {"error": f"❌ limit must be between 1 and {MAX_HISTORY_SIZE}."}
+    if date_from and date_to and date_from > date_to:
+        return {"error": "❌ date_from must not be after date_to."}
+
+    # (owner, orderid) and (owner, status, orderid) indexes serve every variant.
+    where, params = [f"o.{owner} = %s"], [ownerid]
+    if status:
+        where.append("o.status = %s")
+        params.append(status)
+    if date_from:
+        where.append("t.transDate >= %s")
+        params.append(date_from)
+    if date_to:
+        where.append("t.transDate < %s")
+        params.append(date_to + timedelta(days=1))
+    if after:
+        try:
+            params.append(int(after))
+        except ValueError:
+            return {"error": f"❌ Invalid cursor '{after}'."}
+        where.append("o.orderid < %s")
+
+    sql = select + " WHERE " + " AND ".join(where) + " ORDER BY o.orderid DESC LIMIT %s"
+    params.append(limit + 1)
+    return {"sql": sql, "params": tuple(params)}
+
+
+def order_history_page(rows, limit: int):
+    """Trim the look-ahead row and work out the cursor for the next page."""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]["orderid"])
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def order_with_transaction(row: dict) -> dict:
+    """Nest the transaction columns of an ORDER_HISTORY_SELECT row under "transaction"."""
+    order = dict(row)
+    transaction = {
+        "transid": order.pop("transid"),
+        "orderid": order["orderid"],
+        "customerid": order["customerid"],
+        "amount": order.pop("amount"),
+        "status": order.pop("transaction_status"),
+        "transDate": order.pop("transDate"),
+    }
+    order["transaction"] = transaction if transaction["transid"] is not None else None
+    return order
+
 
 class OrderService:
     """Handles order management, status updates, and transactions using PyMySQL."""
 
+    def __init__(self, db: RequestDB = None):
+        self.db = db
+
     def place_order(self, customerid: int, productid: int, qty: int):
-        conn = get_connection()
+        """Place one order in six statements and a commit: the lookup, the stock
+        reservation, the order and payment inserts, the seller_summary counters
+        and the products version bump.
+
+        Stock is taken with a conditional decrement, so concurrent buyers can
+        never push it below zero, and the price read up front is reused for
+        the transaction amount.
+        """
+        if qty < 1:
+            return {"error": "❌ Quantity must be at least 1"}
+
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerid,))
-            customer = cursor.fetchone()
-            if not customer:
-                return {"error": "❌ Customer not found"}
-
-            cursor.execute("SELECT * FROM products WHERE productid = %s", (productid,))
+            cursor.execute(PLACE_ORDER_LOOKUP, (productid, customerid))
             product = cursor.fetchone()
             if not product:
+                return {"error": "❌ Customer not found"}
+            if product["productid"] is None:
                 return {"error": "❌ Product not found"}
-
             if product["stock"] < qty:
                 return {"error": f"❌ Not enough stock for '{product['description']}' (Available: {product['stock']})"}
 
-            new_stock = product["stock"] - qty
-            cursor.execute("UPDATE products SET stock = %s WHERE productid = %s", (new_stock, productid))
+            cursor.execute(RESERVE_STOCK, (qty, productid, qty))
+            if cursor.rowcount == 0:
+                conn.rollback()
+                cursor.execute("SELECT stock FROM products WHERE productid = %s", (productid,))
+                available = (cursor.fetchone() or {}).get("stock", 0)
+                return {"error": f"❌ Not enough stock for '{product['description']}' (Available: {available})"}
 
             cursor.execute("""
                 INSERT INTO orders (customerid, productid, sellerid, qty, status)
@@ -31,16 +152,16 @@ class OrderService:
             """, (customerid, productid, product["sellerid"], qty, "Pending"))
             orderid = cursor.lastrowid
 
-            cursor.execute("SELECT price FROM products WHERE productid = %s", (productid,))
-            product_price = cursor.fetchone()["price"]
-            amount = float(qty * product_price)
-
+            amount = float(qty * product["price"])
             cursor.execute("""
                 INSERT INTO transactions (orderid, customerid, amount, status, transDate)
                 VALUES (%s, %s, %s, %s, %s)
             """, (orderid, customerid, amount, "Completed", datetime.utcnow()))
 
+            record_placed(cursor, [(product["sellerid"], qty, amount)])
+            bump(cursor, "products", productid)
             conn.commit()
+            catalog_cache.invalidate(*product_changed(productid))
             return {"message": f"✅ Order {orderid} placed successfully. Payment of ₹{amount:.2f} completed."}
         except Exception as e:
             conn.rollback()
@@ -49,48 +170,165 @@ class OrderService:
             cursor.close()
             conn.close()
 
-    def get_order_details(self, orderid: int):
-        conn = get_connection()
+    def checkout(self, customerid: int, items: list):
+        """Place every cart line as its own order inside one DB transaction.
+
+        ``items`` is a list of (productid, qty); repeated products are merged.
+        Either every line is ordered and paid or nothing is written.
+        """
+        lines = {}
+        for productid, qty in items:
+            if qty < 1:
+                return {"error": "❌ Quantity must be at least 1"}
+            lines[productid] = lines.get(productid, 0) + qty
+        if not lines:
+            return {"error": "❌ Cart is empty"}
+        if len(lines) > MAX_CHECKOUT_LINES:
+            return {"error": f"❌ At most {MAX_CHECKOUT_LINES} products per checkout"}
+
+        productids = list(lines)
+        marks = ", ".join(["%s"] * len(productids))
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE orderid = %s", (orderid,))
-            order = cursor.fetchone()
-            return order if order else {"error": "❌ Order not found"}
+            cursor.execute(f"""
+                SELECT p.productid, p.sellerid, p.price, p.stock, p.description
+                FROM customers c
+                LEFT JOIN products p ON p.productid IN ({marks})
+                WHERE c.customerid = %s
+            """, (*productids, customerid))
+            rows = cursor.fetchall()
+            if not rows:
+                return {"error": "❌ Customer not found"}
+            products = {r["productid"]: r for r in rows if r["productid"] is not None}
+            missing = [pid for pid in productids if pid not in products]
+            if missing:
+                return {"error": f"❌ Product not found: {', '.join(map(str, missing))}"}
+            short = [pid for pid in productids if products[pid]["stock"] < lines[pid]]
+            if short:
+                return {"error": self._short_stock_error(short, products)}
+
+            # One conditional decrement for the whole cart: every row must
+            # still have enough stock, otherwise nothing is taken.
+            case = " ".join(["WHEN %s THEN %s"] * len(productids))
+            qty_params = [v for pid in productids for v in (pid, lines[pid])]
+            cursor.execute(f"""
+                UPDATE products
+                SET stock = stock - CASE productid {case} END
+                WHERE productid IN ({marks}) AND stock >= CASE productid {case} END
+            """, (*qty_params, *productids, *qty_params))
+            if cursor.rowcount != len(productids):
+                conn.rollback()
+                cursor.execute(f"SELECT productid, stock FROM products WHERE productid IN ({marks})", productids)
+                for r in cursor.fetchall():
+                    products[r["productid"]]["stock"] = r["stock"]
+                short = [pid for pid in productids if products[pid]["stock"] < lines[pid]]
+                if not short:
+                    return {"error": "❌ Stock changed during checkout, please try again"}
+                return {"error": self._short_stock_error(short, products)}
+
+            # executemany turns this into one multi-row INSERT. Its ids need not
+            # be consecutive (innodb_autoinc_lock_mode=2, auto_increment_increment),
+            # so they are read back: this transaction's snapshot was taken by the
+            # lookup above, so it sees its own new orders and no one else's.
+            cursor.executemany("""
+                INSERT INTO orders (customerid, productid, sellerid, qty, status)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [(customerid, pid, products[pid]["sellerid"], lines[pid], "Pending") for pid in productids])
+            cursor.execute(CHECKOUT_ORDERIDS, (customerid, cursor.lastrowid, len(productids) + 1))
+            orderids = {r["productid"]: r["orderid"] for r in cursor.fetchall()}
+            if sorted(orderids) != sorted(productids):
+                raise RuntimeError("❌ Could not read back the new orders, please try again")
+
+            now = datetime.utcnow()
+            orders = [
+                {
+                    "orderid": orderids[pid],
+                    "productid": pid,
+                    "qty": lines[pid],
+                    "amount": round(float(lines[pid] * products[pid]["price"]), 2),
+                }
+                for pid in productids
+            ]
+            cursor.executemany("""
+                INSERT INTO transactions (orderid, customerid, amount, status, transDate)
+                VALUES (%s, %s, %s, %s, %s)
+            """, [(o["orderid"], customerid, o["amount"], "Completed", now) for o in orders])
+
+            record_placed(cursor, [(products[o["productid"]]["sellerid"], o["qty"], o["amount"]) for o in orders])
+            bump(cursor, "products", *productids)
+            conn.commit()
+            catalog_cache.invalidate(*product_changed(*productids))
+            total = round(sum(o["amount"] for o in orders), 2)
+            return {
+                "message": f"✅ {len(orders)} order(s) placed. Payment of ₹{total:.2f} completed.",
+                "orders": orders,
+                "total": total,
+            }
+        except Exception as e:
+            conn.rollback()
+            return {"error": str(e)}
         finally:
             cursor.close()
             conn.close()
 
-    def get_orders_by_customer(self, customerid: int):
-        conn = get_connection()
+    @staticmethod
+    def _short_stock_error(productids: list, products: dict) -> str:
+        details = "; ".join(
+            f"'{products[pid]['description']}' (Available: {products[pid]['stock']})" for pid in productids
+        )
+        return f"❌ Not enough stock for {details}"
+
+    def get_order_details(self, orderid: int):
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE customerid = %s", (customerid,))
-            orders = cursor.fetchall()
-            return orders if orders else {"message": "No orders found for this customer."}
+            cursor.execute("SELECT * FROM orders WHERE orderid = %s", (orderid,))
+            order = cursor.fetchone()
+            return order if order else {"error": "❌ Order not found"}
         finally:
             cursor.close()
             conn.close()
 
-    def get_orders_by_seller(self, sellerid: int):
-        conn = get_connection()
+    def get_orders_by_customer(self, customerid: int, status: str = None, date_from: date = None,
+                               date_to: date = None, after: str = None, limit: int = DEFAULT_HISTORY_SIZE):
+        """One page of the customer's orders, each with its transaction: {"items": [...], "next_cursor": ...}."""
+        return self._history_page("customerid", customerid, status, date_from, date_to, after, limit)
+
+    def get_orders_by_seller(self, sellerid: int, status: str = None, date_from: date = None,
+                             date_to: date = None, after: str = None, limit: int = DEFAULT_HISTORY_SIZE):
+        """One page of the seller's orders, each with its transaction: {"items": [...], "next_cursor": ...}."""
+        return self._history_page("sellerid", sellerid, status, date_from, date_to, after, limit)
+
+    def _history_page(self, owner: str, ownerid: int, status, date_from, date_to, after, limit):
+        query = order_history_query(ORDER_HISTORY_SELECT, owner, ownerid, status, date_from, date_to, after, limit)
+        if "error" in query:
+            return query
+
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE sellerid = %s", (sellerid,))
-            orders = cursor.fetchall()
-            return orders if orders else {"message": "No orders found for this seller."}
+            cursor.execute(query["sql"], query["params"])
+            page = order_history_page(cursor.fetchall(), limit)
+            page["items"] = [order_with_transaction(row) for row in page["items"]]
+            return page
         finally:
             cursor.close()
             conn.close()
 
+    def stream_orders_by_seller(self, sellerid: int):
+        """All of the seller's orders as batches of rows, for NDJSON export."""
+        return stream_rows("SELECT * FROM orders WHERE sellerid = %s ORDER BY orderid", (sellerid,))
+
     def update_order_status(self, orderid: int, new_status: str):
         valid_statuses = ["Pending", "Dispatched", "On The Way", "Delivered", "Cancelled"]
         if new_status not in valid_statuses:
             return {"error": f"Invalid status '{new_status}'. Valid: {valid_statuses}"}
 
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE orderid = %s", (orderid,))
+            cursor.execute(ORDER_FOR_UPDATE, (orderid,))
             order = cursor.fetchone()
             if not order:
                 return {"error": "❌ Order not found"}
@@ -98,6 +336,7 @@ class OrderService:
                 return {"error": "❌ Cannot change status of a cancelled order"}
 
             cursor.execute("UPDATE orders SET status = %s WHERE orderid = %s", (new_status, orderid))
+            record_status_change(cursor, order["sellerid"], order["status"], new_status, order["qty"], order["amount"])
 
             if new_status == "Delivered":
                 cursor.execute("UPDATE transactions SET status = %s WHERE orderid = %s", ("Completed", orderid))
@@ -112,10 +351,10 @@ class OrderService:
             conn.close()
 
     def cancel_order(self, orderid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE orderid = %s", (orderid,))
+            cursor.execute(ORDER_FOR_UPDATE, (orderid,))
             order = cursor.fetchone()
             if not order:
                 return {"error": "❌ Order not found"}
@@ -129,7 +368,10 @@ class OrderService:
 
             cursor.execute("UPDATE transactions SET status = 'Refunded' WHERE orderid = %s", (orderid,))
 
+            record_status_change(cursor, order["sellerid"], order["status"], "Cancelled", order["qty"], order["amount"])
+            bump(cursor, "products", order["productid"])
             conn.commit()
+            catalog_cache.invalidate(*product_changed(order["productid"]))
             return {"message": f"❌ Order {orderid} cancelled successfully and refund initiated."}
         except Exception as e:
             conn.rollback()
@@ -139,15 +381,15 @@ class OrderService:
             conn.close()
 
     def create_or_update_transaction(self, orderid: int, amount: float, status: str = "Completed"):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE orderid = %s", (orderid,))
+            cursor.execute("SELECT * FROM orders WHERE orderid = %s FOR UPDATE", (orderid,))
             order = cursor.fetchone()
             if not order:
                 return {"error": "❌ Order not found"}
 
-            cursor.execute("SELECT * FROM transactions WHERE orderid = %s", (orderid,))
+            cursor.execute("SELECT * FROM transactions WHERE orderid = %s FOR UPDATE", (orderid,))
             trans = cursor.fetchone()
 
             if trans:
@@ -162,6 +404,8 @@ class OrderService:
                     VALUES (%s, %s, %s, %s, %s)
                 """, (orderid, order["customerid"], amount, status, datetime.utcnow()))
 
+            previous = (trans["amount"] or 0) if trans else 0
+            record_amount_change(cursor, order["sellerid"], order["status"], amount - previous)
             conn.commit()
             return {"message": f"💳 Transaction for order {orderid} recorded as '{status}' (₹{amount:.2f})."}
         except Exception as e:
@@ -172,7 +416,7 @@ class OrderService:
             conn.close()
 
     def get_transaction_for_order(self, orderid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM transactions WHERE orderid = %s", (orderid,))
@@ -183,7 +427,7 @@ class OrderService:
             conn.close()
 
     def get_transactions_by_customer(self, customerid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM transactions WHERE customerid = %s", (customerid,))
@@ -192,3 +436,7 @@ class OrderService:
         finally:
             cursor.close()
             conn.close()
+
+    def stream_transactions_by_customer(self, customerid: int):
+        """All of the customer's transactions as batches of rows, for NDJSON export."""
+        return stream_rows("SELECT * FROM transactions WHERE customerid = %s ORDER BY transid", (customerid,))
@@ -0,0 +1,253 @@
+"""
+Bulk product import from CSV or NDJSON.
+
+Input is parsed one line at a time, checked against the seller and
+subcategory ids loaded once up front, and inserted in multi-row batches,
+each committed on its own. Bad rows are reported with their line number
+and never stop the import.
+
+    python -m app.services.product_import products.csv
+    python -m app.services.product_import products.ndjson --seller 12
+    python -m app.services.product_import products.csv --dry-run
+
+Columns: product_name, description, sellerid, subcategoryid, price, stock,
+images_url, rating. description, images_url and rating are optional;
+sellerid is not needed when a seller is given for the whole file.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+
+import pymysql
+from app.database.database import RequestDB, get_connection
+from app.services.catalog_cache import catalog_cache, listing_tag, product_changed
+from app.services.search_index import search_index
+from app.services.table_versions import bump
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+TEXT_LIMIT = 255  # VARCHAR(255) columns
+
+INSERT_PRODUCTS = (
+    "INSERT INTO products (product_name, description, sellerid, subcategoryid, price, stock, images_url, rating) "
+    "VALUES "
+)
+ROW_MARKS = "(%s, %s, %s, %s, %s, %s, %s, %s)"
+INSERTED_IDS = "SELECT productid FROM products WHERE productid >= %s ORDER BY productid LIMIT %s"
+
+
+def parse_csv(lines):
+    """Yield (line number, record dict) for each CSV data row; the first row is the header."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def parse_ndjson(lines):
+    """Yield (line number, record dict or error message) for each non-blank line."""
+    for line_no, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, f"invalid JSON: {e}"
+            continue
+        yield line_no, record if isinstance(record, dict) else "expected a JSON object"
+
+
+PARSERS = {"csv": parse_csv, "ndjson": parse_ndjson}
+
+
+def detect_format(filename: str = None) -> str:
+    return "ndjson" if filename and filename.lower().endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def _text(record: dict, key: str, required: bool = True) -> str:
+    value = record.get(key)
+    value = "" if value is None else str(value).strip()
+    if required and not value:
+        raise ValueError(f"{key} is required")
+    if len(value) > TEXT_LIMIT:
+        raise ValueError(f"{key} is longer than {TEXT_LIMIT} characters")
+    return value
+
+
+def _number(record: dict, key: str, cast, default=None):
+    value = record.get(key)
+    if value is None or value == "":
+        if default is None:
+            raise ValueError(f"{key} is required")
+        return default
+    try:
+        number = cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number, got {value!r}")
+    if not math.isfinite(number):
+        raise ValueError(f"{key} must be a finite number")
+    if number < 0:
+        raise ValueError(f"{key} must not be negative")
+    return number
+
+
+def validate(record: dict, sellers: set, subcategories: set, sellerid: int = None):
+    """INSERT_PRODUCTS values for one record; raises ValueError with the reason otherwise."""
+    product_name = _text(record, "product_name")
+    description = _text(record, "description", required=False)
+    seller = sellerid if sellerid is not None else _number(record, "sellerid", int)
+    if seller not in sellers:
+        raise ValueError(f"seller {seller} not found")
+    subcategoryid = _number(record, "subcategoryid", int)
+    if subcategoryid not in subcategories:
+        raise ValueError(f"subcategory {subcategoryid} not found")
+    price = _number(record, "price", float)
+    stock = _number(record, "stock", int)
+    images_url = _text(record, "images_url", required=False)
+    rating = _number(record, "rating", float, default=0.0)
+    if rating > 5:
+        raise ValueError("rating must be between 0 and 5")
+    return (product_name, description, seller, subcategoryid, price, stock, images_url, rating)
+
+
+class ProductImportService:
+    """Validates and inserts products in bulk; see the module docstring for the input format."""
+
+    def __init__(self, db: RequestDB = None, batch_size: int = BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    def import_lines(self, lines, fmt: str = "csv", sellerid: int = None, dry_run: bool = False):
+        """Import every record in ``lines`` (an iterable of text lines).
+
+        ``sellerid`` assigns every product to that seller. Returns a report:
+        {"inserted", "failed", "errors": [{"line", "error"}], "seconds"}.
+        """
+        if fmt not in PARSERS:
+            return {"error": f"❌ Unknown format '{fmt}'. Choose from: {list(PARSERS)}"}
+
+        started = time.perf_counter()
+        conn = get_connection(self.db)
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        report = {"inserted": 0, "failed": 0, "errors": []}
+        try:
+            cursor.execute("SELECT sellerid FROM sellers")
+            sellers = {row["sellerid"] for row in cursor.fetchall()}
+            cursor.execute("SELECT subcategoryid FROM subcategories")
+            subcategories = {row["subcategoryid"] for row in cursor.fetchall()}
+            if sellerid is not None and sellerid not in sellers:
+                return {"error": f"❌ Seller {sellerid} not found."}
+
+            batch = []
+            for line_no, record in PARSERS[fmt](lines):
+                try:
+                    if isinstance(record, str):
+                        raise ValueError(record)
+                    batch.append((line_no, validate(record, sellers, subcategories, sellerid)))
+                except ValueError as e:
+                    self._fail(report, line_no, str(e))
+                    continue
+                if len(batch) >= self.batch_size:
+                    self._flush(conn, cursor, batch, report, dry_run)
+                    batch = []
+            if batch:
+                self._flush(conn, cursor, batch, report, dry_run)
+        finally:
+            cursor.close()
+            conn.close()
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        if dry_run:
+            report["dry_run"] = True
+        return report
+
+    @staticmethod
+    def _fail(report: dict, line_no: int, error: str):
+        report["failed"] += 1
+        if len(report["errors"]) < MAX_REPORTED_ERRORS:
+            report["errors"].append({"line": line_no, "error": error})
+
+    def _flush(self, conn, cursor, batch: list, report: dict, dry_run: bool):
+        """Insert one batch in its own transaction; if that fails, retry row by row."""
+        if dry_run:
+            report["inserted"] += len(batch)
+            return
+
+        rows = [values for _, values in batch]
+        inserted = None
+        try:
+            # One hand-built multi-row INSERT (executemany may split long
+            # batches). Its ids need not be consecutive, so they are read back
+            # from a snapshot taken before the INSERT: ids from lastrowid up are
+            # then this batch's rows, in VALUES order, and no one else's.
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+            sql = INSERT_PRODUCTS + ", ".join([ROW_MARKS] * len(rows))
+            cursor.execute(sql, [v for values in rows for v in values])
+            cursor.execute(INSERTED_IDS, (cursor.lastrowid, len(rows) + 1))
+            productids = [row["productid"] for row in cursor.fetchall()]
+            if len(productids) == len(rows):
+                inserted = list(zip(productids, rows))
+                bump(cursor, "products", *productids)
+                conn.commit()
+            else:
+                conn.rollback()
+        except pymysql.MySQLError:
+            conn.rollback()
+        if inserted is None:
+            # Rejected, or the ids could not be told apart: one row at a time.
+            inserted = []
+            for line_no, values in batch:
+                try:
+                    cursor.execute(INSERT_PRODUCTS + ROW_MARKS, values)
+                    inserted.append((cursor.lastrowid, values))
+                except pymysql.MySQLError as e:
+                    self._fail(report, line_no, str(e))
+            if inserted:
+                bump(cursor, "products", *(productid for productid, _ in inserted))
+            conn.commit()
+
+        report["inserted"] += len(inserted)
+        if not inserted:
+            return
+        for productid, values in inserted:
+            search_index.add(productid, values[0], values[1])
+        subcategories = {values[3] for _, values in inserted}
+        catalog_cache.invalidate(
+            *product_changed(*(productid for productid, _ in inserted)),
+            *(listing_tag(subcategoryid) for subcategoryid in subcategories),
+            listing_tag(),
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV or NDJSON file ('-' reads stdin)")
+    parser.add_argument("--format", choices=list(PARSERS), help="default: from the file extension")
+    parser.add_argument("--seller", type=int, help="assign every product to this seller")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="validate only, insert nothing")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or detect_format(args.path)
+    service = ProductImportService(batch_size=args.batch_size)
+    if args.path == "-":
+        report = service.import_lines(sys.stdin, fmt, args.seller, args.dry_run)
+    else:
+        with open(args.path, newline="", encoding="utf-8-sig") as f:
+            report = service.import_lines(f, fmt, args.seller, args.dry_run)
+
+    if "error" in report:
+        print(report["error"])
+        return 1
+    for error in report["errors"]:
+        print(f"line {error['line']}: {error['error']}")
+    verb = "would be inserted" if args.dry_run else "inserted"
+    print(f"✅ {report['inserted']} products {verb}, {report['failed']} rejected in {report['seconds']}s.")
+    return 0 if not report["failed"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
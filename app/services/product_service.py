@@ -1,11 +1,106 @@
 import pymysql
-from app.database.database import get_connection
+from app.database.database import RequestDB, get_connection, stream_rows
+from app.services.catalog_cache import (
+    CATEGORIES, LISTINGS, catalog_cache, listing_tag, product_changed, product_moved, product_tag,
+)
+from app.services.search_index import search_index
+from app.services.table_versions import bump
+
+DEFAULT_PAGE_SIZE = 24
+MAX_PAGE_SIZE = 100
+
+# sort name -> (sort column or None for productid only, direction)
+PRODUCT_SORTS = {
+    "id": (None, "ASC"),
+    "newest": (None, "DESC"),
+    "price": ("price", "ASC"),
+    "rating": ("rating", "DESC"),
+}
+
+# Every listing/detail payload carries the materialized review aggregates,
+# so the storefront never has to call /reviews just to show a rating.
+PRODUCT_SELECT = """
+    SELECT p.*,
+           COALESCE(r.review_count, 0) AS review_count,
+           COALESCE(r.avg_rating, 0) AS avg_rating
+    FROM products p
+    LEFT JOIN product_ratings r ON r.productid = p.productid
+"""
+
+
+def product_page_query(subcategoryid: int = None, after: str = None, limit: int = DEFAULT_PAGE_SIZE, sort: str = "id"):
+    """Build the keyset query for one page of products.
+
+    ``after`` is the ``next_cursor`` of the previous page: a productid for the
+    id/newest sorts, or "<value>:<productid>" for price/rating. One extra row
+    is fetched so the caller knows whether another page exists.
+    """
+    if sort not in PRODUCT_SORTS:
+        return {"error": f"❌ Invalid sort '{sort}'. Choose from: {list(PRODUCT_SORTS)}"}
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return {"error": f"❌ limit must be between 1 and {MAX_PAGE_SIZE}."}
+
+    column, direction = PRODUCT_SORTS[sort]
+    op = ">" if direction == "ASC" else "<"
+    where, params = [], []
+
+    if subcategoryid:
+        where.append("p.subcategoryid = %s")
+        params.append(subcategoryid)
+
+    if after:
+        try:
+            if column is None:
+                last_id = int(after)
+                where.append(f"p.productid {op} %s")
+                params.append(last_id)
+            else:
+                value, last_id = after.rsplit(":", 1)
+                value, last_id = float(value), int(last_id)
+                # FLOAT columns: compare against a FLOAT so equal values stay equal.
+                where.append(f"(p.{column} {op} CAST(%s AS FLOAT) OR (p.{column} = CAST(%s AS FLOAT) AND p.productid {op} %s))")
+                params.extend([value, value, last_id])
+        except ValueError:
+            return {"error": f"❌ Invalid cursor '{after}'."}
+
+    order = f"p.productid {direction}" if column is None else f"p.{column} {direction}, p.productid {direction}"
+    sql = PRODUCT_SELECT
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {order} LIMIT %s"
+    params.append(limit + 1)
+    return {"sql": sql, "params": tuple(params)}
+
+
+def product_page(rows, limit: int, sort: str = "id"):
+    """Trim the look-ahead row and work out the cursor for the next page."""
+    rows = list(rows)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        column = PRODUCT_SORTS[sort][0]
+        next_cursor = str(last["productid"]) if column is None else f"{last[column]}:{last['productid']}"
+    return {"items": rows, "next_cursor": next_cursor}
+
+
+def product_page_key(subcategoryid: int, after: str, limit: int, sort: str, version: str = None) -> tuple:
+    return ("products", subcategoryid or None, after, limit, sort, version)
+
+
+def product_page_tags(subcategoryid: int, page: dict) -> tuple:
+    """A cached page goes stale when its subcategory listing or any product on it changes."""
+    return (LISTINGS, listing_tag(subcategoryid), *(product_tag(row["productid"]) for row in page["items"]))
+
 
 class ProductService:
     """Handles product, category, subcategory, and product management using PyMySQL."""
 
+    def __init__(self, db: RequestDB = None):
+        self.db = db
+
     def add_category(self, name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE name = %s", (name,))
@@ -13,7 +108,9 @@ class ProductService:
                 return {"error": "❌ Category already exists."}
 
             cursor.execute("INSERT INTO categories (name) VALUES (%s)", (name,))
+            bump(cursor, "categories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"✅ Category '{name}' added successfully."}
         except Exception as e:
             conn.rollback()
@@ -23,7 +120,7 @@ class ProductService:
             conn.close()
 
     def update_category(self, categoryid: int, new_name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -32,7 +129,9 @@ class ProductService:
             )
             if cursor.rowcount == 0:
                 return {"error": "❌ Category not found."}
+            bump(cursor, "categories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"📝 Category ID {categoryid} updated to '{new_name}'."}
         except Exception as e:
             conn.rollback()
@@ -42,7 +141,7 @@ class ProductService:
             conn.close()
 
     def delete_category(self, categoryid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE categoryid = %s", (categoryid,))
@@ -51,7 +150,10 @@ class ProductService:
                 return {"error": "❌ Category not found."}
 
             cursor.execute("DELETE FROM categories WHERE categoryid = %s", (categoryid,))
+            bump(cursor, "categories")
+            bump(cursor, "subcategories")  # ON DELETE CASCADE
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"🗑️ Category '{cat['name']}' deleted successfully."}
         except Exception as e:
             conn.rollback()
@@ -60,38 +162,8 @@ class ProductService:
             cursor.close()
             conn.close()
 
-    
-    def list_products(self, subcategoryid=None):
-        conn = get_connection()
-        cursor = conn.cursor(pymysql.cursors.DictCursor)
-        try:
-            query = """
-            SELECT 
-                productid,
-                sellerid,
-                name AS product_name,
-                description,
-                subcategoryid,
-                price,
-                stock,
-                images_url,
-                rating
-            FROM products
-            """
-            params = ()
-            if subcategoryid:
-                query += " WHERE subcategoryid = %s"
-                params = (subcategoryid,)
-
-            cursor.execute(query, params)
-            products = cursor.fetchall()
-            return products or []
-        finally:
-            cursor.close()
-            conn.close()
-
     def add_subcategory(self, name: str, categoryid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM categories WHERE categoryid = %s", (categoryid,))
@@ -110,7 +182,9 @@ class ProductService:
                 "INSERT INTO subcategories (name, categoryid) VALUES (%s, %s)",
                 (name, categoryid),
             )
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"✅ Subcategory '{name}' added under '{cat['name']}'."}
         except Exception as e:
             conn.rollback()
@@ -120,7 +194,7 @@ class ProductService:
             conn.close()
 
     def update_subcategory(self, subcategoryid: int, new_name: str):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute(
@@ -129,7 +203,9 @@ class ProductService:
             )
             if cursor.rowcount == 0:
                 return {"error": "❌ Subcategory not found."}
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"📝 Subcategory ID {subcategoryid} updated to '{new_name}'."}
         except Exception as e:
             conn.rollback()
@@ -139,7 +215,7 @@ class ProductService:
             conn.close()
 
     def delete_subcategory(self, subcategoryid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute(
@@ -150,7 +226,9 @@ class ProductService:
                 return {"error": "❌ Subcategory not found."}
 
             cursor.execute("DELETE FROM subcategories WHERE subcategoryid = %s", (subcategoryid,))
+            bump(cursor, "subcategories")
             conn.commit()
+            catalog_cache.invalidate(CATEGORIES)
             return {"message": f"🗑️ Subcategory '{sub['name']}' deleted successfully."}
         except Exception as e:
             conn.rollback()
@@ -159,8 +237,13 @@ class ProductService:
             cursor.close()
             conn.close()
 
-    def list_subcategories(self, categoryid: int = None):
-        conn = get_connection()
+    def list_subcategories(self, categoryid: int = None, version: str = None):
+        return catalog_cache.get_or_load(
+            ("subcategories", categoryid or None, version), lambda: self._list_subcategories(categoryid), (CATEGORIES,)
+        )
+
+    def _list_subcategories(self, categoryid: int = None):
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             if categoryid:
@@ -186,7 +269,7 @@ class ProductService:
         images_url: str,
         rating: float = 0.0,
     ):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute(
@@ -223,7 +306,11 @@ class ProductService:
                     rating,
                 ),
             )
+            productid = cursor.lastrowid
+            bump(cursor, "products", productid)
             conn.commit()
+            search_index.add(productid, product_name, description)
+            catalog_cache.invalidate(*product_moved(productid, subcategoryid))
             return {"message": f"✅ Product '{product_name}' added successfully."}
         except Exception as e:
             conn.rollback()
@@ -233,7 +320,7 @@ class ProductService:
             conn.close()
 
     def update_product(self, productid: int, description: str = None, stock: int = None, rating: float = None):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             updates = []
@@ -258,7 +345,12 @@ class ProductService:
             if cursor.rowcount == 0:
                 return {"error": "❌ Product not found."}
 
+            bump(cursor, "products", productid)
             conn.commit()
+            if description is not None:
+                search_index.update(productid, description=description)
+            # Rating is a sort key, so a new rating can reorder listing pages.
+            catalog_cache.invalidate(*(product_moved(productid) if rating is not None else product_changed(productid)))
             return {"message": f"📝 Product ID {productid} updated successfully."}
         except Exception as e:
             conn.rollback()
@@ -268,7 +360,7 @@ class ProductService:
             conn.close()
 
     def delete_product(self, productid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM products WHERE productid = %s", (productid,))
@@ -277,7 +369,10 @@ class ProductService:
                 return {"error": "❌ Product not found."}
 
             cursor.execute("DELETE FROM products WHERE productid = %s", (productid,))
+            bump(cursor, "products", productid)
             conn.commit()
+            search_index.remove(productid)
+            catalog_cache.invalidate(*product_moved(productid, product["subcategoryid"]))
             return {"message": f"🗑️ Product '{product['product_name']}' deleted successfully."}
         except Exception as e:
             conn.rollback()
@@ -286,58 +381,84 @@ class ProductService:
             cursor.close()
             conn.close()
 
-    def get_product(self, productid: int):
-        """Return a single product by id (dict) or None if not found."""
-        conn = get_connection()
+    def get_product(self, productid: int, version: str = None):
+        """Return a single product by id (dict) or None if not found.
+
+        ``version`` is the ETag the response is sent with; it is part of the
+        cache key, so a cached body always matches its validators.
+        """
+        return catalog_cache.get_or_load(
+            ("product", productid, version), lambda: self._fetch_product(productid), (product_tag(productid),)
+        )
+
+    def _fetch_product(self, productid: int):
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute(
-                """
-                SELECT
-                    productid,
-                    sellerid,
-                    product_name,
-                    description,
-                    subcategoryid,
-                    price,
-                    stock,
-                    images_url,
-                    rating
-                FROM products
-                WHERE productid = %s
-                """,
-                (productid,)
-            )
+            cursor.execute(PRODUCT_SELECT + " WHERE p.productid = %s", (productid,))
             product = cursor.fetchone()
             return product
         finally:
             cursor.close()
             conn.close()
 
-    def list_products(self, subcategoryid: int = None):
-        conn = get_connection()
+    def list_products(self, subcategoryid: int = None, after: str = None, limit: int = DEFAULT_PAGE_SIZE, sort: str = "id",
+                      version: str = None):
+        """Return one keyset page: {"items": [...], "next_cursor": str | None}; ``version`` as in get_product."""
+        query = product_page_query(subcategoryid, after, limit, sort)
+        if "error" in query:
+            return query
+
+        return catalog_cache.get_or_load(
+            product_page_key(subcategoryid, after, limit, sort, version),
+            lambda: self._fetch_page(query, limit, sort),
+            lambda page: product_page_tags(subcategoryid, page),
+        )
+
+    def _fetch_page(self, query: dict, limit: int, sort: str):
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            if subcategoryid:
-                cursor.execute("SELECT * FROM products WHERE subcategoryid = %s", (subcategoryid,))
-            else:
-                cursor.execute("SELECT * FROM products")
-            data = cursor.fetchall()
-            return data if data else {"message": "No products found."}
+            cursor.execute(query["sql"], query["params"])
+            return product_page(cursor.fetchall(), limit, sort)
         finally:
             cursor.close()
             conn.close()
 
-    def search_products(self, keyword: str):
-        conn = get_connection()
+    def stream_products(self, subcategoryid: int = None):
+        """The whole catalog (or one subcategory) in productid order, as batches of rows for NDJSON export."""
+        if subcategoryid:
+            return stream_rows(PRODUCT_SELECT + " WHERE p.subcategoryid = %s ORDER BY p.productid", (subcategoryid,))
+        return stream_rows(PRODUCT_SELECT + " ORDER BY p.productid")
+
+    def search_products(self, keyword: str, offset: int = 0, limit: int = DEFAULT_PAGE_SIZE):
+        """Ranked (BM25) search over product name and description, one page at a time."""
+        if not keyword or not keyword.strip():
+            return {"error": "❌ keyword is required."}
+        if offset < 0 or not 1 <= limit <= MAX_PAGE_SIZE:
+            return {"error": f"❌ offset must be >= 0 and limit between 1 and {MAX_PAGE_SIZE}."}
+
+        search_index.ensure_loaded()
+        total, hits = search_index.search(keyword, offset, limit)
+        next_offset = offset + limit if offset + limit < total else None
+        if not hits:
+            return {"items": [], "total": total, "next_offset": None}
+
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute(
-                "SELECT * FROM products WHERE product_name LIKE %s OR description LIKE %s",
-                (f"%{keyword}%", f"%{keyword}%"),
-            )
-            data = cursor.fetchall()
-            return data if data else {"message": f"No products found matching '{keyword}'."}
+            ids = [productid for productid, _ in hits]
+            placeholders = ", ".join(["%s"] * len(ids))
+            cursor.execute(PRODUCT_SELECT + f" WHERE p.productid IN ({placeholders})", ids)
+            rows = {row["productid"]: row for row in cursor.fetchall()}
         finally:
             cursor.close()
             conn.close()
+
+        items = []
+        for productid, score in hits:
+            row = rows.get(productid)
+            if row:
+                row["score"] = round(score, 4)
+                items.append(row)
+        return {"items": items, "total": total, "next_offset": next_offset}
@@ -0,0 +1,264 @@
+"""
+On-demand profiling of single requests.
+
+An admin request (valid X-Admin-Token) that also sends ``X-Profile: 1`` or
+``?profile=1`` is run under a sampling profiler. Every request without
+that flag is untouched. Each sample keeps only the frames that belong to
+that request. On the event loop those are the frames below
+ProfileMiddleware. In a threadpool worker they are the frames below
+the route handler. Other requests running at the same time never show up.
+
+Each sample is filed under one of:
+  db         - inside PyMySQL (sending the query, waiting on and parsing the result)
+  serialize  - encoding the response (dumps_json / dumps_msgpack / FastAPI's encoder)
+  cpu        - any other Python in the route, services and framework
+Wall time that no thread spent on the request is reported as "waiting".
+That covers threadpool queueing, awaited I/O, and the client reading the
+body. Streamed (NDJSON) bodies are encoded in the threadpool outside the
+handler, so their encoding shows up as waiting too.
+
+The sampler only gets in at the interpreter's switch interval (5 ms by
+default) while other threads run Python code, so each sample is weighted
+by the time since the previous one. Totals stay right; short requests
+just get few samples.
+
+The response carries an X-Profile-Id header. The profile is kept in memory
+(GET /admin/profiles) and, with PROFILE_DIR set, written there as well, in
+collapsed-stack format. flamegraph.pl, speedscope and inferno all read it,
+with weights in microseconds.
+
+ProfileMiddleware is only mounted when ADMIN_TOKEN is set. Route handlers
+check one module-level counter, so they pay nothing while no profile runs.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from datetime import datetime
+from urllib.parse import parse_qs
+
+import pymysql
+from app.services import metrics
+
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+PROFILE_DIR = os.getenv("PROFILE_DIR", "")
+MAX_PROFILES = 50
+MAX_PROFILE_SECONDS = 60
+
+PYMYSQL_DIR = os.path.dirname(pymysql.__file__)
+SERIALIZERS = {"dumps_json", "dumps_msgpack", "jsonable_encoder", "serialize_response"}
+
+_current: ContextVar = ContextVar("profile", default=None)
+running = 0   # profiled requests in flight
+
+
+def _label(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _kind(codes) -> str:
+    kind = "cpu"
+    for code in codes:
+        if code.co_filename.startswith(PYMYSQL_DIR):
+            return "db"
+        if code.co_name in SERIALIZERS:
+            kind = "serialize"
+    return kind
+
+
+class Profile:
+    """Samples of one request's stacks, weighted by the time between samples."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex[:12]
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.status = None
+        self.wall_seconds = 0.0
+        self.samples = 0
+        self.seconds = {"cpu": 0.0, "db": 0.0, "serialize": 0.0}
+        self.stacks = {}   # (code objects, root first) -> seconds
+        self.statements = None
+        self.db_seconds = None
+        self.file = None
+        self._roots = {}   # thread id -> frame the request's stacks are cut at
+        self._lock = threading.Lock()
+
+    def attach(self, root):
+        """Sample the calling thread, keeping only the frames below ``root``."""
+        with self._lock:
+            self._roots[threading.get_ident()] = root
+
+    def detach(self):
+        with self._lock:
+            self._roots.pop(threading.get_ident(), None)
+
+    def sample(self, weight: float):
+        frames = sys._current_frames()
+        with self._lock:
+            roots = list(self._roots.items())
+        for thread_id, root in roots:
+            frame = frames.get(thread_id)
+            codes = []
+            while frame is not None and frame is not root:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            # Root not on the stack: the thread is busy with another request.
+            if frame is None or not codes:
+                continue
+            codes.reverse()
+            key = tuple(codes)
+            self.samples += 1
+            self.seconds[_kind(codes)] += weight
+            self.stacks[key] = self.stacks.get(key, 0.0) + weight
+
+    def collapsed(self) -> str:
+        """One "kind;frame;frame... microseconds" line per distinct stack."""
+        lines = {}
+        for codes, seconds in self.stacks.items():
+            line = ";".join([_kind(codes), *map(_label, codes)])
+            lines[line] = lines.get(line, 0) + seconds
+        return "".join(f"{line} {round(seconds * 1e6)}\n" for line, seconds in sorted(lines.items()))
+
+    def summary(self) -> dict:
+        sampled = sum(self.seconds.values())
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "started_at": self.started_at,
+            "wall_ms": round(self.wall_seconds * 1000, 1),
+            "split_ms": {
+                **{kind: round(seconds * 1000, 1) for kind, seconds in self.seconds.items()},
+                "waiting": round(max(self.wall_seconds - sampled, 0) * 1000, 1),
+            },
+            "samples": self.samples,
+            "sql_statements": self.statements,
+            "sql_ms": None if self.db_seconds is None else round(self.db_seconds * 1000, 1),
+            "file": self.file,
+        }
+
+
+class ProfileStore:
+    """The most recent profiles, newest first."""
+
+    def __init__(self, size: int = MAX_PROFILES):
+        self._profiles = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, profile: Profile):
+        with self._lock:
+            self._profiles.appendleft(profile)
+
+    def get(self, profile_id: str):
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def list(self) -> list:
+        with self._lock:
+            return [p.summary() for p in self._profiles]
+
+    def clear(self):
+        with self._lock:
+            self._profiles.clear()
+
+
+profiles = ProfileStore()
+
+
+def run_profiled(func):
+    """Call ``func()`` with the current thread sampled for the request's profile, if it has one."""
+    profile = _current.get()
+    if profile is None:
+        return func()
+    profile.attach(sys._getframe())
+    try:
+        return func()
+    finally:
+        profile.detach()
+
+
+def _sample_until(profile: Profile, stop: threading.Event):
+    last = time.perf_counter()
+    deadline = last + MAX_PROFILE_SECONDS
+    while not stop.wait(PROFILE_INTERVAL) and last < deadline:
+        now = time.perf_counter()
+        profile.sample(now - last)
+        last = now
+
+
+def _write(profile: Profile):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile.started_at:%Y%m%dT%H%M%S}-{profile.id}.collapsed")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(profile.collapsed())
+    profile.file = path
+
+
+def wants_profile(scope, authorize) -> bool:
+    flag = token = None
+    for name, value in scope["headers"]:
+        if name == b"x-profile":
+            flag = value
+        elif name == b"x-admin-token":
+            token = value
+    if flag is None and b"profile=" in scope.get("query_string", b""):
+        flag = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [""])[0].encode()
+    if flag not in (b"1", b"true", b"yes"):
+        return False
+    return token is not None and authorize(token.decode("latin-1"))
+
+
+class ProfileMiddleware:
+    """ASGI middleware profiling the requests that ask for it; ``authorize(token)`` checks X-Admin-Token."""
+
+    def __init__(self, app, authorize):
+        self.app = app
+        self.authorize = authorize
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not wants_profile(scope, self.authorize):
+            await self.app(scope, receive, send)
+            return
+
+        global running
+        profile = Profile(scope["method"], scope["path"])
+        token = _current.set(profile)
+        profile.attach(sys._getframe())
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        stop = threading.Event()
+        sampler = threading.Thread(target=_sample_until, args=(profile, stop), daemon=True)
+        running += 1
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            profile.wall_seconds = time.perf_counter() - started
+            stop.set()
+            sampler.join()
+            running -= 1
+            profile.detach()
+            _current.reset(token)
+            stats = metrics.current_request()
+            if stats is not None:
+                profile.statements, profile.db_seconds = stats.statements, stats.db_seconds
+            if PROFILE_DIR:
+                try:
+                    _write(profile)
+                except OSError as e:
+                    print(f"⚠️ Could not write profile {profile.id}: {e}")
+            profiles.add(profile)
+            print(f"🔬 Profiled {profile.method} {profile.path}: {profile.summary()['split_ms']} [{profile.id}]")
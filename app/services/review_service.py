@@ -1,43 +1,24 @@
 import pymysql
 from datetime import datetime
-from app.database.database import get_connection
+from app.database.database import RequestDB, get_connection
+from app.services.catalog_cache import catalog_cache, product_changed
+from app.services.table_versions import bump
 
 class ReviewService:
     """Handles storing and retrieving product reviews."""
 
-    def ensure_table(self):
-        conn = get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reviews (
-                    reviewid INT AUTO_INCREMENT PRIMARY KEY,
-                    productid INT NOT NULL,
-                    customerid INT NOT NULL,
-                    rating INT NOT NULL,
-                    comment TEXT,
-                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    INDEX(productid),
-                    INDEX(customerid)
-                ) ENGINE=InnoDB;
-            """)
-            conn.commit()
-        finally:
-            cursor.close()
-            conn.close()
+    def __init__(self, db: RequestDB = None):
+        self.db = db
 
     def get_reviews(self, productid: int, page: int = 1, per_page: int = 10):
-        self.ensure_table()
         offset = (page - 1) * per_page
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT COUNT(*) AS cnt FROM reviews WHERE productid = %s", (productid,))
-            total = cursor.fetchone().get('cnt', 0)
-
-            cursor.execute("SELECT AVG(rating) AS avg_rating FROM reviews WHERE productid = %s", (productid,))
-            avg_row = cursor.fetchone() or {}
-            avg_rating = float(avg_row.get('avg_rating')) if avg_row and avg_row.get('avg_rating') is not None else 0.0
+            cursor.execute("SELECT review_count, avg_rating FROM product_ratings WHERE productid = %s", (productid,))
+            agg = cursor.fetchone() or {}
+            total = agg.get('review_count', 0)
+            avg_rating = float(agg.get('avg_rating') or 0)
 
             cursor.execute(
                 "SELECT r.*, c.fname, c.lname FROM reviews r LEFT JOIN customers c ON r.customerid = c.customerid WHERE r.productid = %s ORDER BY r.created_at DESC LIMIT %s OFFSET %s",
@@ -52,18 +33,24 @@ class ReviewService:
             conn.close()
 
     def add_review(self, productid: int, customerid: int, rating: int, comment: str):
-        self.ensure_table()
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE productid = %s AND customerid = %s", (productid, customerid))
+            cursor.execute("SELECT 1 FROM orders WHERE productid = %s AND customerid = %s LIMIT 1", (productid, customerid))
             order = cursor.fetchone()
             if not order:
                 return {"error": "You can only review products you have purchased."}
 
             cursor.execute("INSERT INTO reviews (productid, customerid, rating, comment, created_at) VALUES (%s, %s, %s, %s, %s)",
                            (productid, customerid, int(rating), comment, datetime.utcnow()))
+            cursor.execute("""
+                INSERT INTO product_ratings (productid, review_count, rating_sum) VALUES (%s, 1, %s)
+                ON DUPLICATE KEY UPDATE review_count = review_count + 1, rating_sum = rating_sum + %s
+            """, (productid, int(rating), int(rating)))
+            bump(cursor, "product_ratings", productid)
             conn.commit()
+            # Product payloads embed review_count/avg_rating.
+            catalog_cache.invalidate(*product_changed(productid))
             return {"message": "Review submitted successfully."}
         except Exception as e:
             conn.rollback()
@@ -71,3 +58,26 @@ class ReviewService:
         finally:
             cursor.close()
             conn.close()
+
+    def get_ratings(self, productids: list):
+        """Return {productid: {review_count, avg_rating}} for many products in one query."""
+        ratings = {pid: {"review_count": 0, "avg_rating": 0.0} for pid in productids}
+        if not productids:
+            return ratings
+        conn = get_connection(self.db)
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        try:
+            placeholders = ", ".join(["%s"] * len(productids))
+            cursor.execute(
+                f"SELECT productid, review_count, avg_rating FROM product_ratings WHERE productid IN ({placeholders})",
+                list(productids),
+            )
+            for row in cursor.fetchall():
+                ratings[row["productid"]] = {
+                    "review_count": row["review_count"],
+                    "avg_rating": float(row["avg_rating"] or 0),
+                }
+            return ratings
+        finally:
+            cursor.close()
+            conn.close()
@@ -0,0 +1,248 @@
+import heapq
+import math
+import os
+import re
+import sys
+import threading
+import time
+from operator import itemgetter
+
+import pymysql
+from app.database.database import get_connection
+
+TOKEN_RE = re.compile(r"[0-9a-z]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or the to with".split()
+)
+NAME_WEIGHT = 3
+REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "300"))
+
+
+def _stem(token: str) -> str:
+    """Tiny plural folding so 'shoes' finds 'shoe' (applied to documents and queries alike)."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list:
+    if not text:
+        return []
+    return [_stem(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class SearchIndex:
+    """In-memory inverted index over product name and description, ranked with BM25.
+
+    Name tokens count NAME_WEIGHT times towards term frequency. The index is
+    built from MySQL on first use and then kept current by ProductService and
+    SellerService as they add, update and delete products. Writes made by
+    other worker processes are picked up by a background rebuild every
+    SEARCH_REFRESH_SECONDS (0 disables it).
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self._postings = {}
+        self._docs = {}
+        self._doc_len = {}
+        self._total_len = 0
+        self._avgdl = 0.0
+        self._loaded = False
+        self._built_at = 0.0
+        self._rebuilding = False
+        self._replay = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self):
+        return len(self._docs)
+
+    # -- maintenance -------------------------------------------------------
+
+    @staticmethod
+    def _counts(name_tokens: tuple, desc_tokens: tuple) -> dict:
+        counts = {}
+        for t in name_tokens:
+            counts[t] = counts.get(t, 0) + NAME_WEIGHT
+        for t in desc_tokens:
+            counts[t] = counts.get(t, 0) + 1
+        return counts
+
+    def _index(self, productid: int, name_tokens: tuple, desc_tokens: tuple):
+        counts = self._counts(name_tokens, desc_tokens)
+        length = sum(counts.values())
+        # BM25 term weight without idf, fixed at index time and quantised to
+        # 1..255 (Python caches small ints, which keeps 1M products in memory).
+        # avgdl only drifts between rebuilds, so queries are just dict lookups.
+        k1 = self.k1
+        denom = k1 * (1 - self.b + self.b * length / (self._avgdl or length or 1))
+        scale = 255 / (k1 + 1)
+        postings = self._postings
+        for term, tf in counts.items():
+            impact = max(1, round(scale * tf * (k1 + 1) / (tf + denom)))
+            bucket = postings.get(term)
+            if bucket is None:
+                postings[sys.intern(term)] = {productid: impact}
+            else:
+                bucket[productid] = impact
+        self._docs[productid] = (name_tokens, desc_tokens)
+        self._doc_len[productid] = length
+        self._total_len += length
+
+    def _unindex(self, productid: int):
+        doc = self._docs.pop(productid, None)
+        if doc is None:
+            return None
+        for term in set(doc[0]) | set(doc[1]):
+            bucket = self._postings.get(term)
+            if bucket is not None:
+                bucket.pop(productid, None)
+                if not bucket:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(productid, 0)
+        return doc
+
+    def _skip_writes(self) -> bool:
+        # Until the first load starts there is nothing to keep in sync.
+        return not self._loaded and self._replay is None
+
+    def add(self, productid: int, name: str, description: str):
+        """Index (or re-index) one product."""
+        with self._lock:
+            if self._skip_writes():
+                return
+            if self._replay is not None:
+                self._replay.append(("add", productid, name, description))
+            self._unindex(productid)
+            self._index(productid, tuple(tokenize(name)), tuple(tokenize(description)))
+
+    def update(self, productid: int, name: str = None, description: str = None):
+        """Re-index the fields that changed; the other field keeps its tokens."""
+        with self._lock:
+            if self._skip_writes():
+                return
+            if self._replay is not None:
+                self._replay.append(("update", productid, name, description))
+            old = self._unindex(productid) or ((), ())
+            name_tokens = tuple(tokenize(name)) if name is not None else old[0]
+            desc_tokens = tuple(tokenize(description)) if description is not None else old[1]
+            self._index(productid, name_tokens, desc_tokens)
+
+    def remove(self, productid: int):
+        with self._lock:
+            if self._skip_writes():
+                return
+            if self._replay is not None:
+                self._replay.append(("remove", productid, None, None))
+            self._unindex(productid)
+
+    def build(self, rows):
+        """Replace the whole index with ``rows`` of (productid, name, description)."""
+        docs = []
+        total = 0
+        for productid, name, description in rows:
+            name_tokens, desc_tokens = tuple(tokenize(name)), tuple(tokenize(description))
+            total += NAME_WEIGHT * len(name_tokens) + len(desc_tokens)
+            docs.append((productid, name_tokens, desc_tokens))
+
+        fresh = SearchIndex(self.k1, self.b)
+        fresh._avgdl = total / len(docs) if docs else 0.0
+        for productid, name_tokens, desc_tokens in docs:
+            fresh._index(productid, name_tokens, desc_tokens)
+        del docs
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._docs = fresh._docs
+            self._doc_len = fresh._doc_len
+            self._total_len = fresh._total_len
+            self._avgdl = fresh._avgdl
+            self._loaded = True
+            self._built_at = time.monotonic()
+
+    def load(self):
+        """Rebuild from MySQL, replaying writes that landed while the scan ran."""
+        with self._lock:
+            self._replay = []
+        try:
+            conn = get_connection()
+            cursor = conn.cursor(pymysql.cursors.SSCursor)
+            try:
+                cursor.execute("SELECT productid, product_name, description FROM products")
+                self.build(cursor)
+            finally:
+                cursor.close()
+                conn.close()
+        finally:
+            with self._lock:
+                replay, self._replay = self._replay or [], None
+                for op, productid, name, description in replay:
+                    getattr(self, op)(productid, *(() if op == "remove" else (name, description)))
+
+    def ensure_loaded(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load()
+        elif REFRESH_SECONDS and time.monotonic() - self._built_at > REFRESH_SECONDS:
+            with self._lock:
+                if self._rebuilding:
+                    return
+                self._rebuilding = True
+            threading.Thread(target=self._background_load, daemon=True).start()
+
+    def _background_load(self):
+        try:
+            self.load()
+        except Exception as e:
+            print("⚠️ search index refresh failed:", e)
+            self._built_at = time.monotonic()
+        finally:
+            self._rebuilding = False
+
+    # -- queries -----------------------------------------------------------
+
+    def search(self, query: str, offset: int = 0, limit: int = 20):
+        """Return (total_matches, [(productid, score), ...]) for one page, best first.
+
+        Products must contain every query term the catalog knows about; terms
+        that appear nowhere (typos, stopword-like noise) are ignored.
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            n_docs = len(self._docs)
+            buckets = [self._postings[t] for t in terms if t in self._postings]
+            if not buckets or not n_docs:
+                return 0, []
+            buckets.sort(key=len)
+            unscale = (self.k1 + 1) / 255
+            weighted = [
+                (unscale * math.log(1 + (n_docs - len(bucket) + 0.5) / (len(bucket) + 0.5)), bucket)
+                for bucket in buckets
+            ]
+
+            if len(weighted) == 1:
+                idf, bucket = weighted[0]
+                total = len(bucket)
+                top = heapq.nlargest(offset + limit, bucket.items(), key=itemgetter(1))
+                return total, [(productid, idf * impact) for productid, impact in top[offset:]]
+
+            candidates = buckets[0].keys() & buckets[1].keys()
+            for bucket in buckets[2:]:
+                candidates &= bucket.keys()
+            scored = [
+                (productid, sum(idf * bucket[productid] for idf, bucket in weighted))
+                for productid in candidates
+            ]
+
+        top = heapq.nlargest(offset + limit, scored, key=itemgetter(1))
+        return len(scored), top[offset:]
+
+
+search_index = SearchIndex()
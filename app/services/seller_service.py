@@ -1,11 +1,49 @@
 import pymysql
-from app.database.database import get_connection
+from datetime import date
+from app.database.database import RequestDB, get_connection, stream_rows
+from app.services.catalog_cache import LISTINGS, catalog_cache, product_changed, product_moved
+from app.services.order_service import DEFAULT_HISTORY_SIZE, order_history_page, order_history_query
+from app.services.search_index import search_index
+from app.services.seller_summary import STATUS_COLUMNS, record_status_change
+from app.services.table_versions import bump
+
+MAX_INVENTORY_ITEMS = 10000
+INVENTORY_CHUNK = 500
+
+SELLER_ORDERS_SELECT = """
+    SELECT o.*, p.price AS product_price, t.amount AS transaction_amount, t.status AS transaction_status, t.transDate AS transaction_date,
+           c.fname, c.lname
+    FROM orders o
+    LEFT JOIN products p ON o.productid = p.productid
+    LEFT JOIN transactions t ON o.orderid = t.orderid
+    LEFT JOIN customers c ON o.customerid = c.customerid
+"""
+
+
+def seller_order(row: dict) -> dict:
+    """Add the totals and display fields the seller dashboard shows to one SELLER_ORDERS_SELECT row."""
+    order = dict(row)
+    if order.get('transaction_amount') is not None:
+        order['total_amount'] = float(order['transaction_amount'])
+    else:
+        price = order.get('product_price') or 0
+        qty = order.get('qty') or 1
+        order['total_amount'] = float(qty) * float(price)
+
+    order['items_count'] = int(order.get('qty') or 1)
+    order['customer_name'] = ((order.get('fname') or '') + ' ' + (order.get('lname') or '')).strip() or None
+    order['order_date'] = order.get('transaction_date') or order.get('order_date') or order.get('created_at') or None
+    return order
+
 
 class SellerService:
     """Handles seller registration, product management, and order updates using PyMySQL."""
 
+    def __init__(self, db: RequestDB = None):
+        self.db = db
+
     def register_seller(self, customerid: int, rating: float = 0.0):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM customers WHERE customerid = %s", (customerid,))
@@ -30,7 +68,7 @@ class SellerService:
             conn.close()
 
     def add_product(self, sellerid: int, description: str, subcategoryid: int, stock: int, rating: float = 0.0):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM sellers WHERE sellerid = %s", (sellerid,))
@@ -45,7 +83,11 @@ class SellerService:
                 INSERT INTO products (description, sellerid, subcategoryid, stock, rating)
                 VALUES (%s, %s, %s, %s, %s)
             """, (description, sellerid, subcategoryid, stock, rating))
+            productid = cursor.lastrowid
+            bump(cursor, "products", productid)
             conn.commit()
+            search_index.add(productid, "", description)
+            catalog_cache.invalidate(*product_moved(productid, subcategoryid))
             return {"message": f"✅ Product '{description}' added successfully."}
         except Exception as e:
             conn.rollback()
@@ -55,7 +97,7 @@ class SellerService:
             conn.close()
 
     def update_product(self, sellerid: int, productid: int, description=None, subcategoryid=None, rating=None):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT * FROM products WHERE productid = %s AND sellerid = %s", (productid, sellerid))
@@ -83,7 +125,12 @@ class SellerService:
             sql = f"UPDATE products SET {', '.join(updates)} WHERE productid = %s AND sellerid = %s"
             values.extend([productid, sellerid])
             cursor.execute(sql, tuple(values))
+            bump(cursor, "products", productid)
             conn.commit()
+            if description:
+                search_index.update(productid, description=description)
+            moved = subcategoryid or rating is not None
+            catalog_cache.invalidate(*(product_moved(productid) if moved else product_changed(productid)))
             return {"message": f"✅ Product {productid} updated successfully."}
         except Exception as e:
             conn.rollback()
@@ -93,7 +140,7 @@ class SellerService:
             conn.close()
 
     def delete_product(self, sellerid: int, productid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("SELECT * FROM products WHERE productid = %s AND sellerid = %s", (productid, sellerid))
@@ -101,7 +148,10 @@ class SellerService:
                 return {"error": "❌ Product not found or not owned by seller."}
 
             cursor.execute("DELETE FROM products WHERE productid = %s AND sellerid = %s", (productid, sellerid))
+            bump(cursor, "products", productid)
             conn.commit()
+            search_index.remove(productid)
+            catalog_cache.invalidate(*product_moved(productid))
             return {"message": f"🗑️ Product {productid} deleted successfully."}
         except Exception as e:
             conn.rollback()
@@ -111,7 +161,7 @@ class SellerService:
             conn.close()
 
     def get_seller_products(self, sellerid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM products WHERE sellerid = %s", (sellerid,))
@@ -122,14 +172,16 @@ class SellerService:
             conn.close()
 
     def update_stock(self, sellerid: int, productid: int, new_stock: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("UPDATE products SET stock = %s WHERE productid = %s AND sellerid = %s",
                            (new_stock, productid, sellerid))
             if cursor.rowcount == 0:
                 return {"error": "❌ Product not found or not owned by seller."}
+            bump(cursor, "products", productid)
             conn.commit()
+            catalog_cache.invalidate(*product_changed(productid))
             return {"message": f"✅ Stock updated to {new_stock}."}
         except Exception as e:
             conn.rollback()
@@ -139,7 +191,7 @@ class SellerService:
             conn.close()
 
     def change_stock(self, sellerid: int, productid: int, delta: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT stock FROM products WHERE productid = %s AND sellerid = %s", (productid, sellerid))
@@ -153,7 +205,9 @@ class SellerService:
 
             cursor.execute("UPDATE products SET stock = %s WHERE productid = %s AND sellerid = %s",
                            (new_stock, productid, sellerid))
+            bump(cursor, "products", productid)
             conn.commit()
+            catalog_cache.invalidate(*product_changed(productid))
             return {"message": f"✅ Stock adjusted by {delta}. New stock: {new_stock}"}
         except Exception as e:
             conn.rollback()
@@ -162,57 +216,144 @@ class SellerService:
             cursor.close()
             conn.close()
 
-    def get_seller_orders(self, sellerid: int):
-        conn = get_connection()
+    def bulk_update_inventory(self, sellerid: int, items: list):
+        """Set stock (absolute ``stock`` or relative ``stock_delta``) and/or ``price`` on many products at once.
+
+        ``items`` is a list of dicts with a ``productid``. Ownership and the
+        resulting stock are checked for the whole batch before anything is
+        written; either every product is updated or none is.
+        """
+        if not items:
+            return {"error": "❌ No items to update."}
+        if len(items) > MAX_INVENTORY_ITEMS:
+            return {"error": f"❌ At most {MAX_INVENTORY_ITEMS} items per request."}
+
+        changes = {}
+        for item in items:
+            productid = item["productid"]
+            stock, delta, price = item.get("stock"), item.get("stock_delta"), item.get("price")
+            if productid in changes:
+                return {"error": f"❌ Product {productid} is listed more than once."}
+            if stock is not None and delta is not None:
+                return {"error": f"❌ Product {productid}: give stock or stock_delta, not both."}
+            if stock is None and delta is None and price is None:
+                return {"error": f"❌ Product {productid}: nothing to update."}
+            if (stock is not None and stock < 0) or (price is not None and price < 0):
+                return {"error": f"❌ Product {productid}: stock and price must not be negative."}
+            changes[productid] = (stock, delta, price)
+
+        productids = sorted(changes)
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("""
-                SELECT o.*, p.price AS product_price, t.amount AS transaction_amount, t.status AS transaction_status, t.transDate AS transaction_date,
-                       c.fname, c.lname
-                FROM orders o
-                LEFT JOIN products p ON o.productid = p.productid
-                LEFT JOIN transactions t ON o.orderid = t.orderid
-                LEFT JOIN customers c ON o.customerid = c.customerid
-                WHERE o.sellerid = %s
-            """, (sellerid,))
-            rows = cursor.fetchall()
-            if not rows:
-                return {"message": "No orders found."}
-
-            orders = []
-            for r in rows:
-                order = dict(r)
-                if order.get('transaction_amount') is not None:
-                    order['total_amount'] = float(order['transaction_amount'])
-                else:
-                    price = order.get('product_price') or 0
-                    qty = order.get('qty') or 1
-                    order['total_amount'] = float(qty) * float(price)
-
-                order['items_count'] = int(order.get('qty') or 1)
-                order['customer_name'] = ((order.get('fname') or '') + ' ' + (order.get('lname') or '')).strip() or None
-                order['order_date'] = order.get('transaction_date') or order.get('order_date') or order.get('created_at') or None
-                orders.append(order)
-
-            return orders
+            # Lock the seller's rows first: ownership and the stock that deltas
+            # apply to are then fixed until commit.
+            current = {}
+            for start in range(0, len(productids), INVENTORY_CHUNK):
+                chunk = productids[start:start + INVENTORY_CHUNK]
+                marks = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"""
+                    SELECT productid, stock, price FROM products
+                    WHERE sellerid = %s AND productid IN ({marks})
+                    FOR UPDATE
+                """, (sellerid, *chunk))
+                current.update({row["productid"]: row for row in cursor.fetchall()})
+
+            missing = [pid for pid in productids if pid not in current]
+            if missing:
+                conn.rollback()
+                return {"error": f"❌ Products not found or not owned by seller: {', '.join(map(str, missing[:50]))}"}
+
+            updated = []
+            for productid in productids:
+                stock, delta, price = changes[productid]
+                row = current[productid]
+                new_stock = row["stock"] + delta if delta is not None else stock if stock is not None else row["stock"]
+                if new_stock < 0:
+                    conn.rollback()
+                    return {"error": f"❌ Product {productid}: stock cannot go below zero (current {row['stock']})."}
+                updated.append({
+                    "productid": productid,
+                    "stock": new_stock,
+                    "price": price if price is not None else row["price"],
+                })
+
+            for start in range(0, len(updated), INVENTORY_CHUNK):
+                chunk = updated[start:start + INVENTORY_CHUNK]
+                case = " ".join(["WHEN %s THEN %s"] * len(chunk))
+                marks = ", ".join(["%s"] * len(chunk))
+                cursor.execute(f"""
+                    UPDATE products
+                    SET stock = CASE productid {case} END, price = CASE productid {case} END
+                    WHERE sellerid = %s AND productid IN ({marks})
+                """, (
+                    *(v for u in chunk for v in (u["productid"], u["stock"])),
+                    *(v for u in chunk for v in (u["productid"], u["price"])),
+                    sellerid,
+                    *(u["productid"] for u in chunk),
+                ))
+
+            bump(cursor, "products", *productids)
+            conn.commit()
+            # Price is a sort key, so new prices can reorder every listing.
+            repriced = any(price is not None for _, _, price in changes.values())
+            catalog_cache.invalidate(*product_changed(*productids), *((LISTINGS,) if repriced else ()))
+            return {"message": f"✅ {len(updated)} products updated.", "products": updated}
+        except Exception as e:
+            conn.rollback()
+            return {"error": str(e)}
         finally:
             cursor.close()
             conn.close()
 
+    def get_seller_orders(self, sellerid: int, status: str = None, date_from: date = None,
+                          date_to: date = None, after: str = None, limit: int = DEFAULT_HISTORY_SIZE):
+        """One page of the seller's orders for the dashboard: {"items": [...], "next_cursor": ...}."""
+        query = order_history_query(SELLER_ORDERS_SELECT, "sellerid", sellerid, status, date_from, date_to, after, limit)
+        if "error" in query:
+            return query
+
+        conn = get_connection(self.db)
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        try:
+            cursor.execute(query["sql"], query["params"])
+            page = order_history_page(cursor.fetchall(), limit)
+            page["items"] = [seller_order(r) for r in page["items"]]
+            return page
+        finally:
+            cursor.close()
+            conn.close()
+
+    def stream_seller_orders(self, sellerid: int):
+        """``get_seller_orders`` as batches of rows read from a server-side cursor, for NDJSON export."""
+        batches = stream_rows(SELLER_ORDERS_SELECT + " WHERE o.sellerid = %s ORDER BY o.orderid", (sellerid,))
+        try:
+            for rows in batches:
+                yield [seller_order(r) for r in rows]
+        finally:
+            batches.close()
+
     def update_order_status(self, sellerid: int, orderid: int, new_status: str):
         valid_status = ["Pending", "Dispatched", "On The Way", "Delivered", "Cancelled"]
         if new_status not in valid_status:
             return {"error": f"❌ Invalid status. Choose from: {valid_status}"}
 
-        conn = get_connection()
-        cursor = conn.cursor()
+        conn = get_connection(self.db)
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
-            cursor.execute("SELECT * FROM orders WHERE orderid = %s AND sellerid = %s", (orderid, sellerid))
-            if not cursor.fetchone():
+            cursor.execute("""
+                SELECT o.status, o.qty, t.amount FROM orders o
+                LEFT JOIN transactions t ON t.orderid = o.orderid
+                WHERE o.orderid = %s AND o.sellerid = %s
+                FOR UPDATE
+            """, (orderid, sellerid))
+            order = cursor.fetchone()
+            if not order:
                 return {"error": "❌ Order not found or does not belong to this seller."}
 
             cursor.execute("UPDATE orders SET status = %s WHERE orderid = %s AND sellerid = %s",
                            (new_status, orderid, sellerid))
+            record_status_change(cursor, sellerid, order["status"], new_status, order["qty"], order["amount"])
             conn.commit()
             return {"message": f"🚚 Order {orderid} status updated to '{new_status}'."}
         except Exception as e:
@@ -222,8 +363,34 @@ class SellerService:
             cursor.close()
             conn.close()
 
+    def get_seller_summary(self, sellerid: int):
+        """Dashboard figures kept up to date by the order writers: one primary-key read."""
+        conn = get_connection(self.db)
+        cursor = conn.cursor(pymysql.cursors.DictCursor)
+        try:
+            cursor.execute("SELECT * FROM seller_summary WHERE sellerid = %s", (sellerid,))
+            row = cursor.fetchone()
+            if not row:
+                cursor.execute("SELECT sellerid FROM sellers WHERE sellerid = %s", (sellerid,))
+                if not cursor.fetchone():
+                    return {"error": "❌ Seller not found."}
+                row = dict.fromkeys(["order_count", "units_sold", "revenue", *STATUS_COLUMNS.values()], 0)
+                row["updated_at"] = None
+            return {
+                "sellerid": sellerid,
+                "revenue": float(row["revenue"]),
+                "order_count": row["order_count"],
+                "units_sold": row["units_sold"],
+                "pending_dispatch": row["pending"],
+                "status_counts": {status: row[column] for status, column in STATUS_COLUMNS.items()},
+                "updated_at": row["updated_at"],
+            }
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_seller_profile(self, sellerid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM sellers WHERE sellerid = %s", (sellerid,))
@@ -234,7 +401,7 @@ class SellerService:
             conn.close()
 
     def get_seller_by_customer(self, customerid: int):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor(pymysql.cursors.DictCursor)
         try:
             cursor.execute("SELECT * FROM sellers WHERE customerid = %s", (customerid,))
@@ -245,7 +412,7 @@ class SellerService:
             conn.close()
 
     def update_seller_rating(self, sellerid: int, new_rating: float):
-        conn = get_connection()
+        conn = get_connection(self.db)
         cursor = conn.cursor()
         try:
             cursor.execute("UPDATE sellers SET rating = %s WHERE sellerid = %s", (new_rating, sellerid))
@@ -0,0 +1,81 @@
+# Order status -> its counter column in seller_summary.
+STATUS_COLUMNS = {
+    "Pending": "pending",
+    "Dispatched": "dispatched",
+    "On The Way": "on_the_way",
+    "Delivered": "delivered",
+    "Cancelled": "cancelled",
+}
+
+
+def placed_statement(orders):
+    """SQL and params adding new Pending orders to their sellers' summaries, or None.
+
+    ``orders`` is an iterable of (sellerid, qty, amount); orders without a
+    seller are skipped. Sellers are written in ascending order so two
+    checkouts touching the same sellers cannot deadlock.
+    """
+    totals = {}
+    for sellerid, qty, amount in orders:
+        if sellerid is None:
+            continue
+        count, units, revenue = totals.get(sellerid, (0, 0, 0))
+        totals[sellerid] = (count + 1, units + qty, revenue + amount)
+    if not totals:
+        return None
+    sellerids = sorted(totals)
+    sql = (
+        "INSERT INTO seller_summary (sellerid, order_count, pending, units_sold, revenue) VALUES "
+        + ", ".join(["(%s, %s, %s, %s, %s)"] * len(sellerids))
+        + """ ON DUPLICATE KEY UPDATE
+            order_count = order_count + VALUES(order_count),
+            pending = pending + VALUES(pending),
+            units_sold = units_sold + VALUES(units_sold),
+            revenue = revenue + VALUES(revenue)"""
+    )
+    params = []
+    for sellerid in sellerids:
+        count, units, revenue = totals[sellerid]
+        params += [sellerid, count, count, units, round(revenue, 2)]
+    return sql, params
+
+
+def record_placed(cursor, orders):
+    """Count new orders in the writer's transaction (before commit)."""
+    statement = placed_statement(orders)
+    if statement:
+        cursor.execute(*statement)
+
+
+def status_change_statement(sellerid: int, old_status: str, new_status: str, qty: int, amount):
+    """SQL and params moving one order between status counters, or None if nothing changes.
+
+    Cancelling an order takes its units and revenue back out; reviving a
+    cancelled one puts them back.
+    """
+    if old_status == new_status:
+        return None
+    sets, params = [], []
+    if old_status in STATUS_COLUMNS:
+        sets.append(f"{STATUS_COLUMNS[old_status]} = {STATUS_COLUMNS[old_status]} - 1")
+    sets.append(f"{STATUS_COLUMNS[new_status]} = {STATUS_COLUMNS[new_status]} + 1")
+    if (old_status == "Cancelled") != (new_status == "Cancelled"):
+        sign = "-" if new_status == "Cancelled" else "+"
+        sets += [f"units_sold = units_sold {sign} %s", f"revenue = revenue {sign} %s"]
+        # transactions.amount is a FLOAT; round it like the DECIMAL column does.
+        params += [qty or 0, round(amount or 0, 2)]
+    return f"UPDATE seller_summary SET {', '.join(sets)} WHERE sellerid = %s", params + [sellerid]
+
+
+def record_status_change(cursor, sellerid: int, old_status: str, new_status: str, qty: int, amount):
+    """Apply ``status_change_statement`` in the writer's transaction (before commit)."""
+    statement = status_change_statement(sellerid, old_status, new_status, qty, amount)
+    if statement:
+        cursor.execute(*statement)
+
+
+def record_amount_change(cursor, sellerid: int, status: str, delta):
+    """Adjust revenue when a live order's payment amount is rewritten."""
+    if delta and status != "Cancelled":
+        cursor.execute("UPDATE seller_summary SET revenue = revenue + %s WHERE sellerid = %s", (round(delta, 2), sellerid))
+
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent identical loads in threadpool handlers into one.
+
+    The first caller for a key runs ``fn``; callers arriving while it is in
+    flight block and get the same result (or exception). Nothing is kept
+    once the call returns, so this is coalescing, not caching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters["calls"] += 1
+            else:
+                self._counters["shared"] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._calls)}
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class AsyncSingleFlight:
+    """``SingleFlight`` for async handlers on one event loop.
+
+    The leader awaits ``fn()`` itself (it runs on the leader's request
+    connection). If the leader is cancelled, e.g. its client went away,
+    waiting callers retry and one of them becomes the new leader.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._counters = {"calls": 0, "shared": 0}
+
+    async def do(self, key, fn):
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            self._counters["shared"] += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self._counters["calls"] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            # Nobody may be waiting; mark the exception as retrieved.
+            if future.done() and not future.cancelled():
+                future.exception()
+
+    def stats(self) -> dict:
+        return {**self._counters, "in_flight": len(self._calls)}
+
+
+flights = SingleFlight()
+async_flights = AsyncSingleFlight()
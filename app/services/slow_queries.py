@@ -0,0 +1,163 @@
+"""
+Slow-query log kept by the application, independent of MySQL's slow log.
+
+Every statement run through a pooled cursor (TimedCursor in
+app/database/database.py) that takes longer than SLOW_QUERY_MS is
+recorded under its fingerprint: the SQL with literals and placeholders
+replaced by "?" and repeated value lists folded. Each fingerprint keeps
+its count, total and worst time, the service methods that ran it, and the
+parameters of its slowest run. It is EXPLAINed once, in the
+background, on a connection of its own. The ranked list is served by
+GET /admin/slow-queries.
+
+SLOW_QUERY_MS=0 turns the log off. SLOW_QUERY_EXPLAIN=0 keeps the log
+but skips EXPLAIN.
+"""
+
+import hashlib
+import os
+import queue
+import re
+import threading
+from datetime import datetime
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+EXPLAIN_ENABLED = os.getenv("SLOW_QUERY_EXPLAIN", "1").strip().lower() not in ("0", "false", "no")
+MAX_FINGERPRINTS = 1000
+MAX_CALLERS = 10
+MAX_PARAM_CHARS = 200
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_COMMENTS = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_LITERALS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|%\(\w+\)s|%s|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Normalized form of ``sql`` that is the same for every run of one query shape."""
+    sql = _COMMENTS.sub(" ", sql)
+    sql = _LITERALS.sub("?", sql)
+    sql = _LISTS.sub("(?+)", sql)
+    sql = _REPEATED.sub("(?+)+", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+def _shorten(value):
+    text = repr(value)
+    return text if len(text) <= MAX_PARAM_CHARS else text[:MAX_PARAM_CHARS] + "..."
+
+
+class SlowQueryLog:
+    """Slow statements grouped by fingerprint, worst offenders first."""
+
+    def __init__(self, threshold_ms: float = SLOW_QUERY_MS, explain: bool = EXPLAIN_ENABLED):
+        self.threshold = threshold_ms / 1000
+        self.explain = explain
+        self._lock = threading.Lock()
+        self._entries = {}   # fingerprint id -> entry dict
+        self._explain_queue = queue.Queue(maxsize=100)
+        self._worker = None
+
+    def record(self, caller: str, sql: str, params, seconds: float, many: bool = False):
+        text = fingerprint(sql)
+        key = hashlib.sha1(text.encode()).hexdigest()[:12]
+        now = datetime.utcnow()
+        print(f"🐢 slow query {seconds * 1000:.0f} ms in {caller} [{key}] {text[:200]}")
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= MAX_FINGERPRINTS:
+                    del self._entries[min(self._entries, key=lambda k: self._entries[k]["total_seconds"])]
+                entry = self._entries[key] = {
+                    "id": key,
+                    "fingerprint": text,
+                    "count": 0,
+                    "total_seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "callers": [],
+                    "first_seen": now,
+                    "explain": None,
+                }
+                explain = self.explain and text.lstrip()[:7].upper().startswith(EXPLAINABLE)
+            else:
+                explain = False
+            entry["count"] += 1
+            entry["total_seconds"] += seconds
+            entry["last_seen"] = now
+            if caller not in entry["callers"] and len(entry["callers"]) < MAX_CALLERS:
+                entry["callers"].append(caller)
+            if seconds >= entry["max_seconds"]:
+                entry["max_seconds"] = seconds
+                entry["slowest"] = {"sql": sql.strip(), "params": _shorten(params), "at": now}
+        if explain:
+            self._queue_explain(key, sql, params[0] if many and params else params)
+
+    def _queue_explain(self, key: str, sql: str, params):
+        try:
+            self._explain_queue.put_nowait((key, sql, params))
+        except queue.Full:
+            return
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._explain_loop, daemon=True)
+                    self._worker.start()
+
+    def _explain_loop(self):
+        """Run queued EXPLAINs on a private connection, so they never take a pool slot."""
+        import pymysql
+        from app.database.database import DB_CONFIG
+
+        conn = None
+        while True:
+            key, sql, params = self._explain_queue.get()
+            try:
+                if conn is None:
+                    conn = pymysql.connect(**DB_CONFIG)
+                cursor = conn.cursor(pymysql.cursors.DictCursor)
+                try:
+                    cursor.execute("EXPLAIN " + sql, params)
+                    plan = cursor.fetchall()
+                finally:
+                    cursor.close()
+                    conn.rollback()
+            except Exception as e:
+                plan = {"error": str(e)}
+                if conn is not None and not conn.open:
+                    conn = None
+            with self._lock:
+                if key in self._entries:
+                    self._entries[key]["explain"] = plan
+
+    def top(self, limit: int = 20, sort: str = "total") -> list:
+        """Entries ranked by total time, worst single run ("max") or run count."""
+        field = {"total": "total_seconds", "max": "max_seconds", "count": "count"}[sort]
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e[field], reverse=True)[:limit]
+            return [
+                {
+                    **{k: v for k, v in e.items() if k not in ("total_seconds", "max_seconds", "callers")},
+                    "callers": list(e["callers"]),
+                    "total_ms": round(e["total_seconds"] * 1000, 1),
+                    "max_ms": round(e["max_seconds"] * 1000, 1),
+                    "avg_ms": round(e["total_seconds"] * 1000 / e["count"], 1),
+                }
+                for e in entries
+            ]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "fingerprints": len(self._entries),
+                "statements": sum(e["count"] for e in self._entries.values()),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
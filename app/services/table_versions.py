@@ -0,0 +1,66 @@
+import pymysql
+from app.database.database import RequestDB, get_connection
+
+SHARDS = 16
+
+# Tables whose versions back the catalog's HTTP validators.
+CATALOG_TABLES = ("products", "product_ratings", "categories", "subcategories")
+
+
+def bump_statement(table: str, *keys):
+    """SQL and params that advance ``table``'s version, one shard per distinct key.
+
+    Shards are written in ascending order so two transactions bumping the
+    same shards cannot deadlock.
+    """
+    shards = sorted({int(k) % SHARDS for k in keys} or {0})
+    sql = (
+        "INSERT INTO table_versions (table_name, shard, version, updated_at) VALUES "
+        + ", ".join(["(%s, %s, 1, UTC_TIMESTAMP(6))"] * len(shards))
+        + " ON DUPLICATE KEY UPDATE version = version + 1, updated_at = UTC_TIMESTAMP(6)"
+    )
+    return sql, [v for shard in shards for v in (table, shard)]
+
+
+def bump(cursor, table: str, *keys):
+    """Advance ``table``'s version inside the writer's transaction (before commit)."""
+    cursor.execute(*bump_statement(table, *keys))
+
+
+VERSIONS_SQL = """
+    SELECT table_name, SUM(version) AS version, MAX(updated_at) AS updated_at
+    FROM table_versions WHERE table_name IN ({}) GROUP BY table_name
+"""
+
+
+def validators_from_rows(tables: tuple, rows) -> dict:
+    """{"etag": weak ETag, "last_modified": datetime | None} from VERSIONS_SQL rows."""
+    found = {r["table_name"]: r for r in rows}
+    token = ".".join(str(int(found[t]["version"])) if t in found else "0" for t in tables)
+    stamps = [found[t]["updated_at"] for t in tables if t in found]
+    return {"etag": f'W/"{token}"', "last_modified": max(stamps) if stamps else None}
+
+
+def table_validators(tables: tuple, db: RequestDB = None) -> dict:
+    """Validators for a response built from ``tables``: one primary-key range read.
+
+    Never cached: another worker's write must change the ETag at once, on
+    every worker. Handlers pass the ETag into the service's cache key, so a
+    cached body is only ever sent with the validators it was built under.
+    """
+    conn = get_connection(db)
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute(VERSIONS_SQL.format(", ".join(["%s"] * len(tables))), tables)
+        return validators_from_rows(tables, cursor.fetchall())
+    finally:
+        cursor.close()
+        conn.close()
+
+
+async def async_table_validators(tables: tuple, db) -> dict:
+    """``table_validators`` for async handlers (``db`` is an AsyncRequestDB)."""
+    conn = await db.connection()
+    async with conn.cursor() as cursor:
+        await cursor.execute(VERSIONS_SQL.format(", ".join(["%s"] * len(tables))), tables)
+        return validators_from_rows(tables, await cursor.fetchall())
@@ -0,0 +1,42 @@
+"""Compare DB_MODE=sync and DB_MODE=async on the hot endpoints.
+
+Starts uvicorn once per mode against the configured MySQL and measures
+requests/sec and latency percentiles for GET /products/ and
+POST /orders/place. Order placement decrements stock, so point
+--product at an item with plenty of it.
+
+    python -m benchmarks.bench_db_modes --customer 100001 --product 1
+"""
+
+import argparse
+
+from benchmarks.common import http_load, print_table, run_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customer", type=int, required=True, help="existing customerid used for orders")
+    parser.add_argument("--product", type=int, required=True, help="productid with enough stock to order")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint and mode")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("GET /products/", "GET", lambda: "/products/"),
+        ("POST /orders/place", "POST",
+         lambda: f"/orders/place?customerid={args.customer}&productid={args.product}&qty=1"),
+    ]
+
+    rows = []
+    for mode in ("sync", "async"):
+        with run_server(args.port, env={"DB_MODE": mode}) as base_url:
+            for name, method, url_fn in scenarios:
+                result = http_load(base_url, method, url_fn, args.concurrency, args.duration)
+                rows.append({"mode": mode, "endpoint": name, **result})
+
+    print_table(rows, ["mode", "endpoint", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
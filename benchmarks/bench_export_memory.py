@@ -0,0 +1,130 @@
+"""Peak memory of exporting a large seller's orders: buffered JSON vs streamed NDJSON.
+
+Seeds --orders orders for one seller on a fixture product, then runs each
+export in a fresh child process. Each child reports its own peak RSS above
+the post-import baseline, along with the rows and bytes it produced:
+
+  json      the same query through DictCursor.fetchall, then the whole
+            list encoded as one body (what the routes did before paging)
+  ndjson    stream_orders_by_seller / stream_seller_orders (SSDictCursor),
+            encoded batch by batch, like ?format=ndjson
+
+The fixture orders are deleted afterwards. Needs a reachable MySQL with at
+least one seller, subcategory and customer.
+
+    python -m benchmarks.bench_export_memory --orders 1000000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.common import fixture_product, print_table
+
+SEED_ORDERS = """
+    INSERT INTO orders (customerid, productid, sellerid, qty, status)
+    WITH RECURSIVE seq (n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)
+    SELECT %s, %s, %s, 1 + n %% 3, 'Delivered' FROM seq
+"""
+
+
+def seed(customerid: int, productid: int, orders: int) -> int:
+    """Insert ``orders`` orders for the fixture product's seller; return that sellerid."""
+    import pymysql
+    from app.database.database import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT sellerid FROM products WHERE productid = %s", (productid,))
+        sellerid = cursor.fetchone()["sellerid"]
+        cursor.execute("SET SESSION cte_max_recursion_depth = %s", (orders + 1,))
+        cursor.execute(SEED_ORDERS, (orders, customerid, productid, sellerid))
+        conn.commit()
+        return sellerid
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fetch_all(sql: str, sellerid: int) -> list:
+    import pymysql
+    from app.database.database import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute(sql, (sellerid,))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def child(endpoint: str, fmt: str, sellerid: int):
+    from app.routes.responses import dumps_json, ndjson_chunks
+    from app.services.order_service import OrderService
+    from app.services.seller_service import SELLER_ORDERS_SELECT, SellerService, seller_order
+
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    if fmt == "json":
+        if endpoint == "orders":
+            result = fetch_all("SELECT * FROM orders WHERE sellerid = %s ORDER BY orderid", sellerid)
+        else:
+            sql = SELLER_ORDERS_SELECT + " WHERE o.sellerid = %s ORDER BY o.orderid"
+            result = [seller_order(r) for r in fetch_all(sql, sellerid)]
+        rows, size = len(result), len(dumps_json(result))
+    else:
+        if endpoint == "orders":
+            batches = OrderService().stream_orders_by_seller(sellerid)
+        else:
+            batches = SellerService().stream_seller_orders(sellerid)
+        rows = size = 0
+        for chunk in ndjson_chunks(batches):
+            rows += chunk.count(b"\n")
+            size += len(chunk)
+    print(json.dumps({
+        "rows": rows,
+        "mb_sent": round(size / 2**20, 1),
+        "seconds": round(time.perf_counter() - started, 2),
+        "peak_rss_mb": round(_peak_rss_mb() - baseline, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--child", nargs=3, metavar=("ENDPOINT", "FORMAT", "SELLERID"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        endpoint, fmt, sellerid = args.child
+        child(endpoint, fmt, int(sellerid))
+        return
+
+    rows = []
+    with fixture_product(stock=0, name="export benchmark fixture") as (customerid, productid):
+        sellerid = seed(customerid, productid, args.orders)
+        for endpoint in ("orders", "seller"):
+            for fmt in ("json", "ndjson"):
+                out = subprocess.run(
+                    [sys.executable, "-m", "benchmarks.bench_export_memory", "--child", endpoint, fmt, str(sellerid)],
+                    check=True, capture_output=True, text=True,
+                ).stdout
+                rows.append({"endpoint": endpoint, "format": fmt, **json.loads(out.splitlines()[-1])})
+
+    print(f"{args.orders} seeded orders for seller {sellerid}")
+    print_table(rows, ["endpoint", "format", "rows", "mb_sent", "seconds", "peak_rss_mb"])
+
+
+if __name__ == "__main__":
+    main()
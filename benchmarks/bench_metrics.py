@@ -0,0 +1,95 @@
+"""Overhead of the request and SQL instrumentation in app/services/metrics.py.
+
+Times MetricsMiddleware around a bare ASGI app, and pooled-connection
+cursors around a connection whose statements do nothing, with metrics
+and the slow-query log on and off. What is left is the cost of the instrumentation alone. It is
+reported against a reference request of --request-ms milliseconds that
+runs --statements statements; the target is under 2%. No database is
+needed.
+
+    python -m benchmarks.bench_metrics --request-ms 5 --statements 4
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.database.database import PooledConnection, _RawConnection
+from app.services import metrics
+from app.services.slow_queries import slow_query_log
+from benchmarks.common import print_table
+
+
+class _NullCursor:
+    rowcount = 1
+
+    def execute(self, query, args=None):
+        return 1
+
+    def close(self):
+        pass
+
+
+class _NullConnection:
+    def cursor(self, cursor=None):
+        return _NullCursor()
+
+
+async def _bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _send(message):
+    pass
+
+
+def per_request_us(app, rounds: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/bench"}
+
+    async def run():
+        started = time.perf_counter()
+        for _ in range(rounds):
+            await app(dict(scope), None, _send)
+        return time.perf_counter() - started
+
+    return asyncio.run(run()) / rounds * 1e6
+
+
+def per_statement_us(rounds: int) -> float:
+    conn = PooledConnection(_RawConnection(_NullConnection()), lambda raw: None)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=200_000)
+    parser.add_argument("--request-ms", type=float, default=5.0, help="latency of the reference request")
+    parser.add_argument("--statements", type=int, default=4, help="statements in the reference request")
+    args = parser.parse_args()
+
+    rows = []
+    threshold = slow_query_log.threshold
+    for enabled in (False, True):
+        metrics.METRICS_ENABLED = enabled
+        # With both off, pooled connections hand out plain cursors.
+        slow_query_log.threshold = threshold if enabled else 0
+        rows.append({
+            "metrics": "on" if enabled else "off",
+            "request_us": round(per_request_us(metrics.MetricsMiddleware(_bare_app), args.rounds), 2),
+            "statement_us": round(per_statement_us(args.rounds), 2),
+        })
+    off, on = rows
+    overhead_us = (on["request_us"] - off["request_us"]) + args.statements * (on["statement_us"] - off["statement_us"])
+    print_table(rows, ["metrics", "request_us", "statement_us"])
+    print(f"overhead per reference request: {overhead_us:.1f} us "
+          f"= {overhead_us / (args.request_ms * 10):.2f}% of {args.request_ms} ms with {args.statements} statements")
+
+
+if __name__ == "__main__":
+    main()
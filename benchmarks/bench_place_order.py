@@ -0,0 +1,60 @@
+"""Throughput of OrderService.place_order straight against MySQL.
+
+Each concurrency level hammers one fixture product (with stock to spare)
+from that many threads for --duration seconds, which is the hot-row case:
+every order contends for the same products row lock. No HTTP involved.
+
+    python -m benchmarks.bench_place_order --concurrency 1 8 32 64
+"""
+
+import argparse
+import os
+import threading
+import time
+
+
+def bench(customerid, productid, concurrency, duration):
+    from app.database.database import request_scope
+    from app.services.order_service import OrderService
+    from benchmarks.common import summarize
+
+    latencies, errors = [], []
+    stop_at = time.monotonic() + duration
+
+    def worker():
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            with request_scope():
+                result = OrderService().place_order(customerid, productid, 1)
+            if "error" in result:
+                errors.append(result["error"])
+            else:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(latencies, time.monotonic() - started, len(errors))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DB_POOL_SIZE", str(max(args.concurrency)))
+    from benchmarks.common import fixture_product, print_table
+
+    rows = []
+    with fixture_product(10_000_000, name="bench_place_order fixture") as (customerid, productid):
+        for concurrency in args.concurrency:
+            rows.append({"threads": concurrency, **bench(customerid, productid, concurrency, args.duration)})
+    print_table(rows, ["threads", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
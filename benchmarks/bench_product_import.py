@@ -0,0 +1,112 @@
+"""Bulk product import throughput: --products synthetic rows through ProductImportService.
+
+Writes a CSV (or NDJSON) file of products for one existing seller and
+subcategory, imports it with each --batch-size, and reports rows per
+second. The imported products are deleted after every run. The target is
+100k products in under a minute against a local MySQL.
+
+    python -m benchmarks.bench_product_import --products 100000
+    python -m benchmarks.bench_product_import --products 100000 --batch-size 250 1000 5000 --format ndjson
+"""
+
+import argparse
+import csv
+import json
+import os
+import tempfile
+
+from app.services.product_import import ProductImportService
+from benchmarks.bench_search import synthetic_products
+from benchmarks.common import print_table
+
+NAME_PREFIX = "bench-import"
+
+
+def write_file(path: str, n: int, fmt: str, sellerid: int, subcategoryid: int):
+    columns = ["product_name", "description", "sellerid", "subcategoryid", "price", "stock", "images_url"]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        for productid, name, description in synthetic_products(n):
+            row = [f"{NAME_PREFIX} {name}"[:255], description[:255], sellerid, subcategoryid,
+                   round(50 + productid % 5000 * 1.5, 2), productid % 500, f"https://img.example.com/{productid}.jpg"]
+            if writer:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(columns, row))) + "\n")
+
+
+def fixture_ids():
+    """(sellerid, subcategoryid, current max productid) from the configured database."""
+    import pymysql
+    from app.database.database import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT MIN(sellerid) AS id FROM sellers")
+        sellerid = cursor.fetchone()["id"]
+        cursor.execute("SELECT MIN(subcategoryid) AS id FROM subcategories")
+        subcategoryid = cursor.fetchone()["id"]
+        if sellerid is None or subcategoryid is None:
+            raise RuntimeError("the benchmark needs at least one seller and subcategory in the database")
+        cursor.execute("SELECT COALESCE(MAX(productid), 0) AS id FROM products")
+        return sellerid, subcategoryid, cursor.fetchone()["id"]
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def cleanup(after_productid: int):
+    from app.database.database import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            "DELETE FROM products WHERE productid > %s AND product_name LIKE %s",
+            (after_productid, NAME_PREFIX + "%"),
+        )
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1000])
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+
+    sellerid, subcategoryid, _ = fixture_ids()
+    fd, path = tempfile.mkstemp(suffix="." + args.format)
+    os.close(fd)
+    rows = []
+    try:
+        write_file(path, args.products, args.format, sellerid, subcategoryid)
+        for batch_size in args.batch_size:
+            _, _, before = fixture_ids()
+            try:
+                with open(path, newline="", encoding="utf-8") as f:
+                    report = ProductImportService(batch_size=batch_size).import_lines(f, args.format)
+            finally:
+                cleanup(before)
+            rows.append({
+                "batch_size": batch_size,
+                "inserted": report["inserted"],
+                "failed": report["failed"],
+                "seconds": report["seconds"],
+                "rows_per_s": round(report["inserted"] / report["seconds"]) if report["seconds"] else 0,
+            })
+    finally:
+        os.remove(path)
+
+    print(f"{args.products} products from {args.format}")
+    print_table(rows, ["batch_size", "inserted", "failed", "seconds", "rows_per_s"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Serialization CPU time and bytes on the wire for a large product listing.
+
+Builds --products synthetic rows shaped like PRODUCT_SELECT output,
+including the Decimal and datetime values PyMySQL returns. It times
+FastAPI's default path (jsonable_encoder + json.dumps) against the
+FastJSONResponse encoders, then reports each body's size raw, gzip'd and
+brotli'd at the levels CompressionMiddleware uses. No database is needed.
+
+    python -m benchmarks.bench_responses --products 10000
+"""
+
+import argparse
+import datetime
+import decimal
+import json
+import random
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.routes import responses
+from benchmarks.bench_search import synthetic_products
+from benchmarks.common import percentile, print_table
+
+
+def listing(n: int):
+    rng = random.Random(7)
+    created = datetime.datetime(2025, 1, 1)
+    return [
+        {
+            "productid": productid,
+            "product_name": name,
+            "description": description,
+            "sellerid": rng.randint(1, 500),
+            "subcategoryid": rng.randint(1, 60),
+            "rating": round(rng.uniform(0, 5), 1),
+            "stock": rng.randint(0, 500),
+            "price": round(rng.uniform(50, 50000), 2),
+            "images_url": f"https://img.example.com/products/{productid}.jpg",
+            "review_count": rng.randint(0, 300),
+            "avg_rating": decimal.Decimal(f"{rng.uniform(0, 5):.2f}"),
+            "created_at": created + datetime.timedelta(minutes=productid),
+        }
+        for productid, name, description in synthetic_products(n)
+    ]
+
+
+def fastapi_default(content) -> bytes:
+    # What JSONResponse does after FastAPI's serialize_response.
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode()
+
+
+def timed(fn, arg, rounds: int):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        out = fn(arg)
+        samples.append(time.perf_counter() - started)
+    return out, round(percentile(samples, 50) * 1000, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    payload = {"items": listing(args.products), "next_cursor": None}
+    encoders = [("json (jsonable_encoder)", fastapi_default), ("json (FastJSONResponse)", responses.dumps_json)]
+    if responses.msgpack is not None:
+        encoders.append(("msgpack", responses.dumps_msgpack))
+
+    rows = []
+    for name, encode in encoders:
+        body, serialize_ms = timed(encode, payload, args.rounds)
+        row = {"encoder": name, "serialize_ms": serialize_ms, "bytes": len(body)}
+        gz, row["gzip_ms"] = timed(lambda b: responses.compress_body(b, "gzip"), body, args.rounds)
+        row["gzip_bytes"] = len(gz)
+        if responses.brotli is not None:
+            br, row["br_ms"] = timed(lambda b: responses.compress_body(b, "br"), body, args.rounds)
+            row["br_bytes"] = len(br)
+        rows.append(row)
+
+    print(f"{args.products} products, median of {args.rounds} rounds")
+    print_table(rows, ["encoder", "serialize_ms", "bytes", "gzip_bytes", "gzip_ms", "br_bytes", "br_ms"])
+
+
+if __name__ == "__main__":
+    main()
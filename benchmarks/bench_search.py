@@ -0,0 +1,97 @@
+"""Query latency of the in-memory BM25 product search at catalog scale.
+
+Builds SearchIndex over a synthetic catalog (default 100k and 1M products)
+and reports build time, resident memory growth, incremental update cost
+and query latency percentiles. For reference it also times a linear
+substring scan, which is the work `LIKE '%kw%'` does on every query.
+No database is needed.
+
+    python -m benchmarks.bench_search --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import resource
+import time
+
+from app.services.search_index import SearchIndex
+from benchmarks.common import percentile, print_table
+
+ADJECTIVES = ("red blue green black white wooden steel leather cotton wireless smart portable "
+              "organic premium classic vintage compact waterproof ergonomic handmade").split()
+NOUNS = ("shoe shirt jacket lamp chair table phone charger headphone speaker bottle bag watch "
+         "camera keyboard mouse backpack sofa mattress kettle blender helmet glove sock").split()
+FILLER = ("great quality for daily use with durable finish and easy care ideal gift perfect fit "
+          "lightweight design long lasting battery fast shipping comfortable stylish").split()
+QUERIES = ["shoe", "wireless headphone", "red leather bag", "waterproof camera", "ergonomic chair",
+           "model 4711", "vintage", "portable speaker battery", "blue", "handmade wooden table"]
+
+
+def synthetic_products(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    adj_weights = [1 / (i + 1) for i in range(len(ADJECTIVES))]
+    for productid in range(1, n + 1):
+        noun = rng.choice(NOUNS)
+        adjs = rng.choices(ADJECTIVES, weights=adj_weights, k=2)
+        name = f"{adjs[0]} {adjs[1]} {noun} model {rng.randint(1, 50000)}"
+        description = " ".join(rng.choices(FILLER, k=rng.randint(6, 18))) + f" {noun}"
+        yield productid, name, description
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_size(n: int, rounds: int) -> dict:
+    products = list(synthetic_products(n))
+    index = SearchIndex()
+    rss_before = _rss_mb()
+    started = time.perf_counter()
+    index.build(products)
+    build_s = time.perf_counter() - started
+    rss_after = _rss_mb()
+
+    latencies = []
+    for _ in range(rounds):
+        for q in QUERIES:
+            t = time.perf_counter()
+            index.search(q, 0, 24)
+            latencies.append(time.perf_counter() - t)
+
+    updates = []
+    for productid, name, description in products[:1000]:
+        t = time.perf_counter()
+        index.update(productid, description=description + " refreshed")
+        updates.append(time.perf_counter() - t)
+
+    scans = []
+    texts = [(name + " " + description).lower() for _, name, description in products]
+    for q in QUERIES[:3]:
+        t = time.perf_counter()
+        [i for i, text in enumerate(texts) if q in text]
+        scans.append(time.perf_counter() - t)
+
+    return {
+        "products": n,
+        "build_s": round(build_s, 2),
+        "rss_growth_mb": round(rss_after - rss_before, 1),
+        "query_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "query_p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "update_p99_us": round(percentile(updates, 99) * 1e6, 1),
+        "substring_scan_ms": round(sum(scans) / len(scans) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the query set")
+    args = parser.parse_args()
+
+    rows = [bench_size(n, args.rounds) for n in args.sizes]
+    print_table(rows, ["products", "build_s", "rss_growth_mb", "query_p50_ms", "query_p99_ms",
+                       "update_p99_us", "substring_scan_ms"])
+
+
+if __name__ == "__main__":
+    main()
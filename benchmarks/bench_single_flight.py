@@ -0,0 +1,189 @@
+"""Thundering herd on one product: DB queries and latency with and without coalescing.
+
+Releases --herd concurrent get_product() calls for the same id at once,
+--rounds times, through the real ProductService / AsyncProductService code.
+MySQL is replaced by a simulated database: every query holds one of
+--pool connections for --latency-ms. That is enough to show the queueing
+a herd causes behind a bounded pool. Three setups are compared:
+
+  uncoalesced      catalog cache off, every request runs its own query
+  single-flight    catalog cache off, concurrent misses share one query
+  cache+flight     catalog cache on (the production default)
+
+    python -m benchmarks.bench_single_flight --herd 200 --rounds 20
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+
+import app.services.catalog_cache as catalog_cache_module
+from app.services.async_product_service import AsyncProductService
+from app.services.catalog_cache import catalog_cache
+from app.services.product_service import ProductService
+from benchmarks.common import percentile, print_table
+
+PRODUCT = {"productid": 1, "product_name": "flash sale item", "stock": 10, "price": 99.0,
+           "review_count": 0, "avg_rating": 0}
+
+
+class SimulatedDB:
+    """Stands in for RequestDB: a bounded pool whose queries take a fixed time."""
+
+    def __init__(self, pool_size: int, latency: float):
+        self.latency = latency
+        self.queries = 0
+        self._pool = threading.BoundedSemaphore(pool_size)
+        self._count_lock = threading.Lock()
+
+    def connection(self):
+        self._pool.acquire()
+        return _SimConnection(self)
+
+
+class _SimConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self, cls=None):
+        return self
+
+    def execute(self, sql, params=None):
+        with self.db._count_lock:
+            self.db.queries += 1
+        time.sleep(self.db.latency)
+
+    def fetchone(self):
+        return dict(PRODUCT)
+
+    def close(self):
+        if self.db is not None:
+            self.db._pool.release()
+            self.db = None
+
+
+class AsyncSimulatedDB:
+    """Async counterpart; the semaphore must be created on the running loop."""
+
+    def __init__(self, pool: asyncio.Semaphore, latency: float, counter: list):
+        self.pool, self.latency, self.counter = pool, latency, counter
+
+    async def connection(self):
+        return self
+
+    def cursor(self):
+        return self
+
+    async def __aenter__(self):
+        await self.pool.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.pool.release()
+
+    async def execute(self, sql, params=None):
+        self.counter[0] += 1
+        await asyncio.sleep(self.latency)
+
+    async def fetchone(self):
+        return dict(PRODUCT)
+
+
+class _NoFlight:
+    async def _async(self, key, fn):
+        return await fn()
+
+    def do(self, key, fn):
+        return fn() if not asyncio.iscoroutinefunction(fn) else self._async(key, fn)
+
+
+@contextmanager
+def setup(name):
+    saved = (catalog_cache.ttl, catalog_cache_module.flights, catalog_cache_module.async_flights)
+    catalog_cache.clear()
+    if name != "cache+flight":
+        catalog_cache.ttl = 0
+    if name == "uncoalesced":
+        catalog_cache_module.flights = catalog_cache_module.async_flights = _NoFlight()
+    try:
+        yield
+    finally:
+        catalog_cache.ttl, catalog_cache_module.flights, catalog_cache_module.async_flights = saved
+        catalog_cache.clear()
+
+
+def herd_threads(herd, rounds, pool, latency):
+    db = SimulatedDB(pool, latency)
+    latencies = []
+    lock = threading.Lock()
+    for _ in range(rounds):
+        barrier = threading.Barrier(herd)
+
+        def request():
+            barrier.wait()
+            started = time.perf_counter()
+            ProductService(db).get_product(1)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+        threads = [threading.Thread(target=request) for _ in range(herd)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    return db.queries, latencies
+
+
+async def _herd_async(herd, rounds, pool_size, latency):
+    pool = asyncio.Semaphore(pool_size)
+    counter = [0]
+    latencies = []
+
+    async def request(start):
+        await start.wait()
+        started = time.perf_counter()
+        await AsyncProductService(AsyncSimulatedDB(pool, latency, counter)).get_product(1)
+        latencies.append(time.perf_counter() - started)
+
+    for _ in range(rounds):
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(request(start)) for _ in range(herd)]
+        await asyncio.sleep(0)
+        start.set()
+        await asyncio.gather(*tasks)
+    return counter[0], latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--herd", type=int, default=200, help="concurrent requests per round")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--pool", type=int, default=10, help="simulated pool size")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated query time")
+    args = parser.parse_args()
+    latency = args.latency_ms / 1000
+
+    rows = []
+    for name in ("uncoalesced", "single-flight", "cache+flight"):
+        for handler in ("threads", "async"):
+            with setup(name):
+                if handler == "threads":
+                    queries, latencies = herd_threads(args.herd, args.rounds, args.pool, latency)
+                else:
+                    queries, latencies = asyncio.run(_herd_async(args.herd, args.rounds, args.pool, latency))
+            rows.append({
+                "setup": name,
+                "handler": handler,
+                "requests": len(latencies),
+                "db_queries": queries,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            })
+    print_table(rows, ["setup", "handler", "requests", "db_queries", "p50_ms", "p99_ms"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Shared helpers for the scripts in benchmarks/.
+
+Benchmarks that drive HTTP need httpx (pip install -r benchmarks/requirements.txt)
+and a reachable MySQL configured through the usual DB_* / DATABASE_URL variables.
+"""
+
+import asyncio
+import math
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list (0.0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100.0 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies, elapsed: float, errors: int = 0) -> dict:
+    """Throughput and latency percentiles (milliseconds) for one run."""
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def print_table(rows, columns):
+    """Print a list of dicts as an aligned text table."""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
+
+
+@contextmanager
+def run_server(port: int, env: dict = None, workers: int = 1):
+    """Start uvicorn on app.main:app with extra environment and wait for /healthz."""
+    import httpx
+
+    proc_env = dict(os.environ, **(env or {}))
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        env=proc_env,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/healthz", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if proc.poll() is not None or time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn on port {port} did not become healthy")
+            time.sleep(0.2)
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+async def _worker(client, method, url_fn, stop_at, latencies, errors):
+    while time.monotonic() < stop_at:
+        started = time.perf_counter()
+        try:
+            res = await client.request(method, url_fn())
+            if res.status_code >= 500:
+                errors.append(res.status_code)
+                continue
+        except Exception as e:
+            errors.append(e)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def _load(base_url, method, url_fn, concurrency, duration):
+    import httpx
+
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        started = time.monotonic()
+        stop_at = started + duration
+        await asyncio.gather(*(
+            _worker(client, method, url_fn, stop_at, latencies, errors) for _ in range(concurrency)
+        ))
+        elapsed = time.monotonic() - started
+    return summarize(latencies, elapsed, len(errors))
+
+
+def http_load(base_url: str, method: str, url_fn, concurrency: int = 64, duration: float = 10.0) -> dict:
+    """Hammer one endpoint from ``concurrency`` clients for ``duration`` seconds."""
+    return asyncio.run(_load(base_url, method, url_fn, concurrency, duration))
+
+
+@contextmanager
+def fixture_product(stock: int, price: float = 10.0, name: str = "benchmark fixture"):
+    """Create a throwaway product with ``stock`` units and a customer to buy it.
+
+    Yields (customerid, productid). The product's orders and transactions are
+    deleted afterwards, together with the product itself, and the borrowed
+    seller's summary is recomputed without them. The seller and subcategory
+    are borrowed from existing rows.
+    """
+    import pymysql
+    from app.database.database import get_connection
+    from app.database.migrations import SELLER_SUMMARY_REFRESH
+    from app.services.table_versions import bump
+
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT sellerid FROM sellers ORDER BY sellerid LIMIT 1")
+        seller = cursor.fetchone()
+        cursor.execute("SELECT subcategoryid FROM subcategories ORDER BY subcategoryid LIMIT 1")
+        subcategory = cursor.fetchone()
+        cursor.execute("SELECT customerid FROM customers ORDER BY customerid LIMIT 1")
+        customer = cursor.fetchone()
+        if not (seller and subcategory and customer):
+            raise RuntimeError("benchmarks need at least one seller, subcategory and customer in the database")
+        cursor.execute("""
+            INSERT INTO products (product_name, description, sellerid, subcategoryid, rating, stock, price, images_url)
+            VALUES (%s, %s, %s, %s, 0, %s, %s, '')
+        """, (name, name, seller["sellerid"], subcategory["subcategoryid"], stock, price))
+        productid = cursor.lastrowid
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    try:
+        yield customer["customerid"], productid
+    finally:
+        conn = get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                DELETE t FROM transactions t JOIN orders o ON o.orderid = t.orderid WHERE o.productid = %s
+            """, (productid,))
+            cursor.execute("DELETE FROM orders WHERE productid = %s", (productid,))
+            cursor.execute("DELETE FROM products WHERE productid = %s", (productid,))
+            cursor.execute(SELLER_SUMMARY_REFRESH, (seller["sellerid"], seller["sellerid"]))
+            bump(cursor, "products", productid)
+            bump(cursor, "seller_summary", seller["sellerid"])
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+
+def product_stock(productid: int):
+    """Return (stock, order_count, ordered_qty) for one product straight from MySQL."""
+    import pymysql
+    from app.database.database import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT stock FROM products WHERE productid = %s", (productid,))
+        stock = cursor.fetchone()["stock"]
+        cursor.execute("""
+            SELECT COUNT(*) AS n, COALESCE(SUM(qty), 0) AS qty FROM orders WHERE productid = %s
+        """, (productid,))
+        orders = cursor.fetchone()
+        return stock, orders["n"], int(orders["qty"])
+    finally:
+        cursor.close()
+        conn.close()
@@ -0,0 +1,285 @@
+"""Load test replaying the storefront's page flows, with a JSON baseline to compare against.
+
+Each flow makes the same API calls as its page in frontend/:
+
+  browse           index.html           first listing page, then "Load more" once
+  product          product.html         the product, then its first page of reviews
+  checkout         payment.html         one POST /orders/checkout for a 1-3 item cart
+  seller_dashboard orders_seller.html   seller lookup, then orders and summary together
+  order_history    transactions.html    the customer's orders, plus received orders for sellers
+
+Every flow runs on its own for --duration seconds, from --concurrency
+simulated users, after a --warmup that is not counted. For each flow the
+report gives flows/s, HTTP requests/s, flow latency percentiles and the SQL
+statements per flow. The statement count is the difference in the server's
+http_request_sql_statements histogram (GET /metrics, METRICS_ENABLED=1)
+before and after the run.
+
+The app runs in a uvicorn subprocess (default), in this process without
+HTTP (--in-process), or is an existing server (--url, one worker). It needs
+a seeded database (python -m app.demo_data). checkout places real orders;
+leave it out with --flows to keep the data unchanged.
+
+    python -m benchmarks.loadtest --save benchmarks/baseline.json
+    python -m benchmarks.loadtest --compare benchmarks/baseline.json
+    python -m benchmarks.loadtest --flows browse product --in-process --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from benchmarks.common import percentile, print_table, run_server
+
+COLUMNS = ["flow", "flows", "errors", "flows_per_s", "http_rps", "p50_ms", "p95_ms", "p99_ms", "sql_per_flow"]
+
+
+class FlowError(Exception):
+    pass
+
+
+async def fetch(client, method: str, url: str, **kwargs):
+    res = await client.request(method, url, **kwargs)
+    if res.status_code >= 400:
+        raise FlowError(f"{method} {url} -> {res.status_code}")
+    return res.json()
+
+
+async def browse(client, fx, rng):
+    page = await fetch(client, "GET", "/products/")
+    if page.get("next_cursor"):
+        await fetch(client, "GET", "/products/", params={"after": page["next_cursor"]})
+
+
+async def product(client, fx, rng):
+    productid = rng.choice(fx["products"])
+    await fetch(client, "GET", f"/products/{productid}")
+    await fetch(client, "GET", f"/products/{productid}/reviews", params={"page": 1, "per_page": 10})
+
+
+async def checkout(client, fx, rng):
+    items = [{"productid": pid, "qty": 1} for pid in rng.sample(fx["stocked"], rng.randint(1, 3))]
+    await fetch(client, "POST", "/orders/checkout", json={"customerid": rng.choice(fx["customers"]), "items": items})
+
+
+async def seller_dashboard(client, fx, rng):
+    _, customerid = rng.choice(fx["sellers"])
+    seller = await fetch(client, "GET", f"/sellers/customer/{customerid}")
+    await asyncio.gather(
+        fetch(client, "GET", f"/sellers/{seller['sellerid']}/orders"),
+        fetch(client, "GET", f"/sellers/{seller['sellerid']}/summary"),
+    )
+
+
+async def order_history(client, fx, rng):
+    # Half the visits come from sellers, whose page also lists received orders.
+    if rng.random() < 0.5:
+        sellerid, customerid = rng.choice(fx["sellers"])
+        await asyncio.gather(
+            fetch(client, "GET", f"/orders/customer/{customerid}"),
+            fetch(client, "GET", f"/orders/seller/{sellerid}"),
+        )
+    else:
+        await fetch(client, "GET", f"/orders/customer/{rng.choice(fx['customers'])}")
+
+
+FLOWS = {
+    "browse": browse,
+    "product": product,
+    "checkout": checkout,
+    "seller_dashboard": seller_dashboard,
+    "order_history": order_history,
+}
+
+
+def load_fixtures() -> dict:
+    """Ids the flows pick from; low ids first, since the synthetic data puts most orders there."""
+    import pymysql
+    from app.database.database import get_connection
+
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT productid FROM products ORDER BY productid LIMIT 2000")
+        products = [row["productid"] for row in cursor.fetchall()]
+        cursor.execute("SELECT productid FROM products WHERE stock >= 100 ORDER BY productid LIMIT 500")
+        stocked = [row["productid"] for row in cursor.fetchall()]
+        cursor.execute("SELECT customerid FROM customers ORDER BY customerid LIMIT 2000")
+        customers = [row["customerid"] for row in cursor.fetchall()]
+        cursor.execute("SELECT sellerid, customerid FROM sellers ORDER BY sellerid LIMIT 500")
+        sellers = [(row["sellerid"], row["customerid"]) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+    if not (products and len(stocked) >= 3 and customers and sellers):
+        raise RuntimeError("seed the database first: python -m app.demo_data --scale small")
+    return {"products": products, "stocked": stocked, "customers": customers, "sellers": sellers}
+
+
+async def sql_statements(client):
+    """Statements counted so far by the server's http_request_sql_statements histogram, or None."""
+    res = await client.get("/metrics")
+    if res.status_code != 200:
+        return None
+    total = None
+    for line in res.text.splitlines():
+        if line.startswith("http_request_sql_statements_sum"):
+            total = (total or 0) + float(line.rsplit(" ", 1)[1])
+    return total
+
+
+async def run_flow(client, name: str, fx: dict, concurrency: int, duration: float, seed: int) -> dict:
+    flow = FLOWS[name]
+    latencies, errors = [], []
+    requests = {"sent": 0}
+
+    async def count(request):
+        requests["sent"] += 1
+
+    async def user(n: int, stop_at: float):
+        rng = random.Random(seed * 1000 + n)
+        while time.monotonic() < stop_at:
+            started = time.perf_counter()
+            try:
+                await flow(client, fx, rng)
+            except Exception as e:
+                errors.append(e)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    statements = await sql_statements(client)
+    client.event_hooks["request"].append(count)
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(user(n, started + duration) for n in range(concurrency)))
+    finally:
+        client.event_hooks["request"].remove(count)
+    elapsed = time.monotonic() - started
+    after = await sql_statements(client)
+
+    flows = len(latencies) + len(errors)
+    if errors:
+        print(f"⚠️ {name}: {len(errors)} failed flows, e.g. {errors[0]!r}")
+    return {
+        "flow": name,
+        "flows": len(latencies),
+        "errors": len(errors),
+        "flows_per_s": round(len(latencies) / elapsed, 1),
+        "http_rps": round(requests["sent"] / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "sql_per_flow": round((after - statements) / flows, 2) if flows and None not in (statements, after) else None,
+    }
+
+
+@asynccontextmanager
+async def open_client(base_url: str, concurrency: int):
+    import httpx
+
+    limits = httpx.Limits(max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2)
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            yield client
+        return
+
+    # In-process: the ASGI app is called directly, so only the app and MySQL are measured.
+    os.environ.setdefault("METRICS_ENABLED", "1")
+    from app.main import app
+
+    await app.router.startup()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://in-process",
+                                     timeout=30) as client:
+            yield client
+    finally:
+        await app.router.shutdown()
+
+
+async def run(base_url: str, args) -> list:
+    fx = load_fixtures()
+    rows = []
+    async with open_client(base_url, args.concurrency) as client:
+        for name in args.flows:
+            if args.warmup:
+                await run_flow(client, name, fx, args.concurrency, args.warmup, args.seed + 1)
+            rows.append(await run_flow(client, name, fx, args.concurrency, args.duration, args.seed))
+    return rows
+
+
+def _change(new, old) -> str:
+    if new is None or not old:
+        return "-"
+    return f"{(new - old) / old * 100:+.1f}%"
+
+
+def compare(rows: list, path: str):
+    with open(path, encoding="utf-8") as f:
+        baseline = {row["flow"]: row for row in json.load(f)["flows"]}
+    diffs = []
+    for row in rows:
+        old = baseline.get(row["flow"])
+        if old is None:
+            continue
+        diffs.append({
+            "flow": row["flow"],
+            "flows_per_s": _change(row["flows_per_s"], old["flows_per_s"]),
+            "p50_ms": _change(row["p50_ms"], old["p50_ms"]),
+            "p95_ms": _change(row["p95_ms"], old["p95_ms"]),
+            "p99_ms": _change(row["p99_ms"], old["p99_ms"]),
+            "sql_per_flow": f"{old['sql_per_flow']} -> {row['sql_per_flow']}",
+        })
+    print(f"\nChange against {path}:")
+    print_table(diffs, ["flow", "flows_per_s", "p50_ms", "p95_ms", "p99_ms", "sql_per_flow"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--flows", nargs="+", choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument("--concurrency", type=int, default=16, help="simulated users per flow")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds per flow")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds before each flow")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8766)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="test a running server instead of starting one")
+    target.add_argument("--in-process", action="store_true", help="call the ASGI app directly, no HTTP")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="show the change against a saved baseline")
+    args = parser.parse_args()
+
+    if args.in_process:
+        rows = asyncio.run(run(None, args))
+        target = "in-process"
+    elif args.url:
+        rows = asyncio.run(run(args.url, args))
+        target = args.url
+    else:
+        with run_server(args.port, env={"METRICS_ENABLED": "1"}) as base_url:
+            rows = asyncio.run(run(base_url, args))
+        target = "uvicorn"
+
+    print(f"{args.concurrency} users per flow, {args.duration:g}s each ({target})")
+    print_table(rows, COLUMNS)
+    if args.compare:
+        compare(rows, args.compare)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+                "target": target,
+                "concurrency": args.concurrency,
+                "duration": args.duration,
+                "seed": args.seed,
+                "flows": rows,
+            }, f, indent=2)
+        print(f"💾 Baseline saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
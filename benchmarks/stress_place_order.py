@@ -0,0 +1,113 @@
+"""Oversell check for order placement under contention.
+
+Creates a fixture product with --stock units and releases --buyers threads
+at once, each calling OrderService.place_order for --qty units. Afterwards
+the stock must equal initial stock minus what the successful orders took,
+never drop below zero, and match the orders actually written. Exits 1 if
+any invariant breaks, so it can gate CI against a real MySQL.
+
+    python -m benchmarks.stress_place_order --buyers 100 --stock 50
+    python -m benchmarks.stress_place_order --mode async
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+
+
+def run_sync(customerid, productid, buyers, qty):
+    from app.database.database import request_scope
+    from app.services.order_service import OrderService
+
+    barrier = threading.Barrier(buyers)
+    results = [None] * buyers
+
+    def buy(i):
+        barrier.wait()
+        with request_scope():
+            results[i] = OrderService().place_order(customerid, productid, qty)
+
+    threads = [threading.Thread(target=buy, args=(i,)) for i in range(buyers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+async def _run_async(customerid, productid, buyers, qty):
+    from app.database.async_database import AsyncRequestDB, close_async_pool, init_async_pool
+    from app.services.async_order_service import AsyncOrderService
+
+    await init_async_pool()
+    start = asyncio.Event()
+
+    async def buy():
+        await start.wait()
+        db = AsyncRequestDB()
+        try:
+            return await AsyncOrderService(db).place_order(customerid, productid, qty)
+        finally:
+            await db.release()
+
+    try:
+        tasks = [asyncio.create_task(buy()) for _ in range(buyers)]
+        await asyncio.sleep(0)
+        start.set()
+        return await asyncio.gather(*tasks)
+    finally:
+        await close_async_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--buyers", type=int, default=100)
+    parser.add_argument("--stock", type=int, default=50)
+    parser.add_argument("--qty", type=int, default=1, help="units per order")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    args = parser.parse_args()
+
+    # Let every buyer hold a connection at the same time so they really race.
+    os.environ.setdefault("DB_POOL_SIZE", str(args.buyers))
+    from benchmarks.common import fixture_product, product_stock
+
+    with fixture_product(args.stock, name="stress_place_order fixture") as (customerid, productid):
+        if args.mode == "sync":
+            results = run_sync(customerid, productid, args.buyers, args.qty)
+        else:
+            results = asyncio.run(_run_async(customerid, productid, args.buyers, args.qty))
+        stock, orders, ordered_qty = product_stock(productid)
+
+    placed = sum(1 for r in results if "message" in r)
+    failures = {}
+    for r in results:
+        if "error" in r:
+            key = r["error"].split("(")[0].strip()
+            failures[key] = failures.get(key, 0) + 1
+
+    expected_placed = min(args.buyers, args.stock // args.qty)
+    problems = []
+    if stock < 0:
+        problems.append(f"stock went negative: {stock}")
+    if stock != args.stock - placed * args.qty:
+        problems.append(f"stock {stock} != {args.stock} - {placed} x {args.qty}")
+    if orders != placed or ordered_qty != placed * args.qty:
+        problems.append(f"{orders} orders ({ordered_qty} units) written for {placed} successful calls")
+    if placed != expected_placed:
+        problems.append(f"{placed} orders placed, expected {expected_placed}")
+
+    print(f"mode={args.mode} buyers={args.buyers} stock={args.stock} qty={args.qty}")
+    print(f"placed={placed} final_stock={stock} orders_written={orders}")
+    for error, count in sorted(failures.items()):
+        print(f"  {count:4d} x {error}")
+    if problems:
+        for p in problems:
+            print("❌", p)
+        sys.exit(1)
+    print("✅ no oversell")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,9 +12,10 @@ async function loadProducts(keyword = "") {
   productList.innerHTML = "<p>Loading products...</p>";
 
   try {
-    const products = keyword
+    const data = keyword
       ? await apiRequest(`/products/search?keyword=${keyword}`)
       : await apiRequest("/products");
+    const products = Array.isArray(data) ? data : data.items;
 
     if (!Array.isArray(products) || products.length === 0) {
       productList.innerHTML = "<p>No products found.</p>";
@@ -0,0 +1,104 @@
+"""
+Fixtures for the query-budget suite.
+
+The suite runs the real app against a disposable MySQL database whose name
+ends in "_test". The database is truncated and re-seeded with a tiny
+synthetic dataset (app.demo_data) once per session. Without a reachable test
+database every test is skipped.
+
+    DB_NAME=ecomdb_test python -m pytest tests/
+"""
+
+import itertools
+import os
+import time
+
+# Set before the app is imported: keep the background index refresh from
+# running statements inside a counted block, and count the sync code paths.
+os.environ.setdefault("SEARCH_REFRESH_SECONDS", "0")
+os.environ["DB_MODE"] = "sync"
+
+import pymysql
+import pytest
+
+from app.database.database import DB_CONFIG, get_connection
+from app.services import metrics
+from app.services.catalog_cache import catalog_cache
+
+SEED_COUNTS = ["--customers", "50", "--sellers", "5", "--products", "200", "--orders", "500"]
+
+_phones = itertools.count(int(time.time()) % 1_000_000 * 1000)
+
+
+def query_one(sql: str, params=None) -> dict:
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute(sql, params)
+        return cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def unique_phone() -> str:
+    return str(7_000_000_000 + next(_phones) % 1_000_000_000)
+
+
+@pytest.fixture(scope="session")
+def test_database():
+    if not str(DB_CONFIG.get("database", "")).endswith("_test"):
+        pytest.skip("set DB_NAME to a database ending in _test; it is truncated and re-seeded")
+    try:
+        pymysql.connect(**DB_CONFIG).close()
+    except pymysql.MySQLError as e:
+        pytest.skip(f"test database unreachable: {e}")
+
+    from app import demo_data
+
+    demo_data.main([*SEED_COUNTS, "--reset"])
+    return DB_CONFIG["database"]
+
+
+@pytest.fixture(scope="session")
+def client(test_database):
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.services.search_index import search_index
+
+    with TestClient(app) as client:
+        search_index.load()
+        yield client
+
+
+@pytest.fixture(scope="session")
+def seed(test_database) -> dict:
+    """Ids of seeded rows the route cases point at."""
+    seller = query_one("SELECT sellerid, customerid FROM sellers ORDER BY sellerid LIMIT 1")
+    product = query_one("SELECT productid, subcategoryid FROM products WHERE sellerid = %s AND stock > 10 "
+                        "ORDER BY productid LIMIT 1", (seller["sellerid"],))
+    order = query_one("SELECT orderid, customerid, productid FROM orders ORDER BY orderid LIMIT 1")
+    subcategory = query_one("SELECT subcategoryid, categoryid FROM subcategories ORDER BY subcategoryid LIMIT 1")
+    return {
+        "customerid": order["customerid"],
+        "sellerid": seller["sellerid"],
+        "seller_customerid": seller["customerid"],
+        "productid": product["productid"],
+        "subcategoryid": subcategory["subcategoryid"],
+        "categoryid": subcategory["categoryid"],
+        "orderid": order["orderid"],
+        "ordered_productid": order["productid"],
+    }
+
+
+@pytest.fixture(autouse=True)
+def cold_cache():
+    """Every case starts with an empty catalog cache, so budgets cover the uncached path."""
+    catalog_cache.clear()
+    yield
+
+
+@pytest.fixture
+def count_queries():
+    """``metrics.count_queries``: ``with count_queries() as counted: ...`` then read counted.statements."""
+    return metrics.count_queries
@@ -0,0 +1,27 @@
+"""
+Checkout must report, and pay for, the orders it actually inserted.
+"""
+
+from tests.conftest import query_one
+
+
+def test_checkout_orderids_match_inserted_orders(client, seed):
+    productids = [query_one(
+        "SELECT productid FROM products WHERE stock > 10 ORDER BY productid LIMIT 1 OFFSET %s", (offset,),
+    )["productid"] for offset in range(3)]
+    response = client.post("/orders/checkout", json={
+        "customerid": seed["customerid"], "items": [{"productid": pid, "qty": 1} for pid in productids],
+    })
+    assert response.status_code == 200, response.text
+
+    orders = response.json()["orders"]
+    assert sorted(o["productid"] for o in orders) == sorted(productids)
+    for order in orders:
+        row = query_one("""
+            SELECT o.customerid, o.productid, t.amount FROM orders o
+            JOIN transactions t ON t.orderid = o.orderid
+            WHERE o.orderid = %s
+        """, (order["orderid"],))
+        assert row is not None
+        assert (row["customerid"], row["productid"]) == (seed["customerid"], order["productid"])
+        assert float(row["amount"]) == order["amount"]
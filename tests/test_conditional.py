@@ -0,0 +1,30 @@
+"""
+Another worker's write must show on the very next request: new ETag, new body.
+"""
+
+from app.database.database import get_connection
+from app.services.table_versions import bump
+from tests.conftest import unique_phone
+
+
+def test_write_from_another_worker_is_seen_at_once(client, seed):
+    url = f"/products/{seed['productid']}"
+    first = client.get(url)
+    assert first.status_code == 200, first.text
+
+    # Another worker's write: the rows and versions change, this cache is not told.
+    description = f"changed elsewhere {unique_phone()}"
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("UPDATE products SET description = %s WHERE productid = %s", (description, seed["productid"]))
+        bump(cursor, "products", seed["productid"])
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    second = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert second.json()["description"] == description
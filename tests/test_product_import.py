@@ -0,0 +1,58 @@
+"""
+Bulk product import, end to end: upload or file in, rows, search index and report out.
+"""
+
+import json
+
+import pymysql
+
+from app.database.database import get_connection
+from app.services import product_import
+from app.services.search_index import search_index
+from tests.conftest import unique_phone
+
+
+def imported(tag: str) -> list:
+    conn = get_connection()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT productid, product_name, sellerid, subcategoryid FROM products "
+                       "WHERE product_name LIKE %s ORDER BY productid", (tag + " %",))
+        return cursor.fetchall()
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def test_csv_upload(client, seed):
+    tag = f"csvimport{unique_phone()}"
+    rows = [
+        "product_name,description,sellerid,subcategoryid,price,stock,images_url",
+        *(f"{tag} {n},imported by the test suite,{seed['sellerid']},{seed['subcategoryid']},9.5,4," for n in range(3)),
+        f"{tag} bad,no such subcategory,{seed['sellerid']},0,9.5,4,",
+    ]
+    response = client.post("/products/import", files={"file": ("products.csv", "\n".join(rows) + "\n", "text/csv")})
+    assert response.status_code == 200, response.text
+
+    report = response.json()
+    assert (report["inserted"], report["failed"]) == (3, 1)
+    assert report["errors"] == [{"line": 5, "error": "subcategory 0 not found"}]
+    products = imported(tag)
+    assert [p["product_name"] for p in products] == [f"{tag} {n}" for n in range(3)]
+    total, hits = search_index.search(tag)
+    assert total == 3
+    assert {productid for productid, _ in hits} == {p["productid"] for p in products}
+
+
+def test_cli_ndjson_with_seller(test_database, seed, tmp_path):
+    tag = f"ndjsonimport{unique_phone()}"
+    path = tmp_path / "products.ndjson"
+    path.write_text("".join(
+        json.dumps({"product_name": f"{tag} {n}", "subcategoryid": seed["subcategoryid"], "price": 3, "stock": 1}) + "\n"
+        for n in range(2)
+    ))
+
+    assert product_import.main([str(path), "--seller", str(seed["sellerid"])]) == 0
+    products = imported(tag)
+    assert len(products) == 2
+    assert {p["sellerid"] for p in products} == {seed["sellerid"]}
@@ -0,0 +1,269 @@
+"""
+Query budgets: the most SQL statements and server round trips each route may
+use per request, so a new N+1 pattern fails here before it ships.
+
+Every case runs against a cold catalog cache, so a catalog read pays for its
+table-version lookup (the ETag) as well as the data. Round trips are the
+statements plus explicit commits and rollbacks. Cases that change or delete
+rows create their own targets first, outside the counted block.
+
+When a change legitimately needs more queries, raise the budget in the same
+commit and say why.
+"""
+
+import itertools
+
+import pytest
+from fastapi.routing import APIRoute
+
+from app.routes import admin_router
+from app.services.profiler import Profile, profiles
+from tests.conftest import query_one, unique_phone
+
+PASSWORD = "benchmark123"
+ADMIN_TOKEN = "budget-test-token"
+
+_names = itertools.count(1)
+
+
+def unique_name(prefix: str) -> str:
+    return f"{prefix} {unique_phone()}-{next(_names)}"
+
+
+# Setups: run before counting, return extra fields for the case's templates.
+
+def new_customer(client, seed):
+    phone = unique_phone()
+    response = client.post("/customers/register", params={
+        "fname": "Budget", "lname": "Test", "phoneno": phone, "password": PASSWORD, "address": "1 Test Street",
+        "pincode": "600001", "district": "Chennai", "state": "Tamil Nadu", "housename": "Test House",
+    })
+    assert response.status_code == 200, response.text
+    return {"new_customerid": response.json()["customerid"], "new_phone": phone, "phone": unique_phone()}
+
+
+def new_order(client, seed):
+    response = client.post("/orders/checkout", json={
+        "customerid": seed["customerid"], "items": [{"productid": seed["productid"], "qty": 1}],
+    })
+    assert response.status_code == 200, response.text
+    return {"new_orderid": response.json()["orders"][0]["orderid"]}
+
+
+def new_product(client, seed):
+    response = client.post(f"/sellers/{seed['sellerid']}/product/add", params={
+        "description": unique_name("budget product"), "subcategoryid": seed["subcategoryid"], "stock": 5,
+    })
+    assert response.status_code == 200, response.text
+    row = query_one("SELECT MAX(productid) AS id FROM products WHERE sellerid = %s", (seed["sellerid"],))
+    return {"new_productid": row["id"]}
+
+
+def new_category(client, seed):
+    name = unique_name("Budget category")
+    response = client.post("/products/category/add", params={"name": name})
+    assert response.status_code == 200, response.text
+    return {"new_categoryid": query_one("SELECT categoryid FROM categories WHERE name = %s", (name,))["categoryid"]}
+
+
+def new_subcategory(client, seed):
+    name = unique_name("Budget subcategory")
+    response = client.post("/products/subcategory/add", params={"name": name, "categoryid": seed["categoryid"]})
+    assert response.status_code == 200, response.text
+    row = query_one("SELECT subcategoryid FROM subcategories WHERE name = %s", (name,))
+    return {"new_subcategoryid": row["subcategoryid"]}
+
+
+def seller_products(client, seed):
+    rows = [query_one(
+        "SELECT productid FROM products WHERE sellerid = %s AND stock > 10 ORDER BY productid LIMIT 1 OFFSET %s",
+        (seed["sellerid"], offset),
+    ) for offset in range(3)]
+    return {"seller_productids": [row["productid"] for row in rows if row]}
+
+
+def new_profile(client, seed):
+    profile = Profile("GET", "/products/")
+    profiles.add(profile)
+    return {"profile_id": profile.id}
+
+
+def unique_names(client, seed):
+    return {"name": unique_name("Budget"), "phone": unique_phone()}
+
+
+def import_file(with_seller: bool):
+    def files(f):
+        columns = ["product_name", "description", "subcategoryid", "price", "stock", "images_url"]
+        rows = [[f"budget import {n}", "imported by the query-budget suite", f["subcategoryid"], 99.0, 3, ""]
+                for n in range(3)]
+        if with_seller:
+            columns.append("sellerid")
+            rows = [row + [f["sellerid"]] for row in rows]
+        text = "\n".join(",".join(map(str, row)) for row in [columns, *rows]) + "\n"
+        return {"file": ("products.csv", text, "text/csv")}
+    return files
+
+
+def case(method, path, statements, round_trips, url=None, params=None, json=None, files=None, setup=None,
+         variant=""):
+    """One request to ``path`` (a route template); ``url`` and string params are formatted with the fields."""
+    return pytest.param(
+        (method, path, statements, round_trips, url or path, params or {}, json, files, setup),
+        id=f"{method} {path}{' ' + variant if variant else ''}",
+    )
+
+
+CASES = [
+    # customer_router
+    case("POST", "/customers/register", 2, 3, setup=unique_names, params={
+        "fname": "Budget", "lname": "Test", "phoneno": "{phone}", "password": PASSWORD, "address": "1 Test Street",
+        "pincode": "600001", "district": "Chennai", "state": "Tamil Nadu", "housename": "Test House"}),
+    case("POST", "/customers/login", 1, 1, params={"customerID": "{customerid}", "password": PASSWORD}),
+    case("GET", "/customers/{customerID}", 1, 1, url="/customers/{customerid}"),
+    case("PUT", "/customers/{customerID}/phone", 2, 3, url="/customers/{new_customerid}/phone",
+         setup=new_customer, params={"newphoneno": "{phone}"}),
+    case("PUT", "/customers/{customerID}/address", 2, 3, url="/customers/{new_customerid}/address",
+         setup=new_customer, params={"newaddress": "2 Test Street", "newpincode": "600002", "newdistrict": "Chennai",
+                                     "newstate": "Tamil Nadu", "newhousename": "Other House"}),
+    case("PUT", "/customers/{customerID}/password", 2, 3, url="/customers/{new_customerid}/password",
+         setup=new_customer, params={"oldpassword": PASSWORD, "newpassword": "changed123"}),
+    case("PUT", "/customers/{customerID}/reset-password", 2, 3, url="/customers/{new_customerid}/reset-password",
+         setup=new_customer, params={"phoneno": "{new_phone}", "newpassword": "changed123"}),
+    case("PUT", "/customers/{customerID}/name", 2, 3, url="/customers/{new_customerid}/name",
+         setup=new_customer, params={"newfname": "Renamed", "newlname": "Customer"}),
+    case("DELETE", "/customers/{customerID}", 2, 3, url="/customers/{new_customerid}", setup=new_customer),
+
+    # seller_router
+    case("POST", "/sellers/register", 3, 4, setup=new_customer, params={"customerid": "{new_customerid}"}),
+    case("PUT", "/sellers/{sellerid}/rating", 1, 2, params={"new_rating": 4.5}),
+    case("GET", "/sellers/{sellerid}", 1, 1),
+    case("GET", "/sellers/{sellerid}/summary", 2, 2),
+    case("GET", "/sellers/customer/{customerid}", 1, 1, url="/sellers/customer/{seller_customerid}"),
+    case("PUT", "/sellers/{sellerid}/product/{productid}/stock", 2, 3, params={"new_stock": 100}),
+    case("PUT", "/sellers/{sellerid}/inventory", 3, 4, setup=seller_products,
+         json=lambda f: {"items": [{"productid": pid, "stock_delta": 0} for pid in f["seller_productids"]]}),
+    case("POST", "/sellers/{sellerid}/product/add", 4, 5,
+         params={"description": "budget product", "subcategoryid": "{subcategoryid}", "stock": 5}),
+    case("POST", "/sellers/{sellerid}/products/import", 6, 7, files=import_file(with_seller=False)),
+    case("PUT", "/sellers/{sellerid}/product/{productid}", 4, 5, url="/sellers/{sellerid}/product/{new_productid}",
+         setup=new_product, params={"description": "budget product, edited", "subcategoryid": "{subcategoryid}"}),
+    case("DELETE", "/sellers/{sellerid}/product/{productid}", 3, 4,
+         url="/sellers/{sellerid}/product/{new_productid}", setup=new_product),
+    case("PUT", "/sellers/{sellerid}/order/{orderid}/status", 3, 4,
+         url="/sellers/{sellerid}/order/{new_orderid}/status", setup=new_order, params={"new_status": "Dispatched"}),
+    case("GET", "/sellers/{sellerid}/orders", 1, 1),
+    case("GET", "/sellers/{sellerid}/orders", 3, 3, params={"format": "ndjson"}, variant="ndjson"),
+
+    # order_router
+    case("POST", "/orders/place", 6, 7, params={"customerid": "{customerid}", "productid": "{productid}", "qty": 1}),
+    case("POST", "/orders/checkout", 7, 8, setup=seller_products,
+         json=lambda f: {"customerid": f["customerid"],
+                         "items": [{"productid": pid, "qty": 1} for pid in f["seller_productids"]]}),
+    case("GET", "/orders/{orderid}", 1, 1),
+    case("GET", "/orders/customer/{customerid}", 1, 1),
+    case("GET", "/orders/seller/{sellerid}", 1, 1),
+    case("GET", "/orders/seller/{sellerid}", 3, 3, params={"format": "ndjson"}, variant="ndjson"),
+    case("PUT", "/orders/{orderid}/status", 4, 5, url="/orders/{new_orderid}/status", setup=new_order,
+         params={"new_status": "Delivered"}),
+    case("PUT", "/orders/{orderid}/cancel", 6, 7, url="/orders/{new_orderid}/cancel", setup=new_order),
+    case("GET", "/orders/{orderid}/transaction", 1, 1),
+    case("POST", "/orders/{orderid}/transaction", 4, 5, url="/orders/{new_orderid}/transaction", setup=new_order,
+         params={"amount": 10.0}),
+    case("GET", "/orders/transactions/{customerid}", 1, 1),
+    case("GET", "/orders/transactions/{customerid}", 3, 3, params={"format": "ndjson"}, variant="ndjson"),
+
+    # product_router
+    case("GET", "/products/categories", 2, 2),
+    case("GET", "/products/categories/{categoryid}/subcategories", 2, 2),
+    case("POST", "/products/category/add", 3, 4, setup=unique_names, params={"name": "{name}"}),
+    case("PUT", "/products/category/{categoryid}", 2, 3, url="/products/category/{new_categoryid}",
+         setup=new_category, params={"new_name": "Budget category, renamed"}),
+    case("DELETE", "/products/category/{categoryid}", 4, 5, url="/products/category/{new_categoryid}",
+         setup=new_category),
+    case("POST", "/products/subcategory/add", 4, 5, setup=unique_names,
+         params={"name": "{name}", "categoryid": "{categoryid}"}),
+    case("PUT", "/products/subcategory/{subcategoryid}", 2, 3, url="/products/subcategory/{new_subcategoryid}",
+         setup=new_subcategory, params={"new_name": "Budget subcategory, renamed"}),
+    case("DELETE", "/products/subcategory/{subcategoryid}", 3, 4, url="/products/subcategory/{new_subcategoryid}",
+         setup=new_subcategory),
+    case("GET", "/products/subcategories", 2, 2),
+    case("POST", "/products/add", 4, 5, json=lambda f: {
+        "sellerid": f["sellerid"], "product_name": "budget product", "description": "added by the budget suite",
+        "subcategoryid": f["subcategoryid"], "price": 99.0, "stock": 5, "images_url": ""}),
+    case("POST", "/products/import", 6, 7, files=import_file(with_seller=True)),
+    case("GET", "/products/ratings", 1, 1, params={"ids": "{productid},{ordered_productid}"}),
+    case("GET", "/products/search", 1, 1, params={"keyword": "model"}),
+    case("GET", "/products/export", 3, 3),
+    case("PUT", "/products/{productid}", 2, 3, params={"stock": 100}),
+    case("DELETE", "/products/{productid}", 3, 4, url="/products/{new_productid}", setup=new_product),
+    case("GET", "/products/{productid}", 2, 2),
+    case("GET", "/products/{productid}/reviews", 2, 2),
+    case("POST", "/products/{productid}/review", 4, 5, url="/products/{ordered_productid}/review",
+         json=lambda f: {"customerid": f["customerid"], "rating": 4, "comment": "budget review"}),
+    case("GET", "/products/", 2, 2),
+
+    # category_router
+    case("POST", "/categories/add", 3, 4, setup=unique_names, params={"name": "{name}", "customerid": 100002}),
+    case("GET", "/categories/", 2, 2),
+    case("PUT", "/categories/update/{category_id}", 3, 4, url="/categories/update/{new_categoryid}",
+         setup=new_category, params={"new_name": "Budget category, updated"}),
+    case("DELETE", "/categories/delete/{category_id}", 5, 6, url="/categories/delete/{new_categoryid}",
+         setup=new_category),
+    case("POST", "/categories/{category_id}/subcategories/add", 4, 5, url="/categories/{categoryid}/subcategories/add",
+         setup=unique_names, params={"name": "{name}"}),
+    case("GET", "/categories/{category_id}/subcategories", 2, 2, url="/categories/{categoryid}/subcategories"),
+
+    # admin_router: in-memory only
+    case("GET", "/admin/slow-queries", 0, 0),
+    case("DELETE", "/admin/slow-queries", 0, 0),
+    case("GET", "/admin/profiles", 0, 0),
+    case("GET", "/admin/profiles/{profile_id}", 0, 0, setup=new_profile),
+    case("DELETE", "/admin/profiles", 0, 0),
+]
+
+
+def _fill(value, fields: dict):
+    return value.format(**fields) if isinstance(value, str) else value
+
+
+@pytest.mark.parametrize("spec", CASES)
+def test_route_query_budget(spec, client, seed, count_queries, monkeypatch):
+    method, path, statements, round_trips, url, params, json, files, setup = spec
+    monkeypatch.setattr(admin_router, "ADMIN_TOKEN", ADMIN_TOKEN)
+    fields = dict(seed)
+    if setup:
+        fields.update(setup(client, seed))
+
+    request = {
+        "params": {key: _fill(value, fields) for key, value in params.items()},
+        "headers": {"X-Admin-Token": ADMIN_TOKEN},
+    }
+    if json:
+        request["json"] = json(fields)
+    if files:
+        request["files"] = files(fields)
+
+    with count_queries() as counted:
+        response = client.request(method, url.format(**fields), **request)
+
+    assert response.status_code < 400, response.text
+    assert counted.statements <= statements, (
+        f"{method} {path} ran {counted.statements} statements, budget {statements}:\n{counted.report()}"
+    )
+    assert counted.round_trips <= round_trips, (
+        f"{method} {path} took {counted.round_trips} round trips, budget {round_trips}:\n{counted.report()}"
+    )
+
+
+def test_every_route_has_a_budget():
+    from app.main import app
+
+    budgeted = {(spec.values[0][0], spec.values[0][1]) for spec in CASES}
+    routes = {
+        (method, route.path)
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.endpoint.__module__.startswith("app.routes.")
+        for method in route.methods
+    }
+    assert not routes - budgeted, f"routes without a query budget: {sorted(routes - budgeted)}"
@@ -0,0 +1,23 @@
+"""
+stream_rows must hand its connection back to the pool the way it found it.
+"""
+
+import pymysql
+
+from app.database.database import get_pool, stream_rows
+
+
+def test_finished_stream_resets_net_write_timeout(test_database):
+    for _ in stream_rows("SELECT productid FROM products ORDER BY productid", batch_size=50):
+        pass
+
+    # The pool reuses the most recently returned connection first.
+    conn = get_pool().acquire()
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        cursor.execute("SELECT @@SESSION.net_write_timeout AS session, @@GLOBAL.net_write_timeout AS global")
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+        conn.close()
+    assert row["session"] == row["global"]